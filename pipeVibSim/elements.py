@@ -0,0 +1,374 @@
+import numpy as np
+import scipy.sparse as sps
+
+# sdynpyのbeamkmと同じ要素自由度の並び
+# [u1, v1, w1, rx1, ry1, rz1, u2, v2, w2, rx2, ry2, rz2] から各成分を取り出す射影行列
+PA = np.zeros((2, 12))
+PA[0, 0] = PA[1, 6] = 1
+PT = np.zeros((2, 12))
+PT[0, 3] = PT[1, 9] = 1
+PB1 = np.zeros((4, 12))
+PB1[0, 1] = PB1[1, 5] = PB1[2, 7] = PB1[3, 11] = 1
+PB2 = np.zeros((4, 12))
+PB2[0, 2] = PB2[2, 8] = 1
+PB2[1, 4] = PB2[3, 10] = -1
+
+# 区間[0, 1]上の4点ガウス積分（7次まで厳密）
+_GAUSS_POINTS, _GAUSS_WEIGHTS = np.polynomial.legendre.leggauss(4)
+_GAUSS_POINTS = (_GAUSS_POINTS + 1) / 2
+_GAUSS_WEIGHTS = _GAUSS_WEIGHTS / 2
+
+
+def _hermite(xi):
+    """長さ1の要素におけるエルミート形状関数とその導関数を返します。"""
+    n = np.stack((1 - 3 * xi**2 + 2 * xi**3,
+                  xi - 2 * xi**2 + xi**3,
+                  3 * xi**2 - 2 * xi**3,
+                  -xi**2 + xi**3), axis=-1)
+    dn = np.stack((-6 * xi + 6 * xi**2,
+                   1 - 4 * xi + 3 * xi**2,
+                   6 * xi - 6 * xi**2,
+                   -2 * xi + 3 * xi**2), axis=-1)
+    return n, dn
+
+
+_N, _DN = _hermite(_GAUSS_POINTS)
+_N_N = np.einsum('g,gi,gj->ij', _GAUSS_WEIGHTS, _N, _N)
+_N_DN = np.einsum('g,gi,gj->ij', _GAUSS_WEIGHTS, _N, _DN)
+_DN_DN = np.einsum('g,gi,gj->ij', _GAUSS_WEIGHTS, _DN, _DN)
+
+
+def element_frames(node_positions, node_connectivity, bend_direction):
+    """
+    各要素の長さと局所座標系の回転行列を計算します。
+
+    局所座標系はsdynpyのbeamkmと同じ定義（x: 要素軸、y: 曲げ方向1、z: x × y）です。
+
+    Args:
+        node_positions (np.ndarray): (n_nodes, 3) の節点座標。
+        node_connectivity (np.ndarray): (n_elements, 2) の節点接続情報。
+        bend_direction (np.ndarray): (n_elements, 3) の曲げ方向。
+
+    Returns:
+        tuple: (lengths, rotations) 要素長の配列と (n_elements, 3, 3) の回転行列。
+    """
+    node_positions = np.asarray(node_positions)
+    node_connectivity = np.asarray(node_connectivity)
+    dx = node_positions[node_connectivity[:, 1]] - node_positions[node_connectivity[:, 0]]
+    lengths = np.linalg.norm(dx, axis=1)
+    d0 = dx / lengths[:, np.newaxis]
+    d2 = np.cross(d0, bend_direction)
+    d2 /= np.linalg.norm(d2, axis=1, keepdims=True)
+    d1 = np.cross(d2, d0)
+    d1 /= np.linalg.norm(d1, axis=1, keepdims=True)
+    return lengths, np.stack((d0, d1, d2), axis=1)
+
+
+def element_transformations(rotations):
+    """回転行列から (n_elements, 12, 12) の座標変換行列を作成します。"""
+    transformations = np.zeros((rotations.shape[0], 12, 12))
+    for block in range(4):
+        transformations[:, 3 * block:3 * block + 3, 3 * block:3 * block + 3] = rotations
+    return transformations
+
+
+def bending_matrices(kind, lengths):
+    """
+    1曲げ面あたりのエルミート要素行列 (n_elements, 4, 4) を返します。
+
+    Args:
+        kind (str): 'n_n' (∫NᵀN dx), 'n_dn' (∫NᵀN' dx), 'dn_dn' (∫N'ᵀN' dx) のいずれか。
+        lengths (np.ndarray): 要素長の配列。
+
+    Returns:
+        np.ndarray: (n_elements, 4, 4) の要素行列。
+    """
+    scale = np.ones((lengths.size, 4))
+    scale[:, 1] = scale[:, 3] = lengths
+    outer = scale[:, :, np.newaxis] * scale[:, np.newaxis, :]
+    if kind == 'n_n':
+        return outer * _N_N * lengths[:, np.newaxis, np.newaxis]
+    if kind == 'n_dn':
+        return outer * _N_DN
+    if kind == 'dn_dn':
+        return outer * _DN_DN / lengths[:, np.newaxis, np.newaxis]
+    raise ValueError(f"Unknown element matrix kind: {kind}")
+
+
+def beam_stiffness(lengths, ae, jg, ei1, ei2):
+    """
+    局所座標系の梁要素剛性行列 (n_elements, 12, 12) を一括で計算します。
+
+    sdynpyのbeamkmと同じ定式化（軸・ねじり・2面の曲げ）です。
+
+    Args:
+        lengths (np.ndarray): 要素長の配列。
+        ae (np.ndarray): 軸剛性 EA。
+        jg (np.ndarray): ねじり剛性 GJ。
+        ei1 (np.ndarray): 曲げ方向1の曲げ剛性 EI。
+        ei2 (np.ndarray): 曲げ方向2の曲げ剛性 EI。
+
+    Returns:
+        np.ndarray: (n_elements, 12, 12) の局所要素剛性行列。
+    """
+    L = lengths[:, np.newaxis, np.newaxis]
+    bar = np.array([[1.0, -1.0], [-1.0, 1.0]]) / L
+    bending = np.empty((lengths.size, 4, 4))
+    bending[:] = [[12, 0, -12, 0], [0, 0, 0, 0], [-12, 0, 12, 0], [0, 0, 0, 0]]
+    l = lengths
+    bending[:, 0, 1] = bending[:, 1, 0] = bending[:, 0, 3] = bending[:, 3, 0] = 6 * l
+    bending[:, 1, 2] = bending[:, 2, 1] = bending[:, 2, 3] = bending[:, 3, 2] = -6 * l
+    bending[:, 1, 1] = bending[:, 3, 3] = 4 * l**2
+    bending[:, 1, 3] = bending[:, 3, 1] = 2 * l**2
+    bending /= L**3
+
+    def scaled(values, matrices):
+        return np.asarray(values, dtype=float)[:, np.newaxis, np.newaxis] * matrices
+
+    return (PA.T @ scaled(ae, bar) @ PA + PT.T @ scaled(jg, bar) @ PT
+            + PB1.T @ scaled(ei1, bending) @ PB1 + PB2.T @ scaled(ei2, bending) @ PB2)
+
+
+def beam_mass(lengths, mass_per_length, tmmi_per_length):
+    """
+    局所座標系の梁要素の整合質量行列 (n_elements, 12, 12) を一括で計算します。
+
+    sdynpyのbeamkmと同じ定式化（軸・ねじりは線形、曲げはエルミート補間）です。
+
+    Args:
+        lengths (np.ndarray): 要素長の配列。
+        mass_per_length (np.ndarray): 単位長さあたりの質量。
+        tmmi_per_length (np.ndarray): 単位長さあたりのねじり慣性モーメント。
+
+    Returns:
+        np.ndarray: (n_elements, 12, 12) の局所要素質量行列。
+    """
+    L = lengths[:, np.newaxis, np.newaxis]
+    bar = np.array([[1 / 3, 1 / 6], [1 / 6, 1 / 3]]) * L
+    mass_per_length = np.asarray(mass_per_length, dtype=float)[:, np.newaxis, np.newaxis]
+    tmmi_per_length = np.asarray(tmmi_per_length, dtype=float)[:, np.newaxis, np.newaxis]
+    return (PA.T @ (mass_per_length * bar) @ PA + PT.T @ (tmmi_per_length * bar) @ PT
+            + both_bending_planes(mass_per_length * bending_matrices('n_n', lengths)))
+
+
+def element_values(value, n_elements, default=None):
+    """
+    スカラーまたは配列の特性値を要素数分の配列に変換します。
+
+    Args:
+        value (float or np.ndarray): 全要素共通の値、または要素ごとの値。
+        n_elements (int): 要素数。
+        default (float, optional): 指定した場合、NaNをこの値で置き換えます。 Defaults to None.
+
+    Returns:
+        np.ndarray: (n_elements,) の配列。
+    """
+    array = np.broadcast_to(np.asarray(value, dtype=float), (n_elements,))
+    if default is not None:
+        array = np.where(np.isnan(array), default, array)
+    return array
+
+
+def pipe_section_properties(outer_diameter, thickness):
+    """
+    円管の外径と肉厚から断面特性を計算します。
+
+    Returns:
+        dict: 'inner_diameter', 'area', 'second_moment', 'polar_moment' (J = 2I) と
+              'flow_area' (内部流体の断面積) を持つ辞書。
+    """
+    inner_diameter = outer_diameter - 2 * np.asarray(thickness, dtype=float)
+    second_moment = np.pi / 64 * (outer_diameter**4 - inner_diameter**4)
+    return {
+        'inner_diameter': inner_diameter,
+        'area': np.pi / 4 * (outer_diameter**2 - inner_diameter**2),
+        'second_moment': second_moment,
+        'polar_moment': 2 * second_moment,
+        'flow_area': np.pi / 4 * inner_diameter**2,
+    }
+
+
+def pipe_section_components(young_modulus, poisson_ratio, density, outer_diameter, thickness):
+    """
+    円管の材料特性と肉厚から、要素行列の係数となる剛性成分と質量成分を計算します。
+
+    断面特性は `pipe_section_properties` で計算し、`VibrationAnalysis` のモデル構築と共通です。
+    引数はブロードキャストされるため、(..., n_elements) のサンプルを一括で扱えます。
+
+    Returns:
+        tuple: (..., n_elements, 3) の剛性成分 (EA, GJ, EI) と (..., n_elements, 2) の質量成分 (ρA, ρJ)。
+    """
+    section = pipe_section_properties(outer_diameter, thickness)
+    shear_modulus = young_modulus / (2 * (1 + poisson_ratio))
+    stiffness = np.stack((young_modulus * section['area'], shear_modulus * section['polar_moment'],
+                          young_modulus * section['second_moment']), axis=-1)
+    mass = np.stack((density * section['area'], density * section['polar_moment']), axis=-1)
+    return stiffness, mass
+
+
+def unit_component_matrices(lengths, rotations):
+    """
+    各成分の係数を1とした全体座標系の要素行列を返します。
+
+    要素剛性行列は (EA, GJ, EI) に、要素質量行列は (ρA, ρJ) にそれぞれ線形なため、
+    `pipe_section_components` の値との積和で任意の肉厚・材料の要素行列が得られます。
+
+    Args:
+        lengths (np.ndarray): 要素長の配列。
+        rotations (np.ndarray): (n_elements, 3, 3) の回転行列。
+
+    Returns:
+        tuple: (n_elements, 3, 12, 12) の剛性成分と (n_elements, 2, 12, 12) の質量成分の要素行列。
+    """
+    ones, zeros = np.ones(lengths.size), np.zeros(lengths.size)
+    stiffness = np.stack([beam_stiffness(lengths, ones, zeros, zeros, zeros),
+                          beam_stiffness(lengths, zeros, ones, zeros, zeros),
+                          beam_stiffness(lengths, zeros, zeros, ones, ones)], axis=1)
+    mass = np.stack([beam_mass(lengths, ones, zeros), beam_mass(lengths, zeros, ones)], axis=1)
+    transformations = element_transformations(rotations)
+
+    def rotate(local):
+        return np.einsum('eji,ecjk,ekl->ecil', transformations, local, transformations, optimize=True)
+
+    return rotate(stiffness), rotate(mass)
+
+
+def fluid_section_components(outer_diameter, thickness, fluid_density, flow_velocity, internal_pressure):
+    """
+    内部流体の剛性の係数 -(ρ_f U² + p) A_i と線密度 ρ_f A_i を計算します。
+
+    いずれも内部断面積 A_i に比例するため、肉厚とともに変化します。引数はブロードキャストされます。
+
+    Returns:
+        tuple: (..., n_elements) の流体の剛性の係数と線密度。
+    """
+    flow_area = pipe_section_properties(outer_diameter, thickness)['flow_area']
+    return -(fluid_density * flow_velocity**2 + internal_pressure) * flow_area, fluid_density * flow_area
+
+
+def unit_fluid_matrices(lengths, rotations):
+    """
+    `fluid_section_components` の各係数を1とした全体座標系の流体の要素行列を返します。
+
+    剛性は両曲げ面の ∫N'ᵀN' dx、質量は全並進方向の ∫NᵀN dx（ねじりを除く）です。
+
+    Returns:
+        tuple: (n_elements, 12, 12) の流体の剛性と質量の要素行列。
+    """
+    transformations = element_transformations(rotations)
+    stiffness = both_bending_planes(bending_matrices('dn_dn', lengths))
+    mass = beam_mass(lengths, np.ones(lengths.size), np.zeros(lengths.size))
+    return to_global(stiffness, transformations), to_global(mass, transformations)
+
+
+def both_bending_planes(matrices):
+    """1曲げ面の (n, 4, 4) 行列を両曲げ面に展開した局所 (n, 12, 12) 行列を返します。"""
+    return PB1.T @ matrices @ PB1 + PB2.T @ matrices @ PB2
+
+
+def to_global(local_matrices, transformations):
+    """局所座標系の要素行列 (n, 12, 12) を全体座標系に変換します。"""
+    return np.einsum('eji,ejk,ekl->eil', transformations, local_matrices, transformations, optimize=True)
+
+
+def element_dof_indices(node_connectivity):
+    """各要素の12自由度に対応する全体自由度インデックス (n_elements, 12) を返します。"""
+    node_connectivity = np.asarray(node_connectivity)
+    return (6 * node_connectivity[:, :, np.newaxis] + np.arange(6)).reshape(-1, 12)
+
+
+def assemble(element_matrices, node_connectivity, n_nodes):
+    """
+    全体座標系の要素行列を疎行列として重ね合わせます。
+
+    Args:
+        element_matrices (np.ndarray): (n_elements, 12, 12) の要素行列。
+        node_connectivity (np.ndarray): (n_elements, 2) の節点接続情報。
+        n_nodes (int): 節点数。
+
+    Returns:
+        scipy.sparse.csr_matrix: (6 n_nodes, 6 n_nodes) の全体行列。
+    """
+    dofs = element_dof_indices(node_connectivity)
+    rows = np.broadcast_to(dofs[:, :, np.newaxis], element_matrices.shape)
+    cols = np.broadcast_to(dofs[:, np.newaxis, :], element_matrices.shape)
+    n_dofs = 6 * n_nodes
+    return sps.coo_matrix((element_matrices.ravel(), (rows.ravel(), cols.ravel())),
+                          shape=(n_dofs, n_dofs)).tocsr()
+
+
+def element_end_forces(force_matrices, displacements, node_connectivity):
+    """
+    全体座標系の節点変位から局所座標系の要素端力を全要素一括で計算します。
+
+    Args:
+        force_matrices (np.ndarray): (n_elements, 12, 12) の k_e T_e 行列。
+        displacements (np.ndarray): (..., 6 n_nodes) の物理自由度の変位。先頭の次元（モード、周波数など）は保持されます。
+        node_connectivity (np.ndarray): (n_elements, 2) の節点接続情報。
+
+    Returns:
+        np.ndarray: (..., n_elements, 12) の局所座標系の要素端力
+                    [N1, V1y, V1z, T1, M1y, M1z, N2, V2y, V2z, T2, M2y, M2z]。
+    """
+    element_displacements = displacements[..., element_dof_indices(node_connectivity)]
+    return np.einsum('eij,...ej->...ei', force_matrices, element_displacements, optimize=True)
+
+
+def _to_global_vectors(rotations, local_vectors):
+    """局所座標系の要素ベクトル (..., n, 12) を全体座標系に変換します。"""
+    blocks = local_vectors.reshape(local_vectors.shape[:-1] + (4, 3))
+    return np.einsum('eji,...ebj->...ebi', rotations, blocks).reshape(local_vectors.shape)
+
+
+def distributed_load_vectors(lengths, rotations, loads):
+    """
+    全体座標系の等分布荷重に対する要素の等価節点荷重を一括で計算します。
+
+    軸方向成分は両端に半分ずつ、横方向成分はエルミート形状関数による
+    [qL/2, qL²/12, qL/2, -qL²/12] を各曲げ面に配分します。
+
+    Args:
+        lengths (np.ndarray): 要素長の配列。
+        rotations (np.ndarray): (n_elements, 3, 3) の回転行列。
+        loads (np.ndarray): (..., n_elements, 3) の全体座標系の単位長さあたり荷重。
+
+    Returns:
+        np.ndarray: (..., n_elements, 12) の全体座標系の等価節点荷重。
+    """
+    local_loads = np.einsum('eij,...ej->...ei', rotations, loads)
+    half = local_loads * (lengths[:, np.newaxis] / 2)
+    end_moment = local_loads * (lengths[:, np.newaxis]**2 / 12)
+    bending = np.stack((half, end_moment, half, -end_moment), axis=-1)
+    local = (half[..., 0:1] * (PA[0] + PA[1])
+             + bending[..., 1, :] @ PB1 + bending[..., 2, :] @ PB2)
+    return _to_global_vectors(rotations, local)
+
+
+def axial_force_vectors(rotations, axial_forces):
+    """
+    要素の軸方向の内力 N を、両端の節点荷重 [-N, +N]（要素を伸ばす向きを正）として全体座標系で返します。
+
+    Args:
+        rotations (np.ndarray): (n_elements, 3, 3) の回転行列。
+        axial_forces (np.ndarray): (..., n_elements) の軸方向の力。
+
+    Returns:
+        np.ndarray: (..., n_elements, 12) の全体座標系の節点荷重。
+    """
+    local = np.asarray(axial_forces)[..., np.newaxis] * (PA[1] - PA[0])
+    return _to_global_vectors(rotations, local)
+
+
+def assemble_vectors(element_vectors, node_connectivity, n_nodes):
+    """
+    要素ベクトル (..., n_elements, 12) を全体ベクトル (..., 6 n_nodes) に重ね合わせます。
+
+    先頭の次元（荷重ケースなど）ごとに独立に組み立てます。
+    """
+    dofs = element_dof_indices(node_connectivity)
+    n_dofs = 6 * n_nodes
+    leading = element_vectors.shape[:-2]
+    n_cases = int(np.prod(leading))
+    flat = element_vectors.reshape(n_cases, -1)
+    indices = (np.arange(n_cases)[:, np.newaxis] * n_dofs + dofs.ravel()).ravel()
+    return np.bincount(indices, weights=flat.ravel(), minlength=n_cases * n_dofs).reshape(leading + (n_dofs,))
@@ -0,0 +1,205 @@
+import numpy as np
+
+
+def find_peaks(magnitude, min_relative_height=0.0):
+    """
+    各曲線の極大点を一括で検出します。
+
+    Args:
+        magnitude (np.ndarray): (曲線数, 周波数点数) の振幅配列。
+        min_relative_height (float, optional): 曲線ごとの最大値に対する相対高さの下限。これ未満の極大は無視します。
+                                               Defaults to 0.0.
+
+    Returns:
+        np.ndarray: ピーク位置を示す (曲線数, 周波数点数) のブール配列。
+    """
+    magnitude = np.atleast_2d(magnitude)
+    peaks = np.zeros(magnitude.shape, dtype=bool)
+    center = magnitude[:, 1:-1]
+    peaks[:, 1:-1] = (center > magnitude[:, :-2]) & (center >= magnitude[:, 2:])
+    peaks &= magnitude >= min_relative_height * magnitude.max(axis=1, keepdims=True)
+    return peaks
+
+
+def identify_modes(frequencies, ordinate, min_relative_height=0.01):
+    """
+    FRFのピークから固有振動数、減衰比（半値幅法）、モード定数を推定します。
+
+    すべての応答自由度のピークを1回のベクトル化された処理で評価します。
+    減衰比は振幅がピーク値の 1/√2 となる周波数を線形補間して求め、
+    ピークが解析周波数範囲の端に近く半値点が見つからない場合はNaNとなります。
+
+    Args:
+        frequencies (np.ndarray): 周波数の配列 (Hz)。
+        ordinate (np.ndarray): (曲線数, 周波数点数) の複素FRF（変位/力）。
+        min_relative_height (float, optional): 曲線ごとの最大値に対するピーク高さの下限。 Defaults to 0.01.
+
+    Returns:
+        dict: ピークごとの配列を持つ辞書。
+              'curve' (曲線インデックス), 'frequency' (Hz), 'damping' (減衰比),
+              'residue' (モード定数), 'magnitude' (ピーク振幅)。
+    """
+    frequencies = np.asarray(frequencies, dtype=float)
+    ordinate = np.atleast_2d(ordinate)
+    magnitude = np.abs(ordinate)
+    curve, index = np.nonzero(find_peaks(magnitude, min_relative_height))
+    n_frequencies = frequencies.size
+
+    # 3点の放物線補間でピーク周波数を補正
+    y0 = magnitude[curve, index - 1]
+    y1 = magnitude[curve, index]
+    y2 = magnitude[curve, index + 1]
+    denominator = y0 - 2 * y1 + y2
+    shift = np.where(denominator != 0, 0.5 * (y0 - y2) / np.where(denominator != 0, denominator, 1), 0.0)
+    df = np.gradient(frequencies)[index]
+    natural_frequency = frequencies[index] + shift * df
+    peak_magnitude = y1 - 0.25 * (y0 - y2) * shift
+
+    # 半値点（ピーク値の1/√2）の探索
+    level = peak_magnitude / np.sqrt(2)
+    left = _nearest_below(magnitude, curve, index, level, -1)
+    right = _nearest_below(magnitude, curve, index, level, 1)
+    valid = (left >= 0) & (right < n_frequencies)
+    left_c = np.clip(left, 0, n_frequencies - 2)
+    right_c = np.clip(right, 1, n_frequencies - 1)
+    f_left = _interpolate_crossing(frequencies, magnitude[curve], left_c, left_c + 1, level)
+    f_right = _interpolate_crossing(frequencies, magnitude[curve], right_c - 1, right_c, level)
+    damping = np.where(valid, (f_right - f_left) / (2 * natural_frequency), np.nan)
+
+    # 共振点で H = A / (2jζωn^2) となることからモード定数 A を推定
+    omega = 2 * np.pi * natural_frequency
+    residue = ordinate[curve, index] * 2j * damping * omega ** 2
+
+    return {
+        'curve': curve,
+        'frequency': natural_frequency,
+        'damping': damping,
+        'residue': residue,
+        'magnitude': peak_magnitude,
+    }
+
+
+def _nearest_below(magnitude, curve, index, level, step):
+    """
+    各ピークから step (-1 または 1) の方向に、振幅が level を下回る最も近い点を探します。
+
+    ピークの近傍から幅を倍にしながら窓を広げて探索するため、作業配列の大きさは
+    (ピーク数, 周波数点数) ではなく、半値点までの距離程度に抑えられます。
+    見つからない場合は -1 (step=-1) または周波数点数 (step=1) を返します。
+    """
+    n_frequencies = magnitude.shape[1]
+    result = np.full(index.shape, -1 if step < 0 else n_frequencies)
+    pending = np.arange(index.size)
+    start, width = 1, 8
+    while pending.size:
+        positions = index[pending, np.newaxis] + step * np.arange(start, start + width)
+        inside = (positions >= 0) & (positions < n_frequencies)
+        values = magnitude[curve[pending, np.newaxis], np.clip(positions, 0, n_frequencies - 1)]
+        below = inside & (values < level[pending, np.newaxis])
+        found = below.any(axis=1)
+        result[pending[found]] = positions[found, below[found].argmax(axis=1)]
+        # 周波数範囲の端に達したピークは探索を打ち切る
+        pending = pending[~found & inside[:, -1]]
+        start, width = start + width, 2 * width
+    return result
+
+
+def _interpolate_crossing(frequencies, magnitude, i0, i1, level):
+    """各行について i0 と i1 の間で振幅が level を横切る周波数を線形補間します。"""
+    rows = np.arange(magnitude.shape[0])
+    m0 = magnitude[rows, i0]
+    m1 = magnitude[rows, i1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where(m1 != m0, (level - m0) / (m1 - m0), 0.0)
+    return frequencies[i0] + t * (frequencies[i1] - frequencies[i0])
+
+
+def fit_rational_fraction(frequencies, ordinate, n_modes, frequency_range=None):
+    """
+    有理分数多項式（RFP）法により、全曲線に共通の極を持つモデルを最小二乗で当てはめます。
+
+    分母多項式は全曲線で共有し、曲線ごとの分子係数を射影で消去してから
+    1回の最小二乗問題として解きます。留数は求めた極を基底として全曲線を同時に解きます。
+    高次の多項式は条件が悪くなるため、少数のモードを含む周波数帯ごとに使用してください。
+
+    Args:
+        frequencies (np.ndarray): 周波数の配列 (Hz)。
+        ordinate (np.ndarray): (曲線数, 周波数点数) の複素FRF。
+        n_modes (int): 当てはめるモード数。
+        frequency_range (tuple of float, optional): 当てはめに使う周波数範囲 (Hz)。 Defaults to None.
+
+    Returns:
+        dict: 'frequency' (固有振動数 Hz), 'damping' (減衰比), 'poles' (複素極),
+              'residues' ((曲線数, モード数) の複素留数) を持つ辞書。
+    """
+    frequencies = np.asarray(frequencies, dtype=float)
+    ordinate = np.atleast_2d(ordinate)
+    if frequency_range is not None:
+        mask = (frequencies >= frequency_range[0]) & (frequencies <= frequency_range[1])
+        frequencies = frequencies[mask]
+        ordinate = ordinate[:, mask]
+
+    omega = 2 * np.pi * frequencies
+    omega_scale = omega.max()
+    s = 1j * omega / omega_scale
+    n_denominator = 2 * n_modes
+    n_numerator = 2 * n_modes
+
+    powers_numerator = s[:, np.newaxis] ** np.arange(n_numerator)
+    powers_denominator = s[:, np.newaxis] ** np.arange(n_denominator)
+
+    # H (s^n + Σ a_k s^k) = Σ b_j s^j を実部・虚部に分けて立式
+    numerator_basis = _stack_complex(powers_numerator, axis=0)
+    q, _ = np.linalg.qr(numerator_basis)
+    denominator_terms = _stack_complex(-ordinate[:, :, np.newaxis] * powers_denominator, axis=1)
+    rhs = _stack_complex(ordinate * s ** n_denominator, axis=1)
+
+    # 分子の張る空間を射影で除去し、分母係数のみの方程式にする
+    denominator_terms = denominator_terms - q @ (q.T @ denominator_terms)
+    rhs = rhs - (q @ (q.T @ rhs[:, :, np.newaxis]))[:, :, 0]
+    coefficients, *_ = np.linalg.lstsq(denominator_terms.reshape(-1, n_denominator), rhs.reshape(-1), rcond=None)
+
+    roots = np.roots(np.concatenate(([1.0], coefficients[::-1]))) * omega_scale
+    poles = roots[np.imag(roots) > 0]
+    poles = poles[np.argsort(np.abs(poles))]
+
+    basis = np.concatenate((1 / (1j * omega[:, np.newaxis] - poles),
+                            1 / (1j * omega[:, np.newaxis] - np.conj(poles))), axis=1)
+    solution, *_ = np.linalg.lstsq(basis, ordinate.T, rcond=None)
+
+    natural_omega = np.abs(poles)
+    return {
+        'frequency': natural_omega / (2 * np.pi),
+        'damping': -np.real(poles) / natural_omega,
+        'poles': poles,
+        'residues': solution[:poles.size].T,
+    }
+
+
+def _stack_complex(values, axis):
+    """複素配列の実部と虚部を指定した軸方向に積み重ねます。"""
+    return np.concatenate((values.real, values.imag), axis=axis)
+
+
+def match_modes(identified_frequencies, shapes, tolerance=0.05):
+    """
+    FRFから推定した固有振動数を固有値解析のモードと対応付けます。
+
+    Args:
+        identified_frequencies (np.ndarray): 推定した固有振動数 (Hz)。
+        shapes: sdynpyの固有値解析結果。
+        tolerance (float, optional): 対応とみなす相対誤差の上限。 Defaults to 0.05.
+
+    Returns:
+        dict: 'mode_index' (対応するモードのインデックス、対応なしは-1) と
+              'relative_error' (相対誤差) を持つ辞書。
+    """
+    identified_frequencies = np.asarray(identified_frequencies, dtype=float)
+    mode_frequencies = np.asarray(shapes.frequency, dtype=float).ravel()
+    relative_error = (identified_frequencies[:, np.newaxis] - mode_frequencies) / mode_frequencies
+    nearest = np.argmin(np.abs(relative_error), axis=1)
+    error = relative_error[np.arange(identified_frequencies.size), nearest]
+    return {
+        'mode_index': np.where(np.abs(error) <= tolerance, nearest, -1),
+        'relative_error': error,
+    }
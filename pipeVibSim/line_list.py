@@ -0,0 +1,297 @@
+import csv
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .pipe import Pipe
+from .pipe_path import PipePath
+from .serialization import FORMAT_VERSION, load_model, save_model
+
+# CSV形式の列のうち、材料特性以外の列
+_CSV_COLUMNS = ('line', 'segment', 'x', 'y', 'z', 'radius', 'step')
+_CACHE_INDEX = 'lines.json'
+
+# `PipePath._create_node_path` での角の扱い
+CORNER_SKIPPED = -1   # 前後どちらかの区間長が0で、処理されない角
+CORNER_STRAIGHT = 0   # 直線（同一直線上の点、または折り返し）
+CORNER_FILLET = 1     # 円弧による曲げ
+CORNER_U_BEND = 2     # 180度曲げ
+
+
+def read_line_lists(path):
+    """
+    ラインリストのファイルを1ラインずつ逐次読み込みます。
+
+    対応する形式は次の通りです。
+
+    - CSV (`.csv`): 1行が1点で、列 'line', 'segment', 'x', 'y', 'z', 'radius', 'step' と
+      任意の材料特性の列（'young_modulus', 'thickness' など）を持ちます。
+      同じ 'line' の行は連続している必要があり、'segment' が変わるごとに新しいセグメントになります。
+      'radius' は角の点の曲げ半径で、セグメントの始点と終点では空欄にできます。
+      'step' と材料特性はセグメントの最初の行の値を使用します。
+    - JSON Lines (`.jsonl`): 1行が1ラインで、'line' と 'segments' を持つオブジェクトです。
+      各セグメントは 'points', 'radius', 'step', 'material' を持ちます（`service.build_analysis` と同じ形式）。
+    - JSON (`.json`): JSON Linesと同じオブジェクトのリスト。
+
+    1つのファイルに同じラインの識別子が複数回現れる場合（CSVで行が連続していない場合を含む）はエラーとなります。
+
+    Args:
+        path (str): ファイルパス。
+
+    Yields:
+        tuple: (line_id, segments) ラインの識別子とセグメントの辞書のリスト。
+    """
+    seen = set()
+    for line_id, segments in _read_records(path):
+        if line_id in seen:
+            raise ValueError(f"Duplicate line id {line_id} in {path}")
+        seen.add(line_id)
+        yield line_id, segments
+
+
+def _read_records(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        yield from _read_csv(path)
+    elif extension == '.jsonl':
+        with open(path) as f:
+            for text in f:
+                if text.strip():
+                    record = json.loads(text)
+                    yield str(record['line']), record['segments']
+    elif extension == '.json':
+        with open(path) as f:
+            for record in json.load(f):
+                yield str(record['line']), record['segments']
+    else:
+        raise ValueError(f"Unsupported line list format: {extension}")
+
+
+def _read_csv(path):
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f)
+        material_keys = [key for key in reader.fieldnames if key not in _CSV_COLUMNS]
+        line_id, rows = None, []
+        for row in reader:
+            if row['line'] != line_id and rows:
+                yield line_id, _csv_segments(rows, material_keys)
+                rows = []
+            line_id = row['line']
+            rows.append(row)
+        if rows:
+            yield line_id, _csv_segments(rows, material_keys)
+
+
+def _csv_segments(rows, material_keys):
+    """1ライン分のCSVの行をセグメントの辞書のリストに変換します。"""
+    values = np.array([[row[key] or 'nan' for key in ('x', 'y', 'z', 'radius')] for row in rows], dtype=float)
+    segment_ids = [row['segment'] for row in rows]
+    starts = [i for i in range(len(rows)) if i == 0 or segment_ids[i] != segment_ids[i - 1]]
+    segments = []
+    for start, stop in zip(starts, starts[1:] + [len(rows)]):
+        first = rows[start]
+        segments.append({
+            'points': values[start:stop, :3],
+            'radius': values[start + 1:stop - 1, 3],
+            'step': float(first['step']),
+            'material': {key: float(first[key]) for key in material_keys if first[key]},
+        })
+    return segments
+
+
+def classify_corners(points, radius):
+    """
+    経路の各区間長と各角の種類を `PipePath._create_node_path` と同じ判定で一括計算します。
+
+    Args:
+        points (np.ndarray): (n_points, 3) の経路の点。
+        radius (float or np.ndarray): 曲げ半径。スカラーまたは角ごとの配列。
+
+    Returns:
+        dict: 'leg_length' ((n_points - 1,) の区間長), 'corner_type' ((n_points - 2,) の角の種類 CORNER_*),
+              'reversal' (折り返しの角), 'tangent_length' (円弧の接点までの距離、円弧以外は0) を持つ辞書。
+    """
+    points = np.asarray(points, dtype=float)
+    legs = np.diff(points, axis=0)
+    leg_length = np.linalg.norm(legs, axis=1)
+    n_corners = max(points.shape[0] - 2, 0)
+    radius = np.broadcast_to(np.asarray(radius, dtype=float), (n_corners,))
+
+    v1, v2 = -legs[:-1], legs[1:]
+    norm_v1, norm_v2 = leg_length[:-1], leg_length[1:]
+    skipped = (norm_v1 < 1e-9) | (norm_v2 < 1e-9)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        dot_product = np.einsum('ij,ij->i', v1, v2) / (norm_v1 * norm_v2)
+        chord = points[2:] - points[:-2]
+        chord_sq = np.einsum('ij,ij->i', chord, chord)
+        cross = np.cross(chord, points[1:-1] - points[:-2])
+        collinear = (chord_sq > 1e-12) & (np.einsum('ij,ij->i', cross, cross) / chord_sq < 1e-12)
+        angle = np.arccos(np.clip(dot_product, -1.0, 1.0))
+        tangent_length = radius / np.tan(angle / 2)
+
+    u_bend = np.isclose(dot_product, -1.0) & ~collinear
+    straight = ~u_bend & (np.isclose(dot_product, 1.0) | collinear)
+    corner_type = np.select([skipped, u_bend, straight], [CORNER_SKIPPED, CORNER_U_BEND, CORNER_STRAIGHT],
+                            CORNER_FILLET)
+    return {
+        'leg_length': leg_length,
+        'corner_type': corner_type,
+        'reversal': ~skipped & np.isclose(dot_product, 1.0),
+        'tangent_length': np.where(corner_type == CORNER_FILLET, tangent_length, 0.0),
+    }
+
+
+def validate_segments(segments, line_id=''):
+    """
+    セグメントの経路を検証し、問題があれば ValueError を送出します。
+
+    長さ0の区間、折り返し（180度の角で経路が重なるもの）、曲げ半径が正でない曲げ、
+    隣り合う円弧の接点が区間内に収まらない区間、前のセグメントの終点と始点が一致しないセグメントを検出します。
+
+    Args:
+        segments (list): セグメントの辞書のリスト。
+        line_id (str, optional): エラーメッセージに含めるラインの識別子。 Defaults to ''.
+    """
+    errors = []
+    previous_end = None
+    for k, segment in enumerate(segments):
+        points = np.asarray(segment['points'], dtype=float)
+        if points.ndim != 2 or points.shape[0] < 2 or points.shape[1] != 3 or not np.all(np.isfinite(points)):
+            errors.append(f"segment {k}: points must be a finite (n >= 2, 3) array")
+            continue
+        if previous_end is not None and not np.allclose(points[0], previous_end):
+            errors.append(f"segment {k}: start point does not match the end of the previous segment")
+        previous_end = points[-1]
+
+        corners = classify_corners(points, segment['radius'])
+        bend = np.isin(corners['corner_type'], (CORNER_FILLET, CORNER_U_BEND))
+        radius = np.broadcast_to(np.asarray(segment['radius'], dtype=float), bend.shape)
+        tangent = np.concatenate(([0.0], corners['tangent_length'], [0.0]))
+        checks = {
+            'zero-length legs': np.flatnonzero(corners['leg_length'] < 1e-9),
+            '180 degree reversals at corners': np.flatnonzero(corners['reversal']) + 1,
+            'non-positive bend radius at corners': np.flatnonzero(bend & ~(radius > 0)) + 1,
+            'bends overlapping on legs': np.flatnonzero(tangent[:-1] + tangent[1:]
+                                                        > corners['leg_length'] * (1 + 1e-9)),
+        }
+        errors.extend(f"segment {k}: {name} {indices.tolist()}" for name, indices in checks.items() if indices.size)
+    if errors:
+        raise ValueError(f"Invalid line list {line_id}: " + '; '.join(errors))
+
+
+def build_pipe(segments, material=None):
+    """
+    セグメントの辞書のリストから `Pipe` を構築します。
+
+    Args:
+        segments (list): セグメントの辞書のリスト。
+        material (dict, optional): セグメントで指定されていない材料特性の既定値。 Defaults to None.
+
+    Returns:
+        Pipe: 構築したPipeオブジェクト。
+    """
+    pipe = Pipe()
+    for segment in segments:
+        radius = segment['radius']
+        radius = float(radius) if np.ndim(radius) == 0 else np.asarray(radius, dtype=float)
+        path = PipePath(np.asarray(segment['points'], dtype=float), radius, segment['step'])
+        pipe.add_pipe_segment(path, {**(material or {}), **segment.get('material', {})})
+    return pipe
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """ファイル内容のSHA-256を逐次計算します。"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_key(path, material):
+    """ファイル内容、既定の材料特性、保存形式のバージョンからキャッシュのキーを作成します。"""
+    settings = json.dumps({'material': material or {}, 'version': FORMAT_VERSION}, sort_keys=True)
+    return hashlib.sha256((file_hash(path) + settings).encode('utf-8')).hexdigest()
+
+
+def _load_cached(directory):
+    with open(os.path.join(directory, _CACHE_INDEX)) as f:
+        line_ids = json.load(f)
+    return {line_id: load_model(os.path.join(directory, f'line_{i:05d}')) for i, line_id in enumerate(line_ids)}
+
+
+def _import_file_job(job):
+    path, material, cache_directory = job
+    pipes = {}
+    for line_id, segments in read_line_lists(path):
+        validate_segments(segments, line_id)
+        pipes[line_id] = build_pipe(segments, material)
+
+    if cache_directory is not None:
+        # 書き込み途中のキャッシュを読まないよう、一時ディレクトリに保存してから置き換える
+        parent = os.path.dirname(cache_directory)
+        staging = tempfile.mkdtemp(dir=parent)
+        for i, pipe in enumerate(pipes.values()):
+            save_model(pipe, os.path.join(staging, f'line_{i:05d}'))
+        with open(os.path.join(staging, _CACHE_INDEX), 'w') as f:
+            json.dump(list(pipes), f)
+        try:
+            os.rename(staging, cache_directory)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+    return pipes
+
+
+def import_line_lists(paths, material=None, cache_dir=None, max_workers=None):
+    """
+    複数のラインリストのファイルを検証し、ラインごとの `Pipe` をプロセスプールで構築します。
+
+    cache_dir を指定した場合、離散化済みのモデルをファイル内容のハッシュ値をキーとして
+    `serialization.save_model` の形式で保存し、内容が変わっていないファイルは
+    再計算せずにメモリマップで読み込みます。
+    同じラインの識別子が複数のファイルに含まれる場合はエラーとなります。
+
+    Args:
+        paths (list of str): ラインリストのファイルパス（形式は `read_line_lists` を参照）。
+        material (dict, optional): ファイルで指定されていない材料特性の既定値。 Defaults to None.
+        cache_dir (str, optional): キャッシュディレクトリ。 Defaults to None.
+        max_workers (int, optional): ワーカープロセス数。1の場合は現在のプロセスで順に処理します。
+                                     Defaults to None.
+
+    Returns:
+        dict: ラインの識別子をキー、Pipeを値とする辞書（ファイルの順）。
+    """
+    results = [None] * len(paths)
+    jobs, job_indices = [], []
+    for i, path in enumerate(paths):
+        cache_directory = None
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            cache_directory = os.path.join(cache_dir, _cache_key(path, material))
+            if os.path.isdir(cache_directory):
+                results[i] = _load_cached(cache_directory)
+                continue
+        jobs.append((path, material, cache_directory))
+        job_indices.append(i)
+
+    if max_workers == 1 or len(jobs) <= 1:
+        imported = [_import_file_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            imported = list(executor.map(_import_file_job, jobs))
+    for i, pipes in zip(job_indices, imported):
+        results[i] = pipes
+
+    pipes, sources = {}, {}
+    for path, file_pipes in zip(paths, results):
+        for line_id, pipe in file_pipes.items():
+            if line_id in sources:
+                raise ValueError(f"Duplicate line id {line_id}: found in {sources[line_id]} and {path}")
+            sources[line_id] = path
+            pipes[line_id] = pipe
+    return pipes
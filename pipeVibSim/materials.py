@@ -3,7 +3,8 @@ import numpy as np
 import sdynpy as sdpy
 
 
-def get_material_properties(E, rho, nu, D_out, D_in, n_elements, thickness=None):
+def get_material_properties(E, rho, nu, D_out, D_in, n_elements, thickness=None,
+                            fluid_density=None, flow_velocity=0.0, internal_pressure=0.0):
     """
     円筒管の材料特性と断面特性を返します。
 
@@ -15,6 +16,9 @@ def get_material_properties(E, rho, nu, D_out, D_in, n_elements, thickness=None)
         D_in (float or np.ndarray): 内径 (m)。スカラーまたは(n_elements,)配列。
         n_elements (int): 要素数。
         thickness (float or np.ndarray, optional): 肉厚 (m)。D_inの代わりに指定可能。
+        fluid_density (float or np.ndarray, optional): 内部流体の密度 (kg/m^3)。指定した場合のみ流体特性を追加します。
+        flow_velocity (float or np.ndarray, optional): 内部流体の流速 (m/s)。 Defaults to 0.0.
+        internal_pressure (float or np.ndarray, optional): 内圧 (Pa)。 Defaults to 0.0.
 
     Returns:
         dict: 材料特性と断面特性の辞書。
@@ -35,5 +39,10 @@ def get_material_properties(E, rho, nu, D_out, D_in, n_elements, thickness=None)
         props['thickness'] = thickness
     else:
         props['thickness'] = (np.asarray(D_out) - np.asarray(D_in)) / 2
+    # 流体特性は指定された場合のみ追加
+    if fluid_density is not None:
+        props['fluid_density'] = fluid_density
+        props['flow_velocity'] = flow_velocity
+        props['internal_pressure'] = internal_pressure
 
     return props
\ No newline at end of file
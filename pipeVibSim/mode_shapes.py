@@ -0,0 +1,175 @@
+import numpy as np
+
+import sdynpy as sdpy
+
+
+def _coordinate_keys(coordinate):
+    """座標配列を節点番号と方向（符号なし）から成る整数キーと符号に変換します。"""
+    node = np.asarray(coordinate.node, dtype=np.int64)
+    direction = np.asarray(coordinate.direction, dtype=np.int64)
+    return node * 10 + np.abs(direction), np.where(direction < 0, -1.0, 1.0)
+
+
+class CompactModeShapes:
+    """
+    メモリ使用量を抑えた形式でモード形状を保持するクラス。
+
+    モード形状は (モード数, 自由度数) の係数行列、または切断SVDの係数と基底の積
+    coefficients @ basis として保持します。sdynpyのShapeArrayと同様に、
+    座標配列による値の取得 (`shapes[coordinates]`)、整数やスライスによるモードの選択、
+    `frequency`, `damping`, `size` を使用できるため、FRF計算やプロットでそのまま利用できます。
+    完全なShapeArrayは `to_shape_array` で必要になった時点で再構築されます。
+
+    Args:
+        coordinate: 保持する自由度のsdynpy座標配列。
+        frequency (np.ndarray): 固有振動数 (Hz)。
+        damping (np.ndarray): モード減衰比。
+        coefficients (np.ndarray): (モード数, 自由度数) のモード形状、またはSVD使用時は (モード数, ランク) の係数。
+        basis (np.ndarray, optional): SVD使用時の (ランク, 自由度数) の基底。 Defaults to None.
+        full_coordinate (optional): 再構築時に使用する元の全自由度の座標配列。 Defaults to None.
+    """
+
+    def __init__(self, coordinate, frequency, damping, coefficients, basis=None, full_coordinate=None):
+        self.coordinate = coordinate
+        self.frequency = frequency
+        self.damping = damping
+        self.coefficients = coefficients
+        self.basis = basis
+        self.full_coordinate = coordinate if full_coordinate is None else full_coordinate
+        keys, self._signs = _coordinate_keys(coordinate)
+        self._order = np.argsort(keys)
+        self._sorted_keys = keys[self._order]
+        self._shape_array = None
+
+    @property
+    def size(self):
+        """モード数。"""
+        return int(np.size(self.frequency))
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def nbytes(self):
+        """モード形状の保持に使用しているバイト数。"""
+        return self.coefficients.nbytes + (0 if self.basis is None else self.basis.nbytes)
+
+    @property
+    def shape_matrix(self):
+        """(モード数, 保持している自由度数) のモード形状行列（倍精度）。"""
+        return self._values(slice(None))
+
+    def _values(self, columns):
+        """保持している自由度のうち columns 列のモード形状を倍精度で返します。"""
+        if self.basis is None:
+            return np.asarray(self.coefficients[..., columns], dtype=np.result_type(self.coefficients, np.float64))
+        return (np.asarray(self.coefficients, dtype=np.result_type(self.coefficients, np.float64))
+                @ self.basis[:, columns])
+
+    def _positions(self, coordinates):
+        """座標配列のキーの保持自由度内での位置、保持されているかどうか、符号を返します。"""
+        keys, signs = _coordinate_keys(coordinates)
+        positions = np.clip(np.searchsorted(self._sorted_keys, keys), 0, self._sorted_keys.size - 1)
+        return positions, self._sorted_keys[positions] == keys, signs
+
+    def is_stored(self, coordinates):
+        """
+        座標配列の各自由度が保持されているかどうかを返します。
+
+        Args:
+            coordinates: sdynpyの座標配列。
+
+        Returns:
+            np.ndarray: coordinates と同じ形状のブール配列。
+        """
+        return self._positions(coordinates)[1]
+
+    def _columns(self, coordinates):
+        """座標配列に対応する保持自由度の列インデックスと符号を返します。"""
+        positions, stored, signs = self._positions(coordinates)
+        if not np.all(stored):
+            raise ValueError("Requested coordinates are not stored in the compact mode shapes.")
+        columns = self._order[positions]
+        return columns, signs * self._signs[columns]
+
+    def __getitem__(self, key):
+        if isinstance(key, sdpy.CoordinateArray):
+            columns, signs = self._columns(key)
+            values = self._values(columns.ravel()) * signs.ravel()
+            return values.reshape(values.shape[:-1] + key.shape)
+        return CompactModeShapes(self.coordinate, self.frequency[key], self.damping[key], self.coefficients[key],
+                                 self.basis, self.full_coordinate)
+
+    def combine(self, weights, frequency):
+        """
+        既存モードの線形結合で新しいモード形状を作成します。
+
+        SVD形式では係数のみを変換するため、コストはモード数とランクにのみ依存します。
+
+        Args:
+            weights (np.ndarray): (新しいモード数, モード数) の結合係数。
+            frequency (np.ndarray): 新しい固有振動数 (Hz)。
+
+        Returns:
+            CompactModeShapes: 新しいモード形状。
+        """
+        coefficients = (weights @ self.coefficients).astype(self.coefficients.dtype)
+        return CompactModeShapes(self.coordinate, np.asarray(frequency, dtype=float),
+                                 np.zeros(np.shape(frequency)), coefficients, self.basis, self.full_coordinate)
+
+    def to_shape_array(self):
+        """
+        完全なsdynpyのShapeArrayを再構築して返します。結果はキャッシュされます。
+
+        保持していない自由度（節点の部分集合や回転自由度を除いた場合）の値は0になります。
+        """
+        if self._shape_array is None:
+            full = np.zeros(np.shape(self.frequency) + (self.full_coordinate.size,),
+                            dtype=np.result_type(self.coefficients, np.float64))
+            positions, stored, signs = self._positions(self.full_coordinate)
+            columns = self._order[positions[stored]]
+            full[..., stored] = self._values(columns) * (signs[stored] * self._signs[columns])
+            self._shape_array = sdpy.shape_array(self.full_coordinate, full, self.frequency, self.damping)
+        return self._shape_array
+
+
+def compress_mode_shapes(shapes, dtype=np.float32, nodes=None, translations_only=False, rank=None):
+    """
+    sdynpyの固有値解析結果を省メモリ形式の `CompactModeShapes` に変換します。
+
+    切断SVDはランクがモード数より小さい場合に近似となるため、
+    多数のモードを保持した大規模モデルで精度を確認した上で使用してください。
+
+    Args:
+        shapes: sdynpyの固有値解析結果。
+        dtype (np.dtype, optional): 保持する数値型。複素モードの場合は対応する複素数型になります。
+                                    Defaults to np.float32.
+        nodes (array-like, optional): 保持する節点のインデックス（0始まり）。Noneの場合は全節点。 Defaults to None.
+        translations_only (bool, optional): Trueの場合は並進3自由度のみ保持します。 Defaults to False.
+        rank (int, optional): 切断SVDのランク。Noneの場合はSVD圧縮を行いません。 Defaults to None.
+
+    Returns:
+        CompactModeShapes: 圧縮されたモード形状。
+    """
+    full_coordinate = shapes.coordinate.reshape(-1, shapes.coordinate.shape[-1])[0]
+    matrix = np.asarray(shapes.shape_matrix).reshape(-1, full_coordinate.size)
+    if np.iscomplexobj(matrix):
+        dtype = np.result_type(dtype, np.complex64)
+
+    keep = np.ones(full_coordinate.size, dtype=bool)
+    if nodes is not None:
+        keep &= np.isin(np.asarray(full_coordinate.node), np.asarray(nodes) + 1)
+    if translations_only:
+        keep &= np.abs(np.asarray(full_coordinate.direction)) <= 3
+    coordinate = full_coordinate[keep]
+    matrix = matrix[:, keep]
+
+    basis = None
+    if rank is not None:
+        u, s, vt = np.linalg.svd(matrix, full_matrices=False)
+        matrix = u[:, :rank] * s[:rank]
+        basis = vt[:rank].astype(dtype)
+
+    return CompactModeShapes(coordinate, np.asarray(shapes.frequency, dtype=float).ravel(),
+                             np.asarray(shapes.damping, dtype=float).ravel(), matrix.astype(dtype), basis,
+                             full_coordinate)
@@ -0,0 +1,214 @@
+import functools
+import os
+
+import numpy as np
+import scipy.linalg
+import scipy.sparse as sps
+import scipy.sparse.linalg as spla
+from scipy.optimize import differential_evolution
+
+from . import elements
+from .parallel import shared_executor, shared_object
+
+# この自由度数以下の場合は密行列で固有値解析を行う
+_DENSE_EIGEN_SIZE = 600
+
+class SupportSizingProblem:
+    """
+    支持位置と肉厚の設計問題。
+
+    1つの組み立て済みのシステム（拘束・ばね・集中質量・流体を含む）を基準とし、候補ごとに
+    肉厚の変化分の要素行列のみを重ね合わせ、追加の支持は状態座標の自由度を削除して反映します。
+    内部流体がある場合は、肉厚による内径の変化に応じて流体の付加質量と遠心力・内圧による剛性も更新します。
+    システムの再構築や `VibrationAnalysis` の作成は行いません。
+
+    Args:
+        analysis (VibrationAnalysis): 基準となる解析オブジェクト。
+        forbidden_bands (array-like): (n_bands, 2) の固有振動数を避ける周波数帯 (Hz)。
+                                      例えばポンプの運転周波数 f の±20%は (0.8 f, 1.2 f)。
+        candidate_coordinates (np.ndarray): (n_candidates, 3) の支持を置ける座標。最も近い節点に置かれます。
+        support_dofs (list, optional): 支持で拘束する節点内の自由度。 Defaults to (0, 1, 2).
+        thickness_groups (np.ndarray, optional): 要素ごとの肉厚グループ番号 (0, 1, ...)。
+                                                 Noneの場合は全要素を1グループとします。 Defaults to None.
+        num_modes (int, optional): 評価する低次モードの数。 Defaults to 6.
+    """
+
+    def __init__(self, analysis, forbidden_bands, candidate_coordinates, support_dofs=(0, 1, 2),
+                 thickness_groups=None, num_modes=6):
+        self.forbidden_bands = np.atleast_2d(np.asarray(forbidden_bands, dtype=float))
+        self.num_modes = num_modes
+        self.stiffness = sps.csr_matrix(analysis.system.stiffness)
+        self.mass = sps.csr_matrix(analysis.system.mass)
+        self.transformation = analysis._transformation_matrix()
+        self.node_connectivity = analysis.pipe.node_connectivity
+        self.n_nodes = analysis.pipe.node_positions.shape[0]
+
+        props = analysis.pipe.material_properties
+        n_elements = self.node_connectivity.shape[0]
+        self.material = {key: elements.element_values(props[key], n_elements)
+                         for key in ('young_modulus', 'poisson_ratio', 'density', 'outer_diameter')}
+        self.nominal_thickness = elements.element_values(props['thickness'], n_elements)
+        self.thickness_groups = (np.zeros(n_elements, dtype=int) if thickness_groups is None
+                                 else np.asarray(thickness_groups, dtype=int))
+        self.n_groups = int(self.thickness_groups.max()) + 1
+
+        self.lengths, rotations = analysis._element_geometry()
+        self._unit_stiffness, self._unit_mass = elements.unit_component_matrices(self.lengths, rotations)
+
+        # 流体の付加質量 ρ_f A_i と剛性 -(ρ_f U² + p) A_i は内部断面積 A_i に比例するため、成分として追加する
+        self.fluid = None
+        if analysis.fluid_matrices is not None:
+            self.fluid = {key: elements.element_values(props.get(key, 0.0), n_elements, default=0.0)
+                          for key in ('fluid_density', 'flow_velocity', 'internal_pressure')}
+            fluid_stiffness, fluid_mass = elements.unit_fluid_matrices(self.lengths, rotations)
+            self._unit_stiffness = np.concatenate((self._unit_stiffness, fluid_stiffness[:, np.newaxis]), axis=1)
+            self._unit_mass = np.concatenate((self._unit_mass, fluid_mass[:, np.newaxis]), axis=1)
+        self._nominal_stiffness, self._nominal_mass = self.section_components(self.nominal_thickness)
+
+        # 候補ごとに削除する状態座標の自由度
+        self.candidate_nodes = analysis._nearest_nodes(candidate_coordinates)
+        self.candidate_positions = analysis.pipe.node_positions[self.candidate_nodes]
+        rows = self.transformation[(6 * self.candidate_nodes[:, np.newaxis] + np.asarray(support_dofs)).ravel()]
+        dofs_per_candidate = len(support_dofs)
+        self._candidate_state_dofs = [rows[i * dofs_per_candidate:(i + 1) * dofs_per_candidate].indices
+                                      for i in range(self.candidate_nodes.size)]
+        self.reference_mass = float(np.sum(self._nominal_mass[:, 0] * self.lengths))
+
+    def section_components(self, thickness):
+        """
+        要素ごとの肉厚から剛性成分と質量成分を計算します。
+
+        内部流体がある場合は、剛性成分に流体の剛性の係数、質量成分に流体の線密度が末尾に加わります。
+        """
+        stiffness, mass = elements.pipe_section_components(self.material['young_modulus'],
+                                                           self.material['poisson_ratio'], self.material['density'],
+                                                           self.material['outer_diameter'], thickness)
+        if self.fluid is None:
+            return stiffness, mass
+        fluid_stiffness, fluid_mass = elements.fluid_section_components(self.material['outer_diameter'], thickness,
+                                                                        **self.fluid)
+        return (np.concatenate((stiffness, fluid_stiffness[:, np.newaxis]), axis=1),
+                np.concatenate((mass, fluid_mass[:, np.newaxis]), axis=1))
+
+    def element_thickness(self, group_thickness):
+        """グループごとの肉厚を要素ごとの肉厚に展開します。"""
+        return np.asarray(group_thickness, dtype=float)[self.thickness_groups]
+
+    def evaluate(self, group_thickness, support_indices):
+        """
+        1つの設計候補の固有振動数と配管質量を計算します。
+
+        Args:
+            group_thickness (np.ndarray): (n_groups,) のグループごとの肉厚。
+            support_indices (list of int): 支持を置く候補のインデックス。
+
+        Returns:
+            dict: 'frequency' (低次の固有振動数 Hz), 'mass' (配管の質量 kg),
+                  'violation' (禁止帯への侵入量の和を帯の上限で正規化した値) を持つ辞書。
+        """
+        stiffness_components, mass_components = self.section_components(self.element_thickness(group_thickness))
+        transformation = self.transformation
+
+        def updated(matrix, unit, components, nominal):
+            delta = np.einsum('ec,ecij->eij', components - nominal, unit, optimize=True)
+            physical = elements.assemble(delta, self.node_connectivity, self.n_nodes)
+            return matrix + transformation.T @ physical @ transformation
+
+        stiffness = updated(self.stiffness, self._unit_stiffness, stiffness_components, self._nominal_stiffness)
+        mass = updated(self.mass, self._unit_mass, mass_components, self._nominal_mass)
+
+        fixed = [self._candidate_state_dofs[i] for i in support_indices]
+        keep = np.setdiff1d(np.arange(stiffness.shape[0]), np.concatenate(fixed) if fixed else [])
+        stiffness = stiffness[keep][:, keep]
+        mass = mass[keep][:, keep]
+        num_modes = min(self.num_modes, keep.size)
+        if keep.size <= _DENSE_EIGEN_SIZE:
+            eigenvalues = scipy.linalg.eigh(stiffness.toarray(), mass.toarray(), eigvals_only=True,
+                                            subset_by_index=[0, num_modes - 1])
+        else:
+            # 剛体モードがあっても分解できるよう、負のシフトで低次モードを求める
+            eigenvalues = np.sort(spla.eigsh(stiffness.tocsc(), k=num_modes, M=mass.tocsc(), sigma=-1.0,
+                                             which='LM', return_eigenvectors=False))
+        frequency = np.sqrt(np.maximum(eigenvalues, 0.0)) / (2 * np.pi)
+
+        low, high = self.forbidden_bands[:, 0], self.forbidden_bands[:, 1]
+        penetration = np.minimum(frequency[:, np.newaxis] - low, high - frequency[:, np.newaxis])
+        return {
+            'frequency': frequency,
+            'mass': float(np.sum(mass_components[:, 0] * self.lengths)),
+            'violation': float(np.sum(np.maximum(penetration, 0.0) / high)),
+        }
+
+    def split(self, x):
+        """設計変数ベクトルをグループごとの肉厚と支持候補のインデックスに分けます。"""
+        x = np.asarray(x, dtype=float)
+        return x[:self.n_groups], np.rint(x[self.n_groups:]).astype(int)
+
+    def fitness(self, x, penalty=10.0):
+        """質量を基準モデルの質量で正規化した値に、禁止帯への侵入量のペナルティを加えた目的関数。"""
+        result = self.evaluate(*self.split(x))
+        return result['mass'] / self.reference_mass + penalty * result['violation']
+
+
+def _worker_fitness(x, penalty):
+    return shared_object().fitness(x, penalty)
+
+
+def optimize_supports_and_thickness(analysis, forbidden_bands, candidate_coordinates, n_supports, thickness_bounds,
+                                    support_dofs=(0, 1, 2), thickness_groups=None, num_modes=6, penalty=10.0,
+                                    maxiter=100, popsize=15, max_workers=1, seed=None):
+    """
+    固有振動数が禁止帯に入らず、配管質量が最小となる支持位置と肉厚を探索します。
+
+    支持位置（候補のインデックス、整数変数）とグループごとの肉厚（連続変数）を設計変数とし、
+    scipyの差分進化法で探索します。各世代の候補は `SupportSizingProblem` を共有する
+    プロセスプールで並列に評価され、基準モデルは各ワーカーに1度だけ送られます。
+
+    Args:
+        analysis (VibrationAnalysis): 基準となる解析オブジェクト。
+        forbidden_bands (array-like): (n_bands, 2) の固有振動数を避ける周波数帯 (Hz)。
+        candidate_coordinates (np.ndarray): (n_candidates, 3) の支持を置ける座標。
+        n_supports (int): 追加する支持の数。
+        thickness_bounds (tuple): 肉厚の (下限, 上限)。
+        support_dofs (list, optional): 支持で拘束する節点内の自由度。 Defaults to (0, 1, 2).
+        thickness_groups (np.ndarray, optional): 要素ごとの肉厚グループ番号。 Defaults to None.
+        num_modes (int, optional): 評価する低次モードの数。 Defaults to 6.
+        penalty (float, optional): 禁止帯への侵入量に対するペナルティ係数。 Defaults to 10.0.
+        maxiter (int, optional): 最大世代数。 Defaults to 100.
+        popsize (int, optional): 設計変数あたりの個体数。 Defaults to 15.
+        max_workers (int, optional): ワーカープロセス数。1の場合は現在のプロセスで順に評価します。
+                                     Defaults to 1.
+        seed (int, optional): 乱数のシード。 Defaults to None.
+
+    Returns:
+        dict: 'thickness' (要素ごとの肉厚), 'group_thickness', 'support_indices',
+              'support_coordinates' (支持を置く節点座標), 'frequency', 'mass', 'violation',
+              'feasible' (禁止帯に固有振動数が無いか), 'n_evaluations', 'result' (scipyの最適化結果) を持つ辞書。
+    """
+    problem = SupportSizingProblem(analysis, forbidden_bands, candidate_coordinates, support_dofs=support_dofs,
+                                   thickness_groups=thickness_groups, num_modes=num_modes)
+    bounds = [tuple(thickness_bounds)] * problem.n_groups + [(0, problem.candidate_nodes.size - 1)] * n_supports
+    options = dict(args=(penalty,), maxiter=maxiter, popsize=popsize, polish=False, updating='deferred',
+                   integrality=[False] * problem.n_groups + [True] * n_supports, seed=seed)
+
+    with shared_executor(problem, max_workers) as executor:
+        workers = 1
+        if executor is not None:
+            chunksize = max(popsize * len(bounds) // (4 * (max_workers or os.cpu_count())), 1)
+            workers = functools.partial(executor.map, chunksize=chunksize)
+        result = differential_evolution(_worker_fitness, bounds, workers=workers, **options)
+
+    group_thickness, support_indices = problem.split(result.x)
+    evaluation = problem.evaluate(group_thickness, support_indices)
+    return {
+        'thickness': problem.element_thickness(group_thickness),
+        'group_thickness': group_thickness,
+        'support_indices': support_indices,
+        'support_coordinates': problem.candidate_positions[np.unique(support_indices)],
+        'frequency': evaluation['frequency'],
+        'mass': evaluation['mass'],
+        'violation': evaluation['violation'],
+        'feasible': evaluation['violation'] == 0.0,
+        'n_evaluations': result.nfev,
+        'result': result,
+    }
@@ -0,0 +1,43 @@
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+
+# ワーカープロセスで共有するオブジェクト
+_SHARED_OBJECT = None
+
+
+def _set_shared_object(value):
+    global _SHARED_OBJECT
+    _SHARED_OBJECT = value
+
+
+def shared_object():
+    """`shared_executor` で共有したオブジェクトを返します。ワーカー関数から使用します。"""
+    return _SHARED_OBJECT
+
+
+@contextlib.contextmanager
+def shared_executor(value, max_workers=None):
+    """
+    大きなオブジェクトを各ワーカープロセスに1度だけ送るプロセスプールを作成します。
+
+    ワーカー関数は引数の代わりに `shared_object` でオブジェクトを受け取ります。
+    max_workers が1の場合はプールを作成せず、現在のプロセスにオブジェクトを設定して None を返します。
+
+    Args:
+        value: ワーカーで共有するオブジェクト。
+        max_workers (int, optional): ワーカープロセス数。 Defaults to None.
+
+    Yields:
+        concurrent.futures.ProcessPoolExecutor or None: プロセスプール。max_workers が1の場合は None。
+    """
+    if max_workers == 1:
+        previous = _SHARED_OBJECT
+        _set_shared_object(value)
+        try:
+            yield None
+        finally:
+            _set_shared_object(previous)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_set_shared_object,
+                                 initargs=(value,)) as executor:
+            yield executor
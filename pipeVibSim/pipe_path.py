@@ -28,6 +28,35 @@ class PipePath:
         self.node_connectivity = self._get_node_connectivity()
         self.bend_direction = self._get_bend_direction()
 
+    @classmethod
+    def from_arrays(cls, points, radius, step, node_positions, curvatures,
+                    node_connectivity=None, bend_direction=None):
+        """
+        計算済みの配列からPipePathを構築します。離散化は再計算しません。
+
+        Args:
+            points (np.ndarray): 配管の経路を定義する3D座標点の配列。
+            radius (np.ndarray): 角ごとの曲げ半径の配列。
+            step (float): 配管の離散化ステップサイズ。
+            node_positions (np.ndarray): 節点座標。
+            curvatures (np.ndarray): 要素ごとの曲率。
+            node_connectivity (np.ndarray, optional): 節点接続情報。Noneの場合は節点座標から作成します。
+            bend_direction (np.ndarray, optional): 要素ごとの曲げ方向。Noneの場合は節点座標から計算します。
+
+        Returns:
+            PipePath: 構築したPipePathオブジェクト。
+        """
+        path = cls.__new__(cls)
+        path.points = points
+        path.radius = radius
+        path.step = step
+        path.node_positions = node_positions
+        path.curvatures = curvatures
+        path._leg_node_offsets = None
+        path.node_connectivity = node_connectivity if node_connectivity is not None else path._get_node_connectivity()
+        path.bend_direction = bend_direction if bend_direction is not None else path._get_bend_direction()
+        return path
+
     def _rotation_matrix(self, axis, theta):
         """ロドリゲスの回転公式を用いて回転行列を計算します。"""
         axis = axis / np.linalg.norm(axis)
@@ -69,12 +98,41 @@ class PipePath:
     def _create_node_path(self):
         """完全なノードパス（節点座標）と各要素の曲率を構築します。"""
         if len(self.points) < 2:
+            self._leg_node_offsets = None
             return np.array(self.points), np.array([])
 
-        node_positions = [self.points[0]]
+        node_positions, curvatures, self._leg_node_offsets = self._walk_points(self.points[0], 1, len(self.points))
+        return np.array(node_positions), np.array(curvatures)
+
+    def _walk_points(self, first_node, start, stop):
+        """
+        `points[start:stop]` を順に処理してノードパスを延長します。
+
+        各点の処理は直前の節点と前後の点のみに依存するため、
+        途中の節点から離散化を再開できます。
+
+        Args:
+            first_node (np.ndarray): 延長を開始する節点座標。
+            start (int): 最初に処理する点のインデックス。
+            stop (int): 処理を終える点のインデックス（この点は含まない）。
+
+        Returns:
+            tuple: (node_positions, curvatures, leg_node_offsets)
+                   leg_node_offsets[k] は点 start+k を処理する直前の節点数。
+        """
+        node_positions = [first_node]
         curvatures = []
+        leg_node_offsets = []
+        last = len(self.points) - 1
+
+        for i in range(start, stop):
+            leg_node_offsets.append(len(node_positions))
+            if i == last:
+                seg = np.linspace(node_positions[-1], self.points[-1], int(np.linalg.norm(self.points[-1] - node_positions[-1]) / self.step) + 1)[1:]
+                node_positions.extend(seg)
+                curvatures.extend([0.0] * len(seg))
+                continue
 
-        for i in range(1, len(self.points) - 1):
             p_prev = self.points[i - 1]
             p_curr = self.points[i]
             p_next = self.points[i + 1]
@@ -148,10 +206,7 @@ class PipePath:
                 
                 node_positions[-1] = pt2
 
-        seg = np.linspace(node_positions[-1], self.points[-1], int(np.linalg.norm(self.points[-1] - node_positions[-1]) / self.step) + 1)[1:]
-        node_positions.extend(seg)
-        curvatures.extend([0.0] * len(seg))
-        return np.array(node_positions), np.array(curvatures)
+        return node_positions, curvatures, leg_node_offsets
 
     def _get_node_connectivity(self):
         """節点接続情報を作成します。"""
@@ -160,29 +215,31 @@ class PipePath:
 
     def _get_bend_direction(self):
         """各要素の接線ベクトルから法線方向（ローカルz軸）を決定します。"""
-        bend_direction_1 = []
-        for i in range(self.node_connectivity.shape[0]):
-            start, end = self.node_connectivity[i]
-            tangent = self.node_positions[end] - self.node_positions[start]
-            tangent /= np.linalg.norm(tangent)
-            if i == 0:
-                bend_dir = np.array([0, 0, 1])
-            else:
-                prev_start, prev_end = self.node_connectivity[i-1]
-                prev_tangent = self.node_positions[prev_end] - self.node_positions[prev_start]
-                prev_tangent /= np.linalg.norm(prev_tangent)
-                bend_dir = np.cross(prev_tangent, tangent)
-                if np.linalg.norm(bend_dir) < 1e-8:
-                    bend_dir = bend_direction_1[-1]
-                else:
-                    bend_dir /= np.linalg.norm(bend_dir)
-            bend_direction_1.append(bend_dir)
-        return np.array(bend_direction_1)
+        n_elements = self.node_connectivity.shape[0]
+        if n_elements == 0:
+            return np.empty((0, 3))
+        start, end = self.node_connectivity.T
+        tangents = self.node_positions[end] - self.node_positions[start]
+        tangents = tangents / np.linalg.norm(tangents, axis=1, keepdims=True)
+
+        bend_direction_1 = np.empty((n_elements, 3))
+        bend_direction_1[0] = [0, 0, 1]
+        bend_direction_1[1:] = np.cross(tangents[:-1], tangents[1:])
+        norms = np.linalg.norm(bend_direction_1, axis=1)
+        valid = norms >= 1e-8
+        valid[0] = True
+        bend_direction_1[valid] /= norms[valid, None]
+        # 直線が続く要素は直前の有効な曲げ方向を引き継ぐ
+        source = np.maximum.accumulate(np.where(valid, np.arange(n_elements), 0))
+        return bend_direction_1[source]
 
     def __add__(self, other):
         """
         2つのPipePathオブジェクトを結合します。
         2つ目のPipePathの始点を1つ目の終点にオフセットして結合します。
+
+        両者の離散化結果を再利用し、結合部の角（1つ目の最終区間から
+        2つ目の最初の角まで）のみを再計算します。
         """
         if not isinstance(other, PipePath):
             return NotImplemented
@@ -206,4 +263,66 @@ class PipePath:
 
         new_radius = np.concatenate((self_radii, [joint_radius], other_radii))
 
-        return PipePath(new_points, new_radius, new_step)
+        combined = self._add_reusing_nodes(other, new_points, new_radius, offset)
+        if combined is None:
+            return PipePath(new_points, new_radius, new_step)
+        return combined
+
+    def _add_reusing_nodes(self, other, new_points, new_radius, offset):
+        """
+        既存のノード配列を再利用して結合後のPipePathを構築します。
+        再利用できない場合はNoneを返します。
+        """
+        if (self._leg_node_offsets is None or other._leg_node_offsets is None
+                or self.step != other.step):
+            return None
+
+        combined = PipePath.__new__(PipePath)
+        combined.points = new_points
+        combined.radius = new_radius
+        combined.step = self.step
+
+        n_self = len(self.points)
+        n_other = len(other.points)
+        self_offsets = self._leg_node_offsets
+        other_offsets = other._leg_node_offsets
+
+        # 1つ目の最終区間の直前までは結合点の影響を受けない
+        n_prefix = self_offsets[-1]
+        joint_nodes, joint_curvatures, joint_offsets = combined._walk_points(
+            self.node_positions[n_prefix - 1], n_self - 1, n_self + 1)
+
+        # 2つ目の最初の角以降は平行移動のみで再利用できる
+        if n_other > 2:
+            n_skip = other_offsets[1]
+            resume_node = other.node_positions[n_skip - 1] + offset
+            if not np.allclose(joint_nodes[-1], resume_node):
+                return None
+        else:
+            n_skip = len(other.node_positions)
+
+        n_joint = len(joint_nodes) - 1
+        n_suffix = len(other.node_positions) - n_skip
+        n_nodes = n_prefix + n_joint + n_suffix
+
+        node_positions = np.empty((n_nodes, 3))
+        node_positions[:n_prefix] = self.node_positions[:n_prefix]
+        node_positions[n_prefix:n_prefix + n_joint] = joint_nodes[1:]
+        node_positions[n_prefix + n_joint:] = other.node_positions[n_skip:]
+        node_positions[n_prefix + n_joint:] += offset
+
+        curvatures = np.empty(n_nodes - 1)
+        curvatures[:n_prefix - 1] = self.curvatures[:n_prefix - 1]
+        curvatures[n_prefix - 1:n_prefix - 1 + n_joint] = joint_curvatures
+        curvatures[n_prefix - 1 + n_joint:] = other.curvatures[n_skip - 1:]
+
+        combined.node_positions = node_positions
+        combined.curvatures = curvatures
+        combined._leg_node_offsets = np.concatenate((
+            self_offsets[:-1],
+            np.asarray(joint_offsets) + n_prefix - 1,
+            np.asarray(other_offsets[1:], dtype=int) - n_skip + n_prefix + n_joint,
+        )).astype(int)
+        combined.node_connectivity = combined._get_node_connectivity()
+        combined.bend_direction = combined._get_bend_direction()
+        return combined
@@ -1,8 +1,16 @@
+import os
+
 import matplotlib.pyplot as plt
 import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
 from qtpy.QtWidgets import QApplication
+import sdynpy as sdpy
 from sdynpy.core.sdynpy_geometries import MultipleShapePlotter, MultipleDeflectionShapePlotter
 
+from .mode_shapes import CompactModeShapes
+
 
 def plot_node_path(node_positions, points=None, fig=None, ax=None, color='b'):
     """
@@ -64,45 +72,227 @@ def plot_deflection_shape(geometry, frf):
     geometry.plot_deflection_shape(frf)
 
 
-def plot_frf(frf, fig=None, axes=None):
+def frf_arrays(frf):
+    """
+    sdynpyのFRFから周波数軸と (曲線数, 周波数点数) の複素応答配列を取り出します。
+
+    Args:
+        frf: sdynpyの周波数応答解析結果。
+
+    Returns:
+        tuple: (frequencies, ordinate) 周波数の1次元配列と2次元の複素応答配列。
+    """
+    ordinate = np.asarray(frf.ordinate)
+    n_frequencies = ordinate.shape[-1]
+    frequencies = np.asarray(frf.abscissa).reshape(-1, n_frequencies)[0]
+    return frequencies, ordinate.reshape(-1, n_frequencies)
+
+
+def frf_statistics(magnitude, percentiles=(5, 50, 95)):
+    """
+    複数のFRF振幅から周波数ごとの包絡線とパーセンタイルを計算します。
+
+    Args:
+        magnitude (np.ndarray): (曲線数, 周波数点数) の振幅配列。
+        percentiles (tuple of float, optional): 計算するパーセンタイル。 Defaults to (5, 50, 95).
+
+    Returns:
+        dict: 'min', 'max' と 'percentiles' ((len(percentiles), 周波数点数) の配列) を持つ辞書。
+    """
+    return {
+        'min': magnitude.min(axis=0),
+        'max': magnitude.max(axis=0),
+        'percentiles': np.percentile(magnitude, percentiles, axis=0) if len(percentiles) else np.empty((0, magnitude.shape[1])),
+    }
+
+
+def find_envelope_peaks(frequencies, envelope, n_peaks=5):
+    """
+    包絡線の極大点を振幅の大きい順に返します。
+
+    Args:
+        frequencies (np.ndarray): 周波数の配列。
+        envelope (np.ndarray): 振幅の包絡線。
+        n_peaks (int, optional): 返すピークの最大数。 Defaults to 5.
+
+    Returns:
+        np.ndarray: ピークのインデックス（振幅の降順）。
+    """
+    if envelope.size < 3 or n_peaks <= 0:
+        return np.array([], dtype=int)
+    interior = np.flatnonzero((envelope[1:-1] > envelope[:-2]) & (envelope[1:-1] >= envelope[2:])) + 1
+    order = np.argsort(envelope[interior])[::-1]
+    return interior[order[:n_peaks]]
+
+
+def summarize_frf(frf, percentiles=(5, 50, 95), n_peaks=5):
+    """
+    FRFの振幅・位相・包絡線・パーセンタイル・ピークを一括で計算します。
+
+    `plot_frf` とレポート出力で同じ計算結果を共有するために使います。
+
+    Args:
+        frf: sdynpyの周波数応答解析結果。
+        percentiles (tuple of float, optional): 計算するパーセンタイル。 Defaults to (5, 50, 95).
+        n_peaks (int, optional): 求めるピークの数。 Defaults to 5.
+
+    Returns:
+        dict: 'frequencies', 'magnitude', 'phase' ((曲線数, 周波数点数) の配列)、'percentiles'、
+              'statistics' (`frf_statistics` の結果)、'envelope' (振幅の最大値)、
+              'peaks' (包絡線のピークのインデックス) を持つ辞書。
+    """
+    frequencies, ordinate = frf_arrays(frf)
+    magnitude = np.abs(ordinate)
+    statistics = frf_statistics(magnitude, percentiles)
+    return {
+        'frequencies': frequencies,
+        'magnitude': magnitude,
+        'phase': np.angle(ordinate, deg=True),
+        'percentiles': tuple(percentiles),
+        'statistics': statistics,
+        'envelope': statistics['max'],
+        'peaks': find_envelope_peaks(frequencies, statistics['max'], n_peaks),
+    }
+
+
+def _plot_percentile_bands(ax, frequencies, statistics, percentiles, color, line_color):
+    """パーセンタイル帯と中央のパーセンタイルの線を描画します。"""
+    n_bands = len(percentiles) // 2
+    for k in range(n_bands):
+        ax.fill_between(frequencies, statistics['percentiles'][k], statistics['percentiles'][-k - 1],
+                        color=color, alpha=0.2 + 0.2 * k,
+                        label=f'{percentiles[k]:g}-{percentiles[-k - 1]:g} percentile')
+    if len(percentiles) % 2:
+        ax.plot(frequencies, statistics['percentiles'][n_bands], color=line_color,
+                label=f'{percentiles[n_bands]:g} percentile')
+
+
+def plot_frf(frf, fig=None, axes=None, percentiles=(5, 50, 95), n_peaks=0, max_curves=50, summary=None):
     """
     周波数応答関数（FRF）をプロットします。
 
+    複数の応答・参照自由度を持つFRFの場合は、振幅と位相を一括で計算し、
+    曲線数が `max_curves` 以下であれば全曲線をLineCollectionで重ね描きします。
+    さらに包絡線とパーセンタイル帯を表示します。曲線数が上限を超える場合は、
+    位相もパーセンタイル帯で表示します。
+
     Args:
         frf: sdynpyの周波数応答解析結果。
         fig (matplotlib.figure.Figure, optional): プロットするFigureオブジェクト。Noneの場合、新しいFigureを作成します。
         axes (list of matplotlib.axes.Axes, optional): プロットするAxesオブジェクトのリスト。Noneの場合、新しいAxesを作成します。
+        percentiles (tuple of float, optional): 複数曲線の場合に帯表示するパーセンタイル。 Defaults to (5, 50, 95).
+        n_peaks (int, optional): 注記するピークの数。 Defaults to 0.
+        max_curves (int, optional): 個別に描画する曲線数の上限。 Defaults to 50.
+        summary (dict, optional): `summarize_frf` の計算結果。指定した場合は frf と percentiles の代わりに
+                                  これを使い、振幅・位相を再計算しません。 Defaults to None.
 
     Returns:
         tuple: (fig, axes) FigureオブジェクトとAxesオブジェクトのリスト。
     """
     if fig is None or axes is None:
         fig, axes = plt.subplots(2, 1, figsize=(12, 6))
+    if summary is None:
+        summary = summarize_frf(frf, percentiles, n_peaks)
+
+    frequencies = summary['frequencies']
+    magnitude = summary['magnitude']
+    phase = summary['phase']
+    percentiles = summary['percentiles']
+    envelope = summary['envelope']
+
+    if magnitude.shape[0] == 1:
+        axes[0].semilogy(frequencies, envelope)
+        axes[1].plot(frequencies, phase[0])
+    else:
+        stats = summary['statistics']
+        axes[0].set_yscale('log')
+        if magnitude.shape[0] <= max_curves:
+            axes[0].add_collection(LineCollection(_curve_segments(frequencies, magnitude),
+                                                  colors='tab:blue', alpha=0.3, linewidths=0.5))
+            axes[1].add_collection(LineCollection(_curve_segments(frequencies, phase),
+                                                  colors='tab:blue', alpha=0.3, linewidths=0.5))
+        else:
+            # 個別の曲線を描かない場合は位相もパーセンタイル帯で表示
+            _plot_percentile_bands(axes[1], frequencies, frf_statistics(phase, percentiles), percentiles,
+                                   'tab:orange', 'tab:red')
+        axes[0].fill_between(frequencies, stats['min'], stats['max'], color='grey', alpha=0.2, label='Envelope')
+        _plot_percentile_bands(axes[0], frequencies, stats, percentiles, 'tab:orange', 'tab:red')
+        axes[0].plot(frequencies, envelope, color='k', linewidth=0.8)
+        axes[0].legend(loc='upper right')
+        axes[0].autoscale_view()
+        axes[1].autoscale_view()
+
+    for index in summary['peaks'][:n_peaks]:
+        axes[0].annotate(f'{frequencies[index]:.1f} Hz', xy=(frequencies[index], envelope[index]),
+                         xytext=(0, 8), textcoords='offset points', ha='center', fontsize=8)
 
-    axes[0].semilogy(frf.abscissa.flatten(), np.abs(frf.ordinate.squeeze()))
     axes[0].set_ylabel('Magnitude')
     axes[0].set_title('Frequency Response Function (FRF)')
     axes[0].grid(True)
 
-    axes[1].plot(frf.abscissa.flatten(), np.angle(frf.ordinate.squeeze(), deg=True))
     axes[1].set_xlabel('Frequency (Hz)')
     axes[1].set_ylabel('Phase (degrees)')
     axes[1].grid(True)
 
-    plt.tight_layout()
+    fig.tight_layout()
     return fig, axes
 
 
-def plot_pipe_geometry(pipe, fig=None, ax=None, cmap_name='Greys'):
+def _curve_segments(frequencies, values):
+    """(曲線数, 周波数点数) の配列をLineCollection用の (曲線数, 周波数点数, 2) 配列に変換します。"""
+    return np.stack(np.broadcast_arrays(frequencies, values), axis=-1)
+
+
+def _element_lines(node_positions, node_connectivity, max_elements=None):
+    """
+    要素の始点・終点を (n_lines, 2, 3) の配列として返します。
+
+    `max_elements` が指定され要素数がそれを超える場合は、連続する要素をまとめて
+    線分数を間引きます（要素が連続した経路であることを前提とします）。
+    """
+    n_elements = node_connectivity.shape[0]
+    if max_elements is None or n_elements <= max_elements:
+        return node_positions[node_connectivity]
+    stride = int(np.ceil(n_elements / max_elements))
+    first = np.arange(0, n_elements, stride)
+    last = np.minimum(first + stride - 1, n_elements - 1)
+    return np.stack((node_positions[node_connectivity[first, 0]],
+                     node_positions[node_connectivity[last, 1]]), axis=1)
+
+
+def _segment_element_ranges(pipe):
+    """Pipeの各セグメントに対応する要素インデックスの範囲を返します。"""
+    counts = [path.node_connectivity.shape[0] for path in pipe.pipe_paths]
+    bounds = np.concatenate(([0], np.cumsum(counts)))
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _set_equal_limits(ax, lines):
+    """全線分を含むように3D Axesの表示範囲を設定します。"""
+    points = lines.reshape(-1, 3)
+    lower = points.min(axis=0)
+    upper = points.max(axis=0)
+    center = (lower + upper) / 2
+    half = max(np.max(upper - lower) / 2, 1e-12)
+    ax.set_xlim(center[0] - half, center[0] + half)
+    ax.set_ylim(center[1] - half, center[1] + half)
+    ax.set_zlim(center[2] - half, center[2] + half)
+
+
+def plot_pipe_geometry(pipe, fig=None, ax=None, cmap_name='Greys', max_elements=None):
     """
     配管システムのジオメトリをプロットします。セグメントごとに色分けします。
 
+    各セグメントは1つのLine3DCollectionとして描画されます。
+
     Args:
         pipe (Pipe): プロットするPipeオブジェクト。
         fig (matplotlib.figure.Figure, optional): プロットするFigureオブジェクト。 Defaults to None.
         ax (matplotlib.axes.Axes, optional): プロットする3D Axesオブジェクト。 Defaults to None.
         cmap_name (str, optional): セグメントの色分けに使用するMatplotlibのカラーマップ名。Sequentialカラーマップがおすすめ
                                  'Blues', 'Reds', 'Greys'などが使用可能です。 Defaults to 'Greys'.
+        max_elements (int, optional): セグメントごとに描画する線分数の上限。超える場合は間引いて描画します。
+                                      Defaults to None.
 
     Returns:
         tuple: (fig, ax) FigureオブジェクトとAxesオブジェクト。
@@ -135,45 +325,139 @@ def plot_pipe_geometry(pipe, fig=None, ax=None, cmap_name='Greys'):
         color_val = color_start + normalized_index * (color_end - color_start)
         return cmap(color_val)
 
-    # 最初のセグメント
-    path0 = pipe.pipe_paths[0]
-    color0 = get_color(0, num_segments)
+    # 結合済みのノード座標を使うため、セグメントごとの平行移動は不要
+    node_positions = np.asarray(pipe.node_positions)
+    node_connectivity = np.asarray(pipe.node_connectivity)
+    all_lines = []
+    for i, (start, end) in enumerate(_segment_element_ranges(pipe)):
+        lines = _element_lines(node_positions, node_connectivity[start:end], max_elements)
+        ax.add_collection3d(Line3DCollection(lines, colors=[get_color(i, num_segments)],
+                                             label=f'Segment {i+1}'))
+        all_lines.append(lines)
+    _set_equal_limits(ax, np.concatenate(all_lines))
 
-    is_first_in_segment = True
-    for conn in path0.node_connectivity:
-        nodes = path0.node_positions[conn]
-        label = f'Segment 1' if is_first_in_segment else None
-        ax.plot(nodes[:, 0], nodes[:, 1], nodes[:, 2], color=color0, label=label)
-        is_first_in_segment = False
+    ax.set_xlabel('X')
+    ax.set_ylabel('Y')
+    ax.set_zlabel('Z')
+    ax.set_title('Pipe Geometry')
+    if num_segments > 0:
+        ax.legend()
+
+    return fig, ax
 
-    last_node_of_previous_segment = path0.node_positions[-1]
 
-    # 2つ目以降のセグメント
-    for i in range(1, num_segments):
-        path = pipe.pipe_paths[i]
-        color = get_color(i, num_segments)
+def plot_pipe_mode_shape(pipe, shapes, mode_index=0, scale=None, fig=None, ax=None, max_elements=None):
+    """
+    モード形状をMatplotlibで配管形状に重ねてプロットします。
 
-        translation = last_node_of_previous_segment - path.node_positions[0]
-        translated_nodes = path.node_positions + translation
+    GUIを必要としないため、オフスクリーンでの画像出力に使用できます。
+    一部の節点のみを保持した `CompactModeShapes` の場合は、並進を保持している節点と、
+    その節点同士を結ぶ要素の変形のみを描画します。
 
-        is_first_in_segment = True
-        for conn in path.node_connectivity:
-            nodes = translated_nodes[conn]
-            label = f'Segment {i+1}' if is_first_in_segment else None
-            ax.plot(nodes[:, 0], nodes[:, 1], nodes[:, 2], color=color, label=label)
-            is_first_in_segment = False
+    Args:
+        pipe (Pipe): プロットするPipeオブジェクト。
+        shapes: sdynpyの固有値解析結果、または `CompactModeShapes`。
+        mode_index (int, optional): プロットするモードのインデックス。 Defaults to 0.
+        scale (float, optional): 変形の表示倍率。Noneの場合は最大変位がモデル寸法の10%になるよう設定します。
+                                 Defaults to None.
+        fig (matplotlib.figure.Figure, optional): プロットするFigureオブジェクト。 Defaults to None.
+        ax (matplotlib.axes.Axes, optional): プロットする3D Axesオブジェクト。 Defaults to None.
+        max_elements (int, optional): 描画する線分数の上限。 Defaults to None.
+
+    Returns:
+        tuple: (fig, ax) FigureオブジェクトとAxesオブジェクト。
+    """
+    if fig is None or ax is None:
+        fig = plt.figure(figsize=(8, 6))
+        ax = fig.add_subplot(111, projection='3d')
 
-        last_node_of_previous_segment = translated_nodes[-1]
+    node_positions = np.asarray(pipe.node_positions)
+    node_connectivity = np.asarray(pipe.node_connectivity)
+    shape = shapes[mode_index]
+    n_nodes = node_positions.shape[0]
+    coordinates = sdpy.coordinate_array(node=np.arange(1, n_nodes + 1)[:, np.newaxis], direction=[1, 2, 3])
+    stored = np.ones(n_nodes, dtype=bool)
+    if isinstance(shape, CompactModeShapes):
+        stored = shape.is_stored(coordinates).all(axis=1)
+    translations = np.zeros((n_nodes, 3))
+    translations[stored] = np.real(shape[coordinates[stored]])
+    if scale is None:
+        extent = np.max(np.ptp(node_positions, axis=0))
+        max_disp = np.max(np.linalg.norm(translations, axis=1))
+        scale = 0.1 * extent / max_disp if max_disp > 0 else 1.0
+
+    deformed_positions = node_positions + scale * translations
+    undeformed = _element_lines(node_positions, node_connectivity, max_elements)
+    ax.add_collection3d(Line3DCollection(undeformed, colors='lightgrey', label='Undeformed'))
+    if stored.all():
+        deformed = _element_lines(deformed_positions, node_connectivity, max_elements)
+    else:
+        # 両端の節点を保持している要素のみ描画し、保持している節点は点で示す
+        deformed = deformed_positions[node_connectivity[stored[node_connectivity].all(axis=1)]]
+        ax.scatter(*deformed_positions[stored].T, color='tab:blue', s=10)
+    ax.add_collection3d(Line3DCollection(deformed, colors='tab:blue', label='Mode shape'))
+    _set_equal_limits(ax, np.concatenate((undeformed, deformed)))
 
     ax.set_xlabel('X')
     ax.set_ylabel('Y')
     ax.set_zlabel('Z')
-    ax.set_title('Pipe Geometry')
-    if num_segments > 0:
-        ax.legend()
-
+    ax.set_title(f'Mode {mode_index + 1}: {shape.frequency:.2f} Hz')
+    ax.legend()
     return fig, ax
 
+
+def save_plots(output_dir, pipe=None, shapes=None, frf=None, mode_indices=None,
+               formats=('png',), max_elements=None, dpi=100):
+    """
+    ジオメトリ、モード形状、FRFのプロットをGUIなしで画像ファイルに出力します。
+
+    pyplotを介さずにFigureを生成するため、バッチ処理やサーバー上でも実行できます。
+
+    Args:
+        output_dir (str): 出力先ディレクトリ。存在しない場合は作成されます。
+        pipe (Pipe, optional): ジオメトリおよびモード形状の描画に使用するPipeオブジェクト。 Defaults to None.
+        shapes (optional): sdynpyの固有値解析結果。指定時は `pipe` も必要です。 Defaults to None.
+        frf (optional): sdynpyの周波数応答解析結果。 Defaults to None.
+        mode_indices (list of int, optional): 出力するモードのインデックス。Noneの場合は全モード。 Defaults to None.
+        formats (tuple of str, optional): 出力形式（'png', 'svg' など）。 Defaults to ('png',).
+        max_elements (int, optional): 描画する線分数の上限。 Defaults to None.
+        dpi (int, optional): 出力解像度。 Defaults to 100.
+
+    Returns:
+        list of str: 出力したファイルパスのリスト。
+    """
+    if shapes is not None and pipe is None:
+        raise ValueError("Plotting mode shapes requires the pipe geometry.")
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+
+    def save(fig, name):
+        for fmt in formats:
+            path = os.path.join(output_dir, f'{name}.{fmt}')
+            fig.savefig(path, format=fmt, dpi=dpi)
+            written.append(path)
+
+    if pipe is not None:
+        fig = Figure(figsize=(8, 6))
+        plot_pipe_geometry(pipe, fig=fig, ax=fig.add_subplot(111, projection='3d'), max_elements=max_elements)
+        save(fig, 'geometry')
+
+    if shapes is not None:
+        if mode_indices is None:
+            mode_indices = range(shapes.size)
+        for mode_index in mode_indices:
+            fig = Figure(figsize=(8, 6))
+            plot_pipe_mode_shape(pipe, shapes, mode_index, fig=fig, ax=fig.add_subplot(111, projection='3d'),
+                                 max_elements=max_elements)
+            save(fig, f'mode_{mode_index + 1:03d}')
+
+    if frf is not None:
+        fig = Figure(figsize=(12, 6))
+        plot_frf(frf, fig=fig, axes=fig.subplots(2, 1))
+        save(fig, 'frf')
+
+    return written
+
 def plot_multiple_mode_shapes(geometries, shapes_list, **kwargs):
     """
     複数のジオメトリにモード形状をインタラクティブにプロットします。
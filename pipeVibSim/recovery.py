@@ -0,0 +1,123 @@
+import numpy as np
+
+from . import elements
+
+
+def _chunks(n_rows, chunk_size):
+    """0 から n_rows を chunk_size ごとに区切ったスライスを返します。"""
+    chunk_size = max(int(chunk_size), 1)
+    return [slice(start, min(start + chunk_size, n_rows)) for start in range(0, n_rows, chunk_size)]
+
+
+def _moment_amplitude(my, mz):
+    """
+    曲げモーメント (My, Mz) の合成の振幅を返します。
+
+    複素振幅の場合は1周期中のモーメントベクトルの大きさの最大値、実数の場合は √(My² + Mz²) です。
+    """
+    u2 = my.real**2 + mz.real**2
+    v2 = np.imag(my)**2 + np.imag(mz)**2
+    uv = my.real * np.imag(my) + mz.real * np.imag(mz)
+    return np.sqrt((u2 + v2) / 2 + np.sqrt(((u2 - v2) / 2)**2 + uv**2))
+
+
+def element_forces(analysis, displacements, chunk_size=256):
+    """
+    節点変位から局所座標系の要素端力を全要素一括で計算します。
+
+    先頭の次元（モード、周波数、荷重ケースなど）をまとめて chunk_size 行ずつ評価し、
+    中間配列のメモリ使用量を抑えます。
+
+    Args:
+        analysis (VibrationAnalysis): 解析オブジェクト。
+        displacements (np.ndarray): (..., 6 n_nodes) の物理自由度の変位（複素数可）。
+        chunk_size (int, optional): 一度に評価する行数。 Defaults to 256.
+
+    Returns:
+        np.ndarray: (..., n_elements, 12) の局所座標系の要素端力。
+    """
+    displacements = np.asarray(displacements)
+    leading = displacements.shape[:-1]
+    rows = displacements.reshape(-1, displacements.shape[-1])
+    force_matrices = analysis.element_force_matrices()
+    node_connectivity = analysis.pipe.node_connectivity
+    forces = np.empty((rows.shape[0], force_matrices.shape[0], 12), dtype=np.result_type(rows, float))
+    for chunk in _chunks(rows.shape[0], chunk_size):
+        forces[chunk] = elements.element_end_forces(force_matrices, rows[chunk], node_connectivity)
+    return forces.reshape(leading + forces.shape[1:])
+
+
+def element_stresses(analysis, displacements, chunk_size=256):
+    """
+    節点変位から要素両端の断面応力を計算します。
+
+    `_setup_system` で計算した断面特性（断面積 A、断面二次モーメント I、ねじり定数 J、外径 D_o）を用いて、
+    軸応力 |N|/A、曲げ応力 M D_o / (2I)、ねじりせん断応力 |T| D_o / (2J) と、
+    軸応力と曲げ応力の和 σ とせん断応力 τ から相当応力 √(σ² + 3τ²) を求めます。
+    要素端力はチャンクごとに応力へ変換するため、全要素端力の配列は保持しません。
+
+    Args:
+        analysis (VibrationAnalysis): 解析オブジェクト。
+        displacements (np.ndarray): (..., 6 n_nodes) の物理自由度の変位（複素数可）。
+        chunk_size (int, optional): 一度に評価する行数。 Defaults to 256.
+
+    Returns:
+        dict: 'axial', 'bending', 'torsion', 'von_mises' をキーとし、
+              (..., n_elements, 2) の要素両端の応力振幅を値とする辞書。
+    """
+    displacements = np.asarray(displacements)
+    leading = displacements.shape[:-1]
+    rows = displacements.reshape(-1, displacements.shape[-1])
+    force_matrices = analysis.element_force_matrices()
+    node_connectivity = analysis.pipe.node_connectivity
+    n_elements = force_matrices.shape[0]
+
+    def per_element(value):
+        return np.broadcast_to(value, (n_elements,))[:, np.newaxis]
+
+    section = analysis.section_properties
+    area = per_element(section['area'])
+    outer_diameter = per_element(section['outer_diameter'])
+    section_modulus = 2 * per_element(section['second_moment']) / outer_diameter
+    torsion_modulus = 2 * per_element(section['polar_moment']) / outer_diameter
+
+    stresses = {key: np.empty((rows.shape[0], n_elements, 2))
+                for key in ('axial', 'bending', 'torsion', 'von_mises')}
+    for chunk in _chunks(rows.shape[0], chunk_size):
+        forces = elements.element_end_forces(force_matrices, rows[chunk], node_connectivity)
+        forces = forces.reshape(-1, n_elements, 2, 6)
+        axial = np.abs(forces[..., 0]) / area
+        bending = _moment_amplitude(forces[..., 4], forces[..., 5]) / section_modulus
+        torsion = np.abs(forces[..., 3]) / torsion_modulus
+        stresses['axial'][chunk] = axial
+        stresses['bending'][chunk] = bending
+        stresses['torsion'][chunk] = torsion
+        stresses['von_mises'][chunk] = np.sqrt((axial + bending)**2 + 3 * torsion**2)
+    return {key: value.reshape(leading + (n_elements, 2)) for key, value in stresses.items()}
+
+
+def modal_displacements(analysis):
+    """固有値解析結果から (モード数, 6 n_nodes) の物理自由度のモード形状を返します。"""
+    if analysis.eigensolution is None:
+        raise RuntimeError("モードの応力を計算するには、先に `run_eigensolution` を実行してください。")
+    n_modes = np.size(analysis.eigensolution.frequency)
+    return np.asarray(analysis.eigensolution[analysis.system.coordinate]).reshape(n_modes, -1)
+
+
+def frf_displacements(analysis, frf):
+    """
+    全自由度を応答とするFRFから (荷重自由度数, 周波数点数, 6 n_nodes) の変位を返します。
+
+    Args:
+        analysis (VibrationAnalysis): 解析オブジェクト。
+        frf: `response_dof_indices` を全自由度として計算したsdynpyのFRF。
+
+    Returns:
+        np.ndarray: (荷重自由度数, 周波数点数, 6 n_nodes) の複素変位。
+    """
+    responses = frf.response_coordinate[:, 0]
+    coordinate = analysis.system.coordinate
+    if not (responses.size == coordinate.size and np.all(responses.node == coordinate.node)
+            and np.all(responses.direction == coordinate.direction)):
+        raise ValueError("Stress recovery requires an FRF with responses at all DOFs of the system.")
+    return np.moveaxis(frf.ordinate, 0, -1)
@@ -0,0 +1,99 @@
+import base64
+import html
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+
+from .postprocessing import plot_frf, summarize_frf
+
+
+def _render_frf_page(frf, title, percentiles, n_peaks, max_curves):
+    """1ページ分のFRFプロットとピーク一覧を作成します。"""
+    fig = Figure(figsize=(11.69, 8.27))
+    axes = fig.subplots(2, 1)
+    summary = summarize_frf(frf, percentiles, n_peaks)
+    plot_frf(frf, fig=fig, axes=axes, n_peaks=n_peaks, max_curves=max_curves, summary=summary)
+    fig.suptitle(title)
+    fig.tight_layout()
+
+    frequencies, envelope = summary['frequencies'], summary['envelope']
+    peaks = [(frequencies[i], envelope[i]) for i in summary['peaks']]
+    return fig, peaks
+
+
+def write_frf_report(path, frfs, titles=None, percentiles=(5, 50, 95), n_peaks=5, max_curves=50):
+    """
+    FRFのレポートを複数ページのPDFまたはHTMLとして出力します。
+
+    FRFごとに1ページを作成し、振幅・位相の重ね描き、包絡線とパーセンタイル帯、
+    主要ピークの注記を含めます。出力形式は拡張子（.pdf または .html）で決まります。
+
+    Args:
+        path (str): 出力ファイルパス。
+        frfs (list): sdynpyの周波数応答解析結果のリスト。
+        titles (list of str, optional): 各ページのタイトル。Noneの場合は連番になります。 Defaults to None.
+        percentiles (tuple of float, optional): 帯表示するパーセンタイル。 Defaults to (5, 50, 95).
+        n_peaks (int, optional): 注記するピークの数。 Defaults to 5.
+        max_curves (int, optional): 個別に描画する曲線数の上限。 Defaults to 50.
+
+    Returns:
+        str: 出力したファイルパス。
+    """
+    if titles is None:
+        titles = [f'FRF {i + 1}' for i in range(len(frfs))]
+    if len(titles) != len(frfs):
+        raise ValueError("The number of titles must match the number of FRFs.")
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.pdf':
+        with PdfPages(path) as pdf:
+            for frf, title in zip(frfs, titles):
+                fig, _ = _render_frf_page(frf, title, percentiles, n_peaks, max_curves)
+                pdf.savefig(fig)
+    elif extension in ('.html', '.htm'):
+        sections = []
+        for frf, title in zip(frfs, titles):
+            fig, peaks = _render_frf_page(frf, title, percentiles, n_peaks, max_curves)
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format='svg')
+            image = base64.b64encode(buffer.getvalue()).decode('ascii')
+            rows = ''.join(f'<tr><td>{frequency:.3f}</td><td>{magnitude:.4e}</td></tr>'
+                           for frequency, magnitude in peaks)
+            sections.append(f'<section><h2>{html.escape(title)}</h2>'
+                            f'<img src="data:image/svg+xml;base64,{image}"/>'
+                            f'<table><tr><th>Frequency (Hz)</th><th>Magnitude</th></tr>{rows}</table>'
+                            f'</section>')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('<!DOCTYPE html><html><head><meta charset="utf-8"><title>FRF Report</title></head><body>'
+                    + ''.join(sections) + '</body></html>')
+    else:
+        raise ValueError(f"Unsupported report format: {extension}")
+    return path
+
+
+def _write_frf_report_job(job):
+    path, frfs, kwargs = job
+    return write_frf_report(path, frfs, **kwargs)
+
+
+def write_frf_reports(reports, max_workers=None, **kwargs):
+    """
+    複数のFRFレポートをプロセスプールで並列に出力します。
+
+    Args:
+        reports (dict): 出力ファイルパスをキー、FRFのリストを値とする辞書。
+        max_workers (int, optional): ワーカープロセス数。1の場合は現在のプロセスで順に出力します。
+                                     Defaults to None.
+        **kwargs: `write_frf_report` に渡される追加のキーワード引数。
+
+    Returns:
+        list of str: 出力したファイルパスのリスト。
+    """
+    jobs = [(path, frfs, kwargs) for path, frfs in reports.items()]
+    if max_workers == 1:
+        return [_write_frf_report_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_write_frf_report_job, jobs))
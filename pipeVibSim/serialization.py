@@ -0,0 +1,118 @@
+import json
+import os
+
+import numpy as np
+
+from .pipe import Pipe
+from .pipe_path import PipePath
+
+FORMAT_NAME = 'pipeVibSim-model'
+FORMAT_VERSION = 1
+
+_MANIFEST = 'manifest.json'
+_PATH_ARRAYS = ('points', 'radius', 'node_positions', 'node_connectivity', 'bend_direction', 'curvatures')
+_PIPE_ARRAYS = ('node_positions', 'node_connectivity', 'bend_direction')
+
+
+def save_model(model, path):
+    """
+    PipePathまたはPipeをディレクトリ形式のモデルファイルに保存します。
+
+    各配列は非圧縮の `.npy` として個別に書き出されるため、
+    読み込み時にメモリマップで開くことができます。
+
+    Args:
+        model (PipePath or Pipe): 保存するオブジェクト。
+        path (str): 保存先ディレクトリ。存在しない場合は作成されます。
+    """
+    os.makedirs(path, exist_ok=True)
+    if isinstance(model, PipePath):
+        manifest = {'kind': 'PipePath', 'step': float(model.step)}
+        _save_pipe_path_arrays(model, path)
+    elif isinstance(model, Pipe):
+        segments = []
+        for i, (pipe_path, props) in enumerate(zip(model.pipe_paths, model.material_properties_list)):
+            segment_dir = os.path.join(path, f'segment_{i:04d}')
+            os.makedirs(segment_dir, exist_ok=True)
+            _save_pipe_path_arrays(pipe_path, segment_dir)
+            n_elements = pipe_path.node_connectivity.shape[0]
+            segments.append({'step': float(pipe_path.step),
+                             'material_keys': _save_material(props, n_elements,
+                                                             os.path.join(segment_dir, 'material'))})
+        manifest = {'kind': 'Pipe', 'segments': segments}
+        if model.pipe_paths:
+            for name in _PIPE_ARRAYS:
+                np.save(os.path.join(path, name + '.npy'), np.asarray(getattr(model, name)))
+            n_elements = model.node_connectivity.shape[0]
+            manifest['material_keys'] = _save_material(model.material_properties, n_elements,
+                                                       os.path.join(path, 'material'))
+    else:
+        raise TypeError(f"Unsupported model type: {type(model).__name__}")
+
+    manifest.update({'format': FORMAT_NAME, 'version': FORMAT_VERSION})
+    with open(os.path.join(path, _MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def load_model(path, mmap_mode='r'):
+    """
+    `save_model` で保存したモデルを読み込みます。
+
+    ジオメトリを再計算せず、保存された節点配列をそのまま利用します。
+
+    Args:
+        path (str): モデルディレクトリ。
+        mmap_mode (str, optional): `np.load` に渡すメモリマップモード。Noneの場合はメモリに読み込みます。
+                                   Defaults to 'r'.
+
+    Returns:
+        PipePath or Pipe: 復元したオブジェクト。
+    """
+    with open(os.path.join(path, _MANIFEST)) as f:
+        manifest = json.load(f)
+    if manifest.get('format') != FORMAT_NAME:
+        raise ValueError(f"{path} is not a {FORMAT_NAME} file.")
+    if manifest.get('version', 0) > FORMAT_VERSION:
+        raise ValueError(f"Unsupported model format version: {manifest['version']}")
+
+    if manifest['kind'] == 'PipePath':
+        return _load_pipe_path_arrays(path, manifest['step'], mmap_mode)
+
+    pipe = Pipe()
+    for i, segment in enumerate(manifest['segments']):
+        segment_dir = os.path.join(path, f'segment_{i:04d}')
+        pipe.pipe_paths.append(_load_pipe_path_arrays(segment_dir, segment['step'], mmap_mode))
+        pipe.material_properties_list.append(
+            _load_material(os.path.join(segment_dir, 'material'), segment['material_keys'], mmap_mode))
+    if not pipe.pipe_paths:
+        pipe._combine_segments()
+        return pipe
+    for name in _PIPE_ARRAYS:
+        setattr(pipe, name, np.load(os.path.join(path, name + '.npy'), mmap_mode=mmap_mode))
+    pipe.material_properties = _load_material(os.path.join(path, 'material'), manifest['material_keys'], mmap_mode)
+    return pipe
+
+
+def _save_pipe_path_arrays(pipe_path, directory):
+    for name in _PATH_ARRAYS:
+        np.save(os.path.join(directory, name + '.npy'), np.asarray(getattr(pipe_path, name)))
+
+
+def _load_pipe_path_arrays(directory, step, mmap_mode):
+    arrays = {name: np.load(os.path.join(directory, name + '.npy'), mmap_mode=mmap_mode)
+              for name in _PATH_ARRAYS}
+    return PipePath.from_arrays(step=step, **arrays)
+
+
+def _save_material(props, n_elements, directory):
+    """材料特性を要素数分の列配列として保存し、キーのリストを返します。"""
+    os.makedirs(directory, exist_ok=True)
+    keys = sorted(props.keys())
+    for key in keys:
+        column = np.broadcast_to(np.asarray(props[key], dtype=float), (n_elements,))
+        np.save(os.path.join(directory, key + '.npy'), np.ascontiguousarray(column))
+    return keys
+
+
+def _load_material(directory, keys, mmap_mode):
+    return {key: np.load(os.path.join(directory, key + '.npy'), mmap_mode=mmap_mode) for key in keys}
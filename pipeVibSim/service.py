@@ -0,0 +1,369 @@
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .pipe import Pipe
+from .pipe_path import PipePath
+from .simulation import VibrationAnalysis
+
+# 受け付ける要求本文の最大サイズ (バイト)
+MAX_CONTENT_LENGTH = 16 * 1024 * 1024
+
+# ワーカープロセス内で構築済みの解析オブジェクトを保持するキャッシュ
+_WORKER_CACHE = OrderedDict()
+_WORKER_CACHE_SIZE = 4
+
+
+def model_hash(definition):
+    """
+    モデル定義（JSONに変換可能な辞書）のハッシュ値を返します。
+
+    キーの順序に依存しないよう、キーを整列したJSON文字列のSHA-256を使用します。
+    """
+    text = json.dumps(definition, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def build_analysis(definition):
+    """
+    モデル定義から拘束済みの `VibrationAnalysis` を構築します。
+
+    モデル定義は次のキーを持つ辞書です。
+
+    - 'segments': 各要素が 'points', 'radius', 'step', 'material' を持つ配管セグメントのリスト。
+    - 'constraints' (任意): 各要素が 'coordinates' と 'dofs'（Noneは全自由度）を持つ拘束条件のリスト。
+    - 'eigen' (任意): 'maximum_frequency' を持つ固有値解析の設定。
+    - 'frf' (任意): 'frequencies', 'load_dof_indices', 'response_dof_indices' を持つFRFの設定。
+
+    Args:
+        definition (dict): モデル定義。
+
+    Returns:
+        VibrationAnalysis: 拘束条件を適用した解析オブジェクト。
+    """
+    pipe = Pipe()
+    for segment in definition['segments']:
+        path = PipePath(np.asarray(segment['points'], dtype=float), radius=segment['radius'], step=segment['step'])
+        pipe.add_pipe_segment(path, dict(segment['material']))
+    analysis = VibrationAnalysis(pipe)
+    constraints = [(np.asarray(c['coordinates'], dtype=float), c.get('dofs'))
+                   for c in definition.get('constraints', [])]
+    if constraints:
+        analysis.substructure_by_coordinate(constraints)
+    return analysis
+
+
+def _worker_analysis(definition, key):
+    """ワーカープロセス内のキャッシュから解析オブジェクトを取得し、無ければ構築します。"""
+    if key in _WORKER_CACHE:
+        _WORKER_CACHE.move_to_end(key)
+        return _WORKER_CACHE[key]
+    analysis = build_analysis(definition)
+    _WORKER_CACHE[key] = analysis
+    while len(_WORKER_CACHE) > _WORKER_CACHE_SIZE:
+        _WORKER_CACHE.popitem(last=False)
+    return analysis
+
+
+def _setup_stage(definition, key):
+    analysis = _worker_analysis(definition, key)
+    return {'n_nodes': int(analysis.pipe.node_positions.shape[0]),
+            'n_elements': int(analysis.pipe.node_connectivity.shape[0]),
+            'n_dofs': int(analysis.system.coordinate.size)}
+
+
+def _eigen_stage(definition, key):
+    analysis = _worker_analysis(definition, key)
+    shapes = analysis.run_eigensolution(maximum_frequency=definition['eigen']['maximum_frequency'])
+    return np.asarray(shapes.frequency, dtype=float).ravel().tolist()
+
+
+def _frf_stage(definition, key, frequencies):
+    analysis = _worker_analysis(definition, key)
+    settings = definition['frf']
+    response_dof_indices = settings.get('response_dof_indices')
+    frf = analysis.run_frf_direct(np.asarray(frequencies, dtype=float),
+                                  load_dof_indices=settings['load_dof_indices'],
+                                  response_dof_indices=slice(None) if response_dof_indices is None
+                                  else response_dof_indices)
+    return np.asarray(frf.ordinate)
+
+
+class _Job:
+    """同一モデルの要求で共有される解析ジョブの状態。"""
+
+    def __init__(self, key):
+        self.key = key
+        self.events = []
+        self.done = False
+        self.failed = False
+        self.changed = asyncio.Condition()
+
+    async def publish(self, event, final=False):
+        async with self.changed:
+            self.events.append(event)
+            self.done = self.done or final
+            self.changed.notify_all()
+
+
+class AnalysisService:
+    """
+    解析要求を非同期に処理するサービス。
+
+    セットアップ、固有値解析、FRFの各段階を上限付きのプロセスプールで実行し、
+    進捗と周波数ブロックごとの部分的なFRF結果をイベントとして逐次返します。
+    同じモデル定義（ハッシュ値が同じ）の要求は実行中のジョブを共有し、
+    完了したジョブの結果は `cache_size` 件までキャッシュされます。
+
+    Args:
+        max_workers (int, optional): ワーカープロセス数。 Defaults to 2.
+        max_concurrent_jobs (int, optional): 同時に実行するジョブ数の上限。超えた要求は待機します。 Defaults to 4.
+        frf_chunk_size (int, optional): 部分結果として返すFRFの周波数点数。 Defaults to 50.
+        cache_size (int, optional): 結果を保持する完了済みジョブの数。 Defaults to 16.
+        executor (concurrent.futures.Executor, optional): 使用するエグゼキュータ。
+                                                         Noneの場合はプロセスプールを作成します。 Defaults to None.
+    """
+
+    def __init__(self, max_workers=2, max_concurrent_jobs=4, frf_chunk_size=50, cache_size=16, executor=None):
+        self.executor = ProcessPoolExecutor(max_workers=max_workers) if executor is None else executor
+        self._owns_executor = executor is None
+        self.frf_chunk_size = frf_chunk_size
+        self.cache_size = cache_size
+        self._slots = asyncio.Semaphore(max_concurrent_jobs)
+        self._jobs = OrderedDict()
+        self._tasks = set()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """
+        実行中のタスクを取り消して終了を待ち、サービスが作成したエグゼキュータを終了します。
+
+        待機中の要求には 'error' イベントが返されます。エグゼキュータの終了は
+        イベントループを止めないよう別スレッドで待ちます。
+        """
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._owns_executor:
+            await asyncio.to_thread(self.executor.shutdown, wait=True, cancel_futures=True)
+
+    async def run(self, definition):
+        """
+        モデル定義の解析を実行し、イベント（辞書）を逐次返す非同期ジェネレータ。
+
+        イベントの 'event' キーは 'accepted', 'stage', 'setup', 'eigen', 'frf', 'done', 'error' のいずれかです。
+        'frf' イベントは周波数ブロックの開始インデックス 'start'、'frequency'、実部 'real' と虚部 'imag'
+        （(応答, 荷重, 周波数) の入れ子リスト）を持ち、計算が完了した順に返されます。
+
+        Args:
+            definition (dict): `build_analysis` で説明するモデル定義。
+
+        Yields:
+            dict: 進捗または結果のイベント。
+        """
+        key = model_hash(definition)
+        job = self._jobs.get(key)
+        if job is None or job.failed:
+            job = _Job(key)
+            self._jobs[key] = job
+            task = asyncio.create_task(self._execute(job, definition))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        self._jobs.move_to_end(key)
+
+        index = 0
+        while True:
+            async with job.changed:
+                await job.changed.wait_for(lambda: index < len(job.events) or job.done)
+                events = job.events[index:]
+                finished = job.done
+            index += len(events)
+            for event in events:
+                yield event
+            if finished and index >= len(job.events):
+                return
+
+    async def _execute(self, job, definition):
+        loop = asyncio.get_running_loop()
+        key = job.key
+        await job.publish({'event': 'accepted', 'model_hash': key})
+        try:
+            async with self._slots:
+                await job.publish({'event': 'stage', 'stage': 'setup'})
+                summary = await loop.run_in_executor(self.executor, _setup_stage, definition, key)
+                await job.publish({'event': 'setup', **summary})
+
+                if 'eigen' in definition:
+                    await job.publish({'event': 'stage', 'stage': 'eigen'})
+                    frequency = await loop.run_in_executor(self.executor, _eigen_stage, definition, key)
+                    await job.publish({'event': 'eigen', 'frequency': frequency})
+
+                if 'frf' in definition:
+                    await job.publish({'event': 'stage', 'stage': 'frf'})
+                    frequencies = np.asarray(definition['frf']['frequencies'], dtype=float)
+                    starts = range(0, frequencies.size, self.frf_chunk_size)
+
+                    async def solve(start):
+                        block = frequencies[start:start + self.frf_chunk_size].tolist()
+                        ordinate = await loop.run_in_executor(self.executor, _frf_stage, definition, key, block)
+                        return start, block, ordinate
+
+                    for completed, future in enumerate(asyncio.as_completed([solve(s) for s in starts]), 1):
+                        start, block, ordinate = await future
+                        await job.publish({'event': 'frf', 'start': start, 'frequency': block,
+                                           'real': ordinate.real.tolist(), 'imag': ordinate.imag.tolist(),
+                                           'completed': completed, 'total': len(starts)})
+            await job.publish({'event': 'done', 'model_hash': key}, final=True)
+        except asyncio.CancelledError:
+            job.failed = True
+            await job.publish({'event': 'error', 'message': 'Cancelled'}, final=True)
+            raise
+        except Exception as error:
+            job.failed = True
+            await job.publish({'event': 'error', 'message': f'{type(error).__name__}: {error}'}, final=True)
+        self._evict()
+
+    def _evict(self):
+        """完了済みジョブが cache_size を超えた場合、古いものから削除します。"""
+        completed = [key for key, job in self._jobs.items() if job.done]
+        for key in completed[:max(len(completed) - self.cache_size, 0)]:
+            del self._jobs[key]
+
+
+async def _handle_connection(service, reader, writer, max_content_length=MAX_CONTENT_LENGTH):
+    """HTTP/1.1の要求を1つ処理し、イベントをNDJSONのチャンク転送で返します。"""
+    try:
+        request_line = (await reader.readline()).decode('latin-1').split()
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        try:
+            content_length = int(headers.get('content-length', 0))
+        except ValueError:
+            await _write_response(writer, 400, {'event': 'error', 'message': 'Invalid Content-Length'})
+            return
+        if content_length < 0:
+            await _write_response(writer, 400, {'event': 'error', 'message': 'Invalid Content-Length'})
+            return
+        if content_length > max_content_length:
+            await _write_response(writer, 413, {'event': 'error', 'message': 'Request body too large'})
+            return
+        try:
+            body = await reader.readexactly(content_length)
+        except asyncio.IncompleteReadError:
+            await _write_response(writer, 400, {'event': 'error', 'message': 'Incomplete request body'})
+            return
+
+        if len(request_line) < 2 or request_line[0] != 'POST' or request_line[1] != '/analyses':
+            await _write_response(writer, 404, {'event': 'error', 'message': 'Not found'})
+            return
+        try:
+            definition = json.loads(body)
+        except ValueError:
+            await _write_response(writer, 400, {'event': 'error', 'message': 'Invalid JSON'})
+            return
+
+        writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n'
+                     b'Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n')
+        async for event in service.run(definition):
+            data = (json.dumps(event) + '\n').encode('utf-8')
+            writer.write(b'%x\r\n%s\r\n' % (len(data), data))
+            await writer.drain()
+        writer.write(b'0\r\n\r\n')
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+async def _write_response(writer, status, event):
+    reasons = {400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large'}
+    data = json.dumps(event).encode('utf-8')
+    writer.write(b'HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n'
+                 b'Connection: close\r\n\r\n%s' % (status, reasons[status].encode('ascii'), len(data), data))
+    await writer.drain()
+
+
+async def start_server(service, host='127.0.0.1', port=0, unix_path=None, max_content_length=MAX_CONTENT_LENGTH):
+    """
+    解析サービスのHTTPインターフェースを開始します。
+
+    `POST /analyses` にモデル定義のJSONを送ると、イベントが改行区切りのJSON (NDJSON) として
+    チャンク転送で逐次返されます。unix_path を指定した場合はUnixドメインソケットで待ち受けます。
+
+    Args:
+        service (AnalysisService): 要求を処理するサービス。
+        host (str, optional): 待ち受けるホスト。 Defaults to '127.0.0.1'.
+        port (int, optional): 待ち受けるポート。0の場合は空いているポートを使用します。 Defaults to 0.
+        unix_path (str, optional): Unixドメインソケットのパス。 Defaults to None.
+        max_content_length (int, optional): 受け付ける要求本文の最大サイズ (バイト)。超えた場合は413を返します。
+                                            Defaults to MAX_CONTENT_LENGTH.
+
+    Returns:
+        asyncio.Server: 開始したサーバー。
+    """
+    def handler(reader, writer):
+        return _handle_connection(service, reader, writer, max_content_length)
+
+    if unix_path is not None:
+        return await asyncio.start_unix_server(handler, path=unix_path)
+    return await asyncio.start_server(handler, host=host, port=port)
+
+
+async def request_analysis(definition, host='127.0.0.1', port=None, unix_path=None):
+    """
+    解析サービスにモデル定義を送信し、返されるイベントを逐次返す非同期ジェネレータ（ローカル用クライアント）。
+
+    Args:
+        definition (dict): モデル定義。
+        host (str, optional): サーバーのホスト。 Defaults to '127.0.0.1'.
+        port (int, optional): サーバーのポート。 Defaults to None.
+        unix_path (str, optional): Unixドメインソケットのパス。指定時は host と port を無視します。 Defaults to None.
+
+    Yields:
+        dict: サービスから受信したイベント。
+    """
+    if unix_path is not None:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    body = json.dumps(definition).encode('utf-8')
+    writer.write(b'POST /analyses HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n'
+                 b'Content-Length: %d\r\n\r\n%s' % (len(body), body))
+    await writer.drain()
+    try:
+        status = (await reader.readline()).decode('latin-1').split()
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if status[1] != '200':
+            raise RuntimeError(json.loads(await reader.readexactly(int(headers['content-length'])))['message'])
+
+        buffer = b''
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            if size == 0:
+                break
+            buffer += (await reader.readexactly(size + 2))[:-2]
+            *lines, buffer = buffer.split(b'\n')
+            for line in lines:
+                yield json.loads(line)
+    finally:
+        writer.close()
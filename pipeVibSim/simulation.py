@@ -1,10 +1,36 @@
 import numpy as np
+import scipy.linalg
+import scipy.sparse as sps
+import scipy.sparse.linalg as spla
+from scipy.interpolate import CubicSpline
+from scipy.spatial import cKDTree
 
 import sdynpy as sdpy
+from sdynpy.core.sdynpy_coordinate import outer_product
 
+from . import elements
+from .mode_shapes import CompactModeShapes, compress_mode_shapes
 from .pipe import Pipe
 
 
+def _select_modes(eigenvalues, num_modes):
+    """状態空間の固有値から虚部が非負のものを絶対値の小さい順に num_modes 個選びます。"""
+    tolerance = 1e-9 * np.abs(eigenvalues).max(axis=-1, keepdims=True)
+    key = np.where(eigenvalues.imag >= -tolerance, np.abs(eigenvalues), np.inf)
+    order = np.argsort(key, axis=-1)[..., :num_modes]
+    return np.take_along_axis(eigenvalues, order, axis=-1)
+
+
+def _local_change_matrix(change, n_dofs):
+    """局所変更量（None、スカラー、対角成分の配列、行列）を (n_dofs, n_dofs) の行列に変換します。"""
+    if change is None:
+        return np.zeros((n_dofs, n_dofs))
+    change = np.asarray(change, dtype=float)
+    if change.ndim < 2:
+        return np.diag(np.broadcast_to(change, (n_dofs,)))
+    return change
+
+
 class VibrationAnalysis:
     """
     配管の振動解析を実行するクラス。
@@ -16,15 +42,27 @@ class VibrationAnalysis:
     def __init__(self, pipe):
         self.pipe = pipe
         self.init_system, self.geometry = self._setup_system()
+        self.fluid_matrices = self._setup_fluid_matrices()
+        if self.fluid_matrices is not None:
+            self.init_system = self._add_fluid_matrices(self.init_system)
         self.system = self.init_system
         self.eigensolution = None
+        self.damping_model = {}
+        self._node_tree = None
+        self._element_stiffness = None
+        self._element_force_matrices = None
+        self._sparse_transformation = (None, None)
+        self._owned_system = None
+        self._static_factorization = (None, None)
+        self.springs = {'dofs': np.zeros(0, dtype=int), 'stiffness': np.zeros(0)}
+        self.lumped_masses = {'dofs': np.zeros(0, dtype=int), 'mass': np.zeros(0)}
 
     def _setup_system(self):
         """sdynpyシステムをセットアップします。"""
         
         # 材料定数を取得
         E = self.pipe.material_properties['young_modulus']
-        G = E / (2 * (1 + self.pipe.material_properties['poisson_ratio']))
+        nu = self.pipe.material_properties['poisson_ratio']
         rho = self.pipe.material_properties['density']
         D_o = self.pipe.material_properties['outer_diameter']
         thickness = self.pipe.material_properties['thickness']
@@ -39,27 +77,389 @@ class VibrationAnalysis:
         else: # スカラーの場合
             thickness_arr = np.full(n_elements, thickness)
 
-        # 要素ごとの断面特性を計算
-        D_i_arr = D_o - 2 * thickness_arr
-        A_arr = np.pi / 4 * (D_o**2 - D_i_arr**2)
-        I_arr = np.pi / 64 * (D_o**4 - D_i_arr**4)
-        J_arr = 2 * I_arr
+        # 要素ごとの断面特性と要素行列の係数を計算
+        self.section_properties = {**elements.pipe_section_properties(D_o, thickness_arr), 'outer_diameter': D_o}
+        stiffness, mass = elements.pipe_section_components(E, nu, rho, D_o, thickness_arr)
 
         props = {
-            'ae': E * A_arr,
-            'jg': G * J_arr,
-            'ei1': E * I_arr,
-            'ei2': E * I_arr,
-            'mass_per_length': rho * A_arr,
-            'tmmi_per_length': rho * J_arr
+            'ae': stiffness[:, 0],
+            'jg': stiffness[:, 1],
+            'ei1': stiffness[:, 2],
+            'ei2': stiffness[:, 2].copy(),
+            'mass_per_length': mass[:, 0],
+            'tmmi_per_length': mass[:, 1]
         }
+        self.beam_properties = props
 
         return sdpy.System.beam_from_arrays(self.pipe.node_positions, self.pipe.node_connectivity,
                                             self.pipe.bend_direction, props)
 
+    def _setup_fluid_matrices(self):
+        """
+        内部流体による付加質量、コリオリ（ジャイロ）行列、遠心力・内圧による剛性行列を組み立てます。
+
+        材料特性に 'fluid_density' が無い場合はNoneを返します。
+        流速 U、内圧 p、流体の線密度 m_f = ρ_f A_i に対し、曲げ2面について
+        M_f = m_f ∫NᵀN dx、G = 2 m_f U ∫NᵀN' dx、K_f = -(m_f U² + p A_i) ∫N'ᵀN' dx を
+        全要素一括で計算し、全体座標系の疎行列として返します。
+        流体は管とともに全並進方向に動くため、付加質量は軸方向にも加えます（ねじりには加えません）。
+        """
+        props = self.pipe.material_properties
+        if 'fluid_density' not in props:
+            return None
+
+        n_elements = self.pipe.node_connectivity.shape[0]
+        n_nodes = self.pipe.node_positions.shape[0]
+        fluid_density = elements.element_values(props['fluid_density'], n_elements, default=0.0)
+        flow_velocity = elements.element_values(props.get('flow_velocity', 0.0), n_elements, default=0.0)
+        internal_pressure = elements.element_values(props.get('internal_pressure', 0.0), n_elements, default=0.0)
+        inner_area = self.section_properties['flow_area']
+        fluid_mass = fluid_density * inner_area
+
+        lengths, rotations = elements.element_frames(self.pipe.node_positions, self.pipe.node_connectivity,
+                                                     self.pipe.bend_direction)
+        transformations = elements.element_transformations(rotations)
+
+        def assemble_local(local):
+            return elements.assemble(elements.to_global(local, transformations), self.pipe.node_connectivity,
+                                     n_nodes)
+
+        def assemble(coefficients, kind):
+            return assemble_local(elements.both_bending_planes(coefficients[:, np.newaxis, np.newaxis]
+                                                               * elements.bending_matrices(kind, lengths)))
+
+        return {
+            'mass': assemble_local(elements.beam_mass(lengths, fluid_mass, np.zeros(n_elements))),
+            'gyroscopic': assemble(2 * fluid_mass * flow_velocity, 'n_dn'),
+            'stiffness': assemble(-(fluid_mass * flow_velocity**2 + internal_pressure * inner_area), 'dn_dn'),
+            'gyroscopic_per_velocity': assemble(2 * fluid_mass, 'n_dn'),
+            'centrifugal_per_velocity_squared': assemble(-fluid_mass, 'dn_dn'),
+            'pressure': assemble(-internal_pressure * inner_area, 'dn_dn'),
+        }
+
+    def _add_fluid_matrices(self, system):
+        """流体の付加質量・ジャイロ行列・剛性行列をシステムに加えます。"""
+        return sdpy.System(system.coordinate,
+                           system.mass + self.fluid_matrices['mass'].toarray(),
+                           system.stiffness + self.fluid_matrices['stiffness'].toarray(),
+                           system.damping + self.fluid_matrices['gyroscopic'].toarray(),
+                           system.transformation,
+                           enforce_symmetry=False)
+
     def reset_system(self):
-        """システムを初期状態に戻します。"""
+        """
+        システムを初期状態に戻します。
+
+        追加したばねと集中質量、およびばねと並列に追加したダッシュポットも削除されます。
+        `add_dashpots` で追加したダッシュポットなど、その他の減衰の設定は残ります。
+        """
         self.system = self.init_system
+        self.damping_model.pop('spring_dashpots', None)
+        self.springs = {'dofs': np.zeros(0, dtype=int), 'stiffness': np.zeros(0)}
+        self.lumped_masses = {'dofs': np.zeros(0, dtype=int), 'mass': np.zeros(0)}
+
+    def _nearest_nodes(self, coordinates):
+        """各座標に最も近い節点のインデックスを返します。"""
+        if self._node_tree is None:
+            self._node_tree = cKDTree(self.pipe.node_positions)
+        _, node_indices = self._node_tree.query(np.atleast_2d(np.asarray(coordinates, dtype=float)))
+        return node_indices
+
+    def element_stiffness_matrices(self):
+        """
+        全体座標系の要素剛性行列 (n_elements, 12, 12) を返します。
+
+        構造のみの剛性（流体による剛性を含まない）で、初回呼び出し時に計算してキャッシュします。
+        """
+        if self._element_stiffness is None:
+            _, rotations = self._element_geometry()
+            transformations = elements.element_transformations(rotations)
+            self._element_stiffness = np.einsum('eji,ejk->eik', transformations, self.element_force_matrices(),
+                                                optimize=True)
+        return self._element_stiffness
+
+    def element_force_matrices(self):
+        """
+        全体座標系の要素端変位から局所座標系の要素端力を求める行列 k_e T_e (n_elements, 12, 12) を返します。
+
+        初回呼び出し時に計算してキャッシュします。
+        """
+        if self._element_force_matrices is None:
+            lengths, rotations = self._element_geometry()
+            props = self.beam_properties
+            local = elements.beam_stiffness(lengths, props['ae'], props['jg'], props['ei1'], props['ei2'])
+            self._element_force_matrices = local @ elements.element_transformations(rotations)
+        return self._element_force_matrices
+
+    def set_rayleigh_damping(self, alpha=0.0, beta=0.0):
+        """
+        レイリー減衰 C = αM + βK を設定します。
+
+        Args:
+            alpha (float, optional): 質量比例係数 (1/s)。 Defaults to 0.0.
+            beta (float, optional): 剛性比例係数 (s)。 Defaults to 0.0.
+        """
+        self.damping_model['rayleigh'] = (float(alpha), float(beta))
+
+    def set_modal_damping(self, damping_ratios):
+        """
+        モード減衰比を設定します。
+
+        Args:
+            damping_ratios (float or np.ndarray): 全モード共通の減衰比、またはモードごとの減衰比の配列。
+        """
+        self.damping_model['modal'] = np.asarray(damping_ratios, dtype=float)
+
+    def set_structural_damping(self, loss_factor):
+        """
+        構造（ヒステリシス）減衰を損失係数で設定します。
+
+        スカラーの場合は全要素共通（比例減衰）、配列の場合は要素ごとの損失係数 η_e として
+        D = Σ η_e K_e を組み立てます（非比例減衰）。
+
+        Args:
+            loss_factor (float or np.ndarray): 損失係数、または要素数分の損失係数の配列。
+        """
+        loss_factor = np.asarray(loss_factor, dtype=float)
+        if loss_factor.ndim > 0 and loss_factor.size != self.pipe.node_connectivity.shape[0]:
+            raise ValueError("Length of loss_factor must match the number of elements.")
+        self.damping_model['loss_factor'] = loss_factor
+
+    def add_dashpots(self, coordinates, dof_indices, coefficients):
+        """
+        座標で指定した節点の自由度に離散ダッシュポット（粘性減衰器）を追加します。
+
+        複数回呼び出した場合は減衰係数が加算されます。
+
+        Args:
+            coordinates (np.ndarray): (n, 3) のダッシュポット位置。最も近い節点に取り付けます。
+            dof_indices (int or np.ndarray): 節点内の自由度インデックス (0-5)。スカラーまたは長さnの配列。
+            coefficients (float or np.ndarray): 減衰係数。スカラーまたは長さnの配列。
+        """
+        self._accumulate_dashpots('dashpots', coordinates, dof_indices, coefficients)
+
+    def _accumulate_dashpots(self, key, coordinates, dof_indices, coefficients):
+        """
+        ダッシュポットの物理自由度の減衰行列を damping_model[key] に加算します。
+
+        `add_springs` で追加したダッシュポットは 'spring_dashpots' として分けて保持し、
+        `reset_system` でばねと共に削除します。
+        """
+        dofs = self._point_dofs(coordinates, dof_indices)
+        values = np.broadcast_to(np.asarray(coefficients, dtype=float), dofs.shape)
+        n_dofs = 6 * self.pipe.node_positions.shape[0]
+        dashpots = sps.csr_matrix((values, (dofs, dofs)), shape=(n_dofs, n_dofs))
+        if key in self.damping_model:
+            dashpots = self.damping_model[key] + dashpots
+        self.damping_model[key] = dashpots
+
+    def clear_damping(self):
+        """設定したすべての減衰を削除します。"""
+        self.damping_model = {}
+
+    @property
+    def has_flow_coupling(self):
+        """流れによるジャイロ（コリオリ）行列を持ち、実モードで対角化できないかどうか。"""
+        return self.fluid_matrices is not None and self.fluid_matrices['gyroscopic'].count_nonzero() > 0
+
+    @property
+    def has_proportional_damping(self):
+        """減衰がモード重ね合わせ法で厳密に扱える比例減衰のみかどうか。"""
+        # 損失係数は構造の要素剛性にのみ掛かるため、ばねや流体・内圧による剛性がある場合は比例減衰とならない
+        extra_stiffness = (self.springs['dofs'].size > 0
+                           or (self.fluid_matrices is not None
+                               and self.fluid_matrices['stiffness'].count_nonzero() > 0))
+        return ('dashpots' not in self.damping_model
+                and 'spring_dashpots' not in self.damping_model
+                and not self.has_flow_coupling
+                and ('loss_factor' not in self.damping_model
+                     or (self.damping_model['loss_factor'].ndim == 0 and not extra_stiffness)))
+
+    def _modal_damping_terms(self, omega_r):
+        """
+        比例減衰のモードごとの粘性減衰比と損失係数を返します。
+
+        要素ごとの損失係数はモードごとの値が定まらないため、ValueErrorとなります。
+        """
+        loss_factor = self.damping_model.get('loss_factor', np.zeros(()))
+        if loss_factor.ndim > 0:
+            raise ValueError("Per-element loss factors are non-proportional and cannot be evaluated from the modes; "
+                             "use `run_frf_direct` instead.")
+        return self._modal_viscous_damping(omega_r), float(loss_factor)
+
+    def _modal_viscous_damping(self, omega_r):
+        """レイリー減衰とモード減衰によるモードごとの粘性減衰比を返します。"""
+        zeta = np.zeros_like(omega_r)
+        if 'rayleigh' in self.damping_model:
+            alpha, beta = self.damping_model['rayleigh']
+            with np.errstate(divide='ignore'):
+                zeta = zeta + np.where(omega_r > 0, alpha / (2 * np.where(omega_r > 0, omega_r, 1)), 0.0)
+            zeta = zeta + beta * omega_r / 2
+        if 'modal' in self.damping_model:
+            zeta = zeta + self._modal_damping_ratios(omega_r.size)
+        return zeta
+
+    def _modal_damping_ratios(self, n_modes):
+        """`set_modal_damping` で設定したモード減衰比をモード数分の配列で返します。"""
+        modal = self.damping_model['modal']
+        if modal.ndim == 0:
+            return np.full(n_modes, float(modal))
+        if modal.size < n_modes:
+            raise ValueError("The number of modal damping ratios is smaller than the number of modes.")
+        return modal[:n_modes]
+
+    def _damping_matrices(self):
+        """
+        状態座標系の粘性減衰行列 C と構造減衰行列 D を疎行列として返します。
+
+        剛性・質量行列は再構築せず、減衰の設定から C と D のみを組み立てます。
+        モード減衰 MΦ diag(2ζω) ΦᵀM は密行列となるため C には含めず、低ランク項
+        (MΦ, 2ζω) として3番目の戻り値で返します。モード減衰が無い場合はNoneです。
+        """
+        transformation = self._transformation_matrix()
+        mass = sps.csc_matrix(self.system.mass)
+        viscous = sps.csc_matrix(self.system.damping)
+        hysteretic = sps.csc_matrix(mass.shape)
+        modal_terms = None
+
+        if 'rayleigh' in self.damping_model:
+            alpha, beta = self.damping_model['rayleigh']
+            viscous = viscous + alpha * mass + beta * sps.csc_matrix(self.system.stiffness)
+        if 'modal' in self.damping_model:
+            if self.eigensolution is None:
+                raise RuntimeError("モード減衰を使用するには、先に `run_eigensolution` を実行してください。")
+            omega_r = 2 * np.pi * np.asarray(self.eigensolution.frequency, dtype=float).ravel()
+            zeta = self._modal_damping_ratios(omega_r.size)
+            # 質量正規化モード Φ に対し C = MΦ diag(2ζω) ΦᵀM
+            shape_matrix = np.asarray(self.eigensolution[self.system.coordinate]).reshape(omega_r.size, -1)
+            modal_terms = (mass @ (transformation.T @ shape_matrix.T), 2 * zeta * omega_r)
+        for key in ('dashpots', 'spring_dashpots'):
+            if key in self.damping_model:
+                viscous = viscous + transformation.T @ self.damping_model[key] @ transformation
+        if 'loss_factor' in self.damping_model:
+            loss_factor = self.damping_model['loss_factor']
+            element_stiffness = self.element_stiffness_matrices()
+            element_loss = np.broadcast_to(loss_factor, (element_stiffness.shape[0],))
+            physical = elements.assemble(element_loss[:, np.newaxis, np.newaxis] * element_stiffness,
+                                         self.pipe.node_connectivity, self.pipe.node_positions.shape[0])
+            hysteretic = hysteretic + transformation.T @ physical @ transformation
+        return viscous.tocsc(), sps.csc_matrix(hysteretic), modal_terms
+
+    def _transformation_matrix(self):
+        """現在のシステムの変換行列（物理 × 状態）を疎行列で返します。システムごとにキャッシュします。"""
+        system, transformation = self._sparse_transformation
+        if system is not self.system:
+            transformation = sps.csr_matrix(self.system.transformation)
+            self._sparse_transformation = (self.system, transformation)
+        return transformation
+
+    def _scatter_point_values(self, matrix_name, dofs, values):
+        """
+        物理自由度の対角成分の変化 ΔA を、状態座標系のシステム行列に TᵀΔAT として直接加えます。
+
+        更新は変化した自由度の数に比例する低ランク更新で、行列全体は再構築しません。
+        初期システムを変更しないよう、最初の更新時にのみシステムを複製します。
+        """
+        if self._owned_system is not self.system:
+            self.system = self.system.copy()
+            self._owned_system = self.system
+        self._static_factorization = (None, None)
+        rows = self._transformation_matrix()[dofs]
+        update = (rows.T @ sps.diags(values) @ rows).tocoo()
+        np.add.at(getattr(self.system, matrix_name), (update.row, update.col), update.data)
+
+    def _point_dofs(self, coordinates, dof_indices):
+        """座標と節点内の自由度インデックスから物理自由度のインデックスを返します。"""
+        node_indices = self._nearest_nodes(coordinates)
+        dof_indices = np.asarray(dof_indices, dtype=int)
+        if dof_indices.ndim == 2:
+            return (6 * node_indices[:, np.newaxis] + dof_indices).ravel()
+        return 6 * node_indices + np.broadcast_to(dof_indices, node_indices.shape)
+
+    def add_springs(self, coordinates, dof_indices, stiffness, damping=None):
+        """
+        座標で指定した節点の自由度と地面の間に点ばね（ハンガー、スナバ等）を一括で追加します。
+
+        ばね剛性はシステムの剛性行列に直接加えられます。
+
+        Args:
+            coordinates (np.ndarray): (n, 3) のばね位置。最も近い節点に取り付けます。
+            dof_indices (int or np.ndarray): 節点内の自由度インデックス (0-5)。スカラーまたは長さnの配列。
+            stiffness (float or np.ndarray): ばね剛性。スカラーまたは長さnの配列。
+            damping (float or np.ndarray, optional): ばねと並列のダッシュポットの減衰係数。 Defaults to None.
+
+        Returns:
+            np.ndarray: 追加したばねのインデックス。`set_spring_stiffness` で使用します。
+        """
+        dofs = self._point_dofs(coordinates, dof_indices)
+        stiffness = np.broadcast_to(np.asarray(stiffness, dtype=float), dofs.shape).copy()
+        self._scatter_point_values('stiffness', dofs, stiffness)
+
+        first = self.springs['dofs'].size
+        self.springs = {'dofs': np.concatenate((self.springs['dofs'], dofs)),
+                        'stiffness': np.concatenate((self.springs['stiffness'], stiffness))}
+        if damping is not None:
+            self._accumulate_dashpots('spring_dashpots', coordinates, dof_indices, damping)
+        return np.arange(first, first + dofs.size)
+
+    def set_spring_stiffness(self, spring_indices, stiffness):
+        """
+        追加済みのばねの剛性を変更します。
+
+        変更前後の差分のみを低ランク更新として剛性行列に加えるため、
+        支持剛性の最適化ループなどで繰り返し呼び出しても行列の再構築は発生しません。
+
+        Args:
+            spring_indices (np.ndarray): `add_springs` が返したばねのインデックス。
+            stiffness (float or np.ndarray): 新しいばね剛性。
+        """
+        spring_indices = np.atleast_1d(spring_indices)
+        stiffness = np.broadcast_to(np.asarray(stiffness, dtype=float), spring_indices.shape)
+        delta = stiffness - self.springs['stiffness'][spring_indices]
+        self._scatter_point_values('stiffness', self.springs['dofs'][spring_indices], delta)
+        self.springs['stiffness'][spring_indices] = stiffness
+
+    def add_lumped_masses(self, coordinates, mass, inertia=None):
+        """
+        座標で指定した節点に集中質量（バルブ等）と回転慣性を一括で追加します。
+
+        Args:
+            coordinates (np.ndarray): (n, 3) の集中質量の位置。最も近い節点に取り付けます。
+            mass (float or np.ndarray): 並進3方向の質量。スカラーまたは長さnの配列。
+            inertia (float or np.ndarray, optional): 回転慣性。スカラー、長さnの配列、
+                                                     または (n, 3) の軸ごとの配列。 Defaults to None.
+        """
+        n_points = np.atleast_2d(coordinates).shape[0]
+        values = np.zeros((n_points, 6))
+        values[:, :3] = np.broadcast_to(np.asarray(mass, dtype=float), (n_points,))[:, np.newaxis]
+        if inertia is not None:
+            inertia = np.asarray(inertia, dtype=float)
+            values[:, 3:] = inertia[:, np.newaxis] if inertia.ndim == 1 else inertia
+        dofs = self._point_dofs(coordinates, np.broadcast_to(np.arange(6), (n_points, 6)))
+        values = values.ravel()
+        self._scatter_point_values('mass', dofs, values)
+        self.lumped_masses = {'dofs': np.concatenate((self.lumped_masses['dofs'], dofs)),
+                              'mass': np.concatenate((self.lumped_masses['mass'], values))}
+
+    def _modal_receptance(self, frequencies, response_dof, load_dof):
+        """
+        固有値解析結果から比例減衰のレセプタンス (周波数, 応答, 荷重) を計算します。
+
+        質量正規化モードに対し H(ω) = Σ φ_r φ_rᵀ / (ω_r² - ω² + 2iζ_r ω_r ω + iη ω_r²) を
+        全周波数・全モードで一括計算します。
+        """
+        omega = 2 * np.pi * np.asarray(frequencies, dtype=float)[:, np.newaxis]
+        omega_r = 2 * np.pi * np.asarray(self.eigensolution.frequency, dtype=float).ravel()
+        zeta, loss_factor = self._modal_damping_terms(omega_r)
+        modal_response = 1 / (omega_r**2 - omega**2 + 2j * zeta * omega_r * omega + 1j * loss_factor * omega_r**2)
+        response_shapes = np.asarray(self.eigensolution[response_dof]).reshape(omega_r.size, -1).T
+        load_shapes = np.asarray(self.eigensolution[load_dof]).reshape(omega_r.size, -1).T
+        return (response_shapes * modal_response[:, np.newaxis, :]) @ load_shapes.T
+
+    def _frf_array(self, frequencies, ordinate, response_dof, load_dof):
+        """(周波数, 応答, 荷重) の配列からsdynpyのFRFを作成します。"""
+        return sdpy.data_array(sdpy.data.FunctionTypes.FREQUENCY_RESPONSE_FUNCTION, frequencies,
+                               np.moveaxis(ordinate, 0, -1), outer_product(response_dof, load_dof))
 
     def substructure_by_coordinate(self, constraints):
         """
@@ -79,17 +479,28 @@ class VibrationAnalysis:
 
         self.system = self.system.substructure_by_coordinate(fixed_dofs_list)
 
-    def run_eigensolution(self, maximum_frequency):
+    def run_eigensolution(self, maximum_frequency, dtype=None, nodes=None, translations_only=False, rank=None):
         """
         固有値解析を実行し、結果をインスタンスに保存します。
 
+        dtype, nodes, translations_only, rank のいずれかを指定した場合、モード形状は
+        `CompactModeShapes` として省メモリ形式で保持されます。
+
         Args:
             maximum_frequency (float): 解析する最大周波数。
+            dtype (np.dtype, optional): モード形状を保持する数値型（例: np.float32）。 Defaults to None.
+            nodes (array-like, optional): モード形状を保持する節点のインデックス。 Defaults to None.
+            translations_only (bool, optional): Trueの場合は並進自由度のみ保持します。 Defaults to False.
+            rank (int, optional): 切断SVDで圧縮する場合のランク。 Defaults to None.
 
         Returns:
-            eigensolution: sdynpyの固有値解析結果。
+            eigensolution: sdynpyの固有値解析結果、または `CompactModeShapes`。
         """
-        self.eigensolution = self.system.eigensolution(maximum_frequency=maximum_frequency)
+        shapes = self.system.eigensolution(maximum_frequency=maximum_frequency)
+        if dtype is not None or nodes is not None or translations_only or rank is not None:
+            shapes = compress_mode_shapes(shapes, dtype=np.float64 if dtype is None else dtype, nodes=nodes,
+                                          translations_only=translations_only, rank=rank)
+        self.eigensolution = shapes
         return self.eigensolution
 
     def run_frf_direct(self,
@@ -100,6 +511,10 @@ class VibrationAnalysis:
         """
         周波数応答解析（FRF）を直接法で実行します。
 
+        減衰が設定されている場合は、状態座標系の疎な動剛性行列を周波数ごとにLU分解して解きます。
+        非比例減衰（ダッシュポット、要素ごとの損失係数）にも対応します。
+        モード減衰は密な減衰行列を作らず、低ランク項としてWoodburyの公式で加えます。
+
         Args:
             frequencies (np.ndarray): 解析する周波数の配列。
             load_dof_indices (int or list): 荷重をかける自由度のインデックス。
@@ -108,12 +523,42 @@ class VibrationAnalysis:
         Returns:
             frf: sdynpyの周波数応答解析結果。
         """
-        load_dof = self.system.coordinate[load_dof_indices]
-        response_dof = self.system.coordinate[response_dof_indices]
-        return self.system.frequency_response(frequencies=frequencies,
-                                              references=load_dof,
-                                              responses=response_dof,
-                                              displacement_derivative=displacement_derivative)
+        load_dof = np.atleast_1d(self.system.coordinate[load_dof_indices])
+        response_dof = np.atleast_1d(self.system.coordinate[response_dof_indices])
+        if not self.damping_model:
+            return self.system.frequency_response(frequencies=frequencies,
+                                                  references=load_dof,
+                                                  responses=response_dof,
+                                                  displacement_derivative=displacement_derivative)
+
+        # 減衰を考慮した動剛性 Z = K + iD - ω²M + iωC を周波数ごとに疎行列LU分解で解く
+        frequencies = np.asarray(frequencies, dtype=float)
+        viscous, hysteretic, modal_terms = self._damping_matrices()
+        stiffness = sps.csc_matrix(self.system.stiffness) + 1j * hysteretic
+        mass = sps.csc_matrix(self.system.mass)
+        load_transform = self.system.transformation_matrix_at_coordinates(load_dof)
+        response_transform = self.system.transformation_matrix_at_coordinates(response_dof)
+        forces = np.asarray(load_transform.T, dtype=complex)
+        if modal_terms is not None:
+            weighted, coefficients = modal_terms
+            right_hand_sides = np.hstack((forces, weighted))
+            identity = np.eye(coefficients.size)
+
+        ordinate = np.empty((frequencies.size, response_dof.size, load_dof.size), dtype=complex)
+        for i, omega in enumerate(2 * np.pi * frequencies):
+            dynamic_stiffness = (stiffness - omega**2 * mass + 1j * omega * viscous).tocsc()
+            lu = spla.splu(dynamic_stiffness)
+            if modal_terms is None:
+                ordinate[i] = response_transform @ lu.solve(forces)
+                continue
+            # (Z + W S Wᵀ)⁻¹F = X - Y (I + S WᵀY)⁻¹ S WᵀX、X = Z⁻¹F、Y = Z⁻¹W、S = diag(iω 2ζω_r)
+            solution = lu.solve(right_hand_sides)
+            x, y = solution[:, :load_dof.size], solution[:, load_dof.size:]
+            scale = 1j * omega * coefficients[:, np.newaxis]
+            correction = np.linalg.solve(identity + scale * (weighted.T @ y), scale * (weighted.T @ x))
+            ordinate[i] = response_transform @ (x - y @ correction)
+        ordinate *= (2j * np.pi * frequencies[:, np.newaxis, np.newaxis])**displacement_derivative
+        return self._frf_array(frequencies, ordinate, response_dof, load_dof)
 
     def run_frf_modal(self,
                       frequencies,
@@ -123,6 +568,10 @@ class VibrationAnalysis:
         """
         周波数応答解析（FRF）をモード重ね合わせ法で実行します。
         事前に `run_eigensolution` を実行しておく必要があります。
+        比例減衰（レイリー減衰、モード減衰、全要素共通の損失係数）が設定されている場合は、
+        全周波数・全モードを一括でベクトル化したモード重ね合わせで計算します。
+        流れのある流体（ジャイロ行列）は実モードで扱えないため、減衰の有無によらずエラーとなります。
+        静止した流体の付加質量と内圧による剛性は固有値解析結果に含まれるため使用できます。
 
         Args:
             frequencies (np.ndarray): 解析する周波数の配列。
@@ -135,10 +584,415 @@ class VibrationAnalysis:
         if self.eigensolution is None:
             raise RuntimeError("モード重ね合わせ法を使用するには、先に `run_eigensolution` を実行してください。")
 
-        load_dof = self.system.coordinate[load_dof_indices]
-        response_dof = self.system.coordinate[response_dof_indices]
+        if not self.has_proportional_damping:
+            raise RuntimeError("非比例減衰（ダッシュポット、要素ごとの損失係数、流れのある流体）では "
+                               "`run_frf_direct` を使用してください。")
+
+        load_dof = np.atleast_1d(self.system.coordinate[load_dof_indices])
+        response_dof = np.atleast_1d(self.system.coordinate[response_dof_indices])
+        if not self.damping_model and not isinstance(self.eigensolution, CompactModeShapes):
+            return self.eigensolution.compute_frf(frequencies=frequencies,
+                                                  references=load_dof,
+                                                  responses=response_dof,
+                                                  displacement_derivative=displacement_derivative)
+
+        frequencies = np.asarray(frequencies, dtype=float)
+        ordinate = self._modal_receptance(frequencies, response_dof, load_dof)
+        ordinate *= (2j * np.pi * frequencies[:, np.newaxis, np.newaxis])**displacement_derivative
+        return self._frf_array(frequencies, ordinate, response_dof, load_dof)
+
+    def _resonance_frequencies(self, f_min, f_max):
+        """
+        固有振動数の近傍に置く周波数点を優先度の高い順に返します。
+
+        モードの等価減衰比 ζ_r + η/2 から半値幅 2ζf_r を求め、その倍数の間隔で点を置きます。
+        要素ごとの損失係数はモードごとの値が定まらないため、要素の平均値で半値幅を見積もります。
+        全モードについて固有振動数に近い点から順に並べるため、先頭から切り出しても各モードの
+        ピーク近傍が残ります。減衰が無い場合は応答が発散する固有振動数そのものを避けます。
+        """
+        if self.eigensolution is None:
+            return np.zeros(0)
+        natural = np.asarray(self.eigensolution.frequency, dtype=float).ravel()
+        # モード減衰比の配列はモード番号に対応するため、周波数範囲で絞り込む前に評価する
+        zeta = (self._modal_viscous_damping(2 * np.pi * natural)
+                + np.mean(self.damping_model.get('loss_factor', 0.0)) / 2)
+        in_range = (natural > f_min) & (natural < f_max)
+        natural, zeta = natural[in_range], zeta[in_range]
+        offsets = np.array([0.0, -0.25, 0.25, -0.5, 0.5, -1.0, 1.0, -2.0, 2.0, -4.0, 4.0])
+        width = np.where(zeta > 0, zeta, 1e-4) * natural
+        points = natural + offsets[:, np.newaxis] * width
+        points[0, zeta <= 0] = np.nan
+        points = points.ravel()
+        return points[(points > f_min) & (points < f_max)]
+
+    def run_frf_adaptive(self,
+                         frequencies,
+                         load_dof_indices,
+                         response_dof_indices=slice(None),
+                         method='direct',
+                         initial_points=64,
+                         tolerance=1e-2,
+                         max_points=2000,
+                         interpolate=False,
+                         displacement_derivative=0):
+        """
+        周波数点を適応的に配置して周波数応答解析（FRF）を実行します。
+
+        frequencies の範囲の粗い等間隔格子と、固有値解析結果があれば固有振動数の近傍点から開始し、
+        各点の応答と前後の点からの線形補間との差（曲率の指標）が応答の大きさの tolerance 倍を超える点の
+        両側の区間を二分して、新しい点のみを追加で解きます。
+        平坦な帯域の点は増やさず、共振ピークと反共振の近傍のみを細かく解くため、
+        一様な細かい格子より少ない求解回数でピークを解像できます。
+
+        Args:
+            frequencies (np.ndarray): 要求する周波数の配列。最小値と最大値が解析範囲になります。
+            load_dof_indices (int or list): 荷重をかける自由度のインデックス。
+            response_dof_indices (int, list, or slice, optional): 応答を観測する自由度のインデックス。デフォルトは全自由度。
+            method (str, optional): 'direct' (`run_frf_direct`) または 'modal' (`run_frf_modal`)。 Defaults to 'direct'.
+            initial_points (int, optional): 初期の等間隔格子の点数。 Defaults to 64.
+            tolerance (float, optional): 線形補間との相対誤差の許容値。 Defaults to 1e-2.
+            max_points (int, optional): 解く周波数点の最大数。固有振動数近傍の初期点もこれに含まれます。
+                                        Defaults to 2000.
+            interpolate (bool, optional): Trueの場合は結果を3次スプラインで frequencies に補間して返します。
+                                          Defaults to False.
+            displacement_derivative (int, optional): 変位の導関数の次数。デフォルトは0は変位。1は速度、2は加速度。
+        Returns:
+            frf: sdynpyの周波数応答解析結果。interpolate=Falseの場合、周波数軸は不等間隔です。
+        """
+        if method == 'direct':
+            solve = self.run_frf_direct
+        elif method == 'modal':
+            solve = self.run_frf_modal
+        else:
+            raise ValueError(f"Unknown FRF method: {method}")
+
+        frequencies = np.asarray(frequencies, dtype=float)
+        f_min, f_max = frequencies.min(), frequencies.max()
+        coarse = np.linspace(f_min, f_max, min(initial_points, max_points))
+        # 固有振動数近傍の点は優先度の高い順に、解く点の総数が max_points を超えない分だけ加える
+        seeds = self._resonance_frequencies(f_min, f_max)
+        seeds = seeds[~np.isin(seeds, coarse)]
+        _, first = np.unique(seeds, return_index=True)
+        seeds = seeds[np.sort(first)][:max_points - coarse.size]
+        grid = np.unique(np.concatenate((coarse, seeds)))
+        frf = solve(grid, load_dof_indices, response_dof_indices, displacement_derivative)
+        ordinate = frf.ordinate.reshape(-1, grid.size)
+
+        while grid.size < max_points:
+            # 内点ごとに、前後の点の線形補間との差を応答の大きさで正規化した誤差
+            weight = (grid[1:-1] - grid[:-2]) / (grid[2:] - grid[:-2])
+            linear = ordinate[:, :-2] + weight * (ordinate[:, 2:] - ordinate[:, :-2])
+            scale = np.maximum(np.maximum(np.abs(ordinate[:, 1:-1]), np.abs(linear)),
+                               1e-8 * np.abs(ordinate).max())
+            error = (np.abs(ordinate[:, 1:-1] - linear) / scale).max(axis=0)
+
+            # 誤差の大きい点の両側の区間を誤差の大きい順に二分
+            interval_error = np.zeros(grid.size - 1)
+            interval_error[:-1] = error
+            interval_error[1:] = np.maximum(interval_error[1:], error)
+            spacing = np.diff(grid)
+            refine = np.flatnonzero((interval_error > tolerance) & (spacing > 1e-9 * (f_max - f_min)))
+            if refine.size == 0:
+                break
+            refine = refine[np.argsort(-interval_error[refine])][:max_points - grid.size]
+            new = grid[refine] + spacing[refine] / 2
+            new_ordinate = solve(new, load_dof_indices, response_dof_indices,
+                                 displacement_derivative).ordinate.reshape(-1, new.size)
+
+            grid = np.concatenate((grid, new))
+            order = np.argsort(grid)
+            grid = grid[order]
+            ordinate = np.concatenate((ordinate, new_ordinate), axis=1)[:, order]
+
+        response_dof = frf.response_coordinate[:, 0]
+        load_dof = frf.reference_coordinate[0, :]
+        ordinate = ordinate.reshape(response_dof.size, load_dof.size, grid.size)
+        if interpolate:
+            ordinate = CubicSpline(grid, ordinate, axis=-1)(frequencies)
+            grid = frequencies
+        return self._frf_array(grid, np.moveaxis(ordinate, -1, 0), response_dof, load_dof)
+
+    def _element_geometry(self):
+        """要素長と回転行列を返します。"""
+        return elements.element_frames(self.pipe.node_positions, self.pipe.node_connectivity,
+                                       self.pipe.bend_direction)
+
+    def gravity_load(self, acceleration=(0.0, 0.0, -9.81)):
+        """
+        自重による等価節点荷重を作成します。
+
+        単位長さあたりの質量 `mass_per_length`（流体がある場合は流体の質量を含む）から
+        全要素の等価節点荷重を一括で計算します。
+
+        Args:
+            acceleration (array-like, optional): 重力加速度ベクトル (m/s²)。(n_cases, 3) で複数ケースを作成できます。
+                                                 Defaults to (0.0, 0.0, -9.81).
+
+        Returns:
+            np.ndarray: 物理自由度の荷重ベクトル。形状は (..., 6 n_nodes)。
+        """
+        lengths, rotations = self._element_geometry()
+        mass_per_length = np.asarray(self.beam_properties['mass_per_length'], dtype=float)
+        if self.fluid_matrices is not None:
+            inner_area = self.section_properties['flow_area']
+            fluid_density = elements.element_values(self.pipe.material_properties['fluid_density'], lengths.size,
+                                                    default=0.0)
+            mass_per_length = mass_per_length + fluid_density * inner_area
+        acceleration = np.asarray(acceleration, dtype=float)
+        loads = mass_per_length[:, np.newaxis] * acceleration[..., np.newaxis, :]
+        return elements.assemble_vectors(elements.distributed_load_vectors(lengths, rotations, loads),
+                                         self.pipe.node_connectivity, self.pipe.node_positions.shape[0])
+
+    def thermal_load(self, temperature_change, expansion_coefficient):
+        """
+        温度変化による熱膨張の等価節点荷重を作成します。
+
+        各要素の熱ひずみ α ΔT に対応する軸力 EA α ΔT を、要素両端の節点荷重として一括で計算します。
+
+        Args:
+            temperature_change (float or np.ndarray): 要素ごとの温度変化 ΔT。(n_cases, n_elements) で複数ケースを作成できます。
+            expansion_coefficient (float or np.ndarray): 要素ごとの線膨張係数 α (1/K)。
+
+        Returns:
+            np.ndarray: 物理自由度の荷重ベクトル。形状は (..., 6 n_nodes)。
+        """
+        lengths, rotations = self._element_geometry()
+        temperature_change = np.asarray(temperature_change, dtype=float)
+        if temperature_change.ndim == 0:
+            temperature_change = np.full(lengths.size, float(temperature_change))
+        strain = np.asarray(expansion_coefficient, dtype=float) * temperature_change
+        # 熱ひずみの等価節点荷重は要素両端に外向きの EA α ΔT
+        forces = np.asarray(self.beam_properties['ae'], dtype=float) * strain
+        return elements.assemble_vectors(elements.axial_force_vectors(rotations, forces),
+                                         self.pipe.node_connectivity, self.pipe.node_positions.shape[0])
+
+    def point_load(self, coordinates, dof_indices, values):
+        """
+        座標で指定した節点の自由度に集中荷重を与える荷重ベクトルを作成します。
+
+        Args:
+            coordinates (np.ndarray): (n, 3) の荷重位置。最も近い節点に作用させます。
+            dof_indices (int or np.ndarray): 節点内の自由度インデックス (0-5)。スカラーまたは長さnの配列。
+            values (float or np.ndarray): 荷重の大きさ。スカラーまたは長さnの配列。
+
+        Returns:
+            np.ndarray: (6 n_nodes,) の物理自由度の荷重ベクトル。
+        """
+        dofs = self._point_dofs(coordinates, dof_indices)
+        values = np.broadcast_to(np.asarray(values, dtype=float), dofs.shape)
+        return np.bincount(dofs, weights=values, minlength=6 * self.pipe.node_positions.shape[0])
+
+    def run_static_analysis(self, loads):
+        """
+        静解析を実行し、全荷重ケースの節点変位を計算します。
+
+        拘束されたシステムの疎な剛性行列を一度だけ分解してキャッシュし、
+        すべての荷重ケースを複数の右辺として一括で解きます。
+
+        Args:
+            loads (np.ndarray): (6 n_nodes,) または (n_cases, 6 n_nodes) の物理自由度の荷重ベクトル。
+                                `gravity_load`, `thermal_load`, `point_load` の結果を組み合わせて使用します。
+
+        Returns:
+            np.ndarray: (n_cases, n_nodes, 6) の節点変位（並進3成分と回転3成分）。
+        """
+        loads = np.atleast_2d(np.asarray(loads, dtype=float))
+        system, factorization = self._static_factorization
+        if system is not self.system:
+            # 剛性行列は対称正定値のため、対称モードで分解（SciPyには疎行列のCholesky分解がない）
+            factorization = spla.splu(sps.csc_matrix(self.system.stiffness), permc_spec='MMD_AT_PLUS_A',
+                                      diag_pivot_thresh=0.0, options={'SymmetricMode': True})
+            self._static_factorization = (self.system, factorization)
+
+        transformation = self._transformation_matrix()
+        displacement = transformation @ factorization.solve(np.asarray(transformation.T @ loads.T))
+        return displacement.T.reshape(loads.shape[0], -1, 6)
+
+    def reanalyze_eigensolution(self, dof_indices, stiffness_change=None, mass_change=None):
+        """
+        局所的な剛性・質量の変更に対する固有値解析結果を、既存の固有値解析結果から更新します。
+
+        変更 ΔK, ΔM が自由度 U に限られる場合、保持しているモード Φ を基底とした
+        縮約行列 diag(ω_r²) + Φ_Uᵀ ΔK Φ_U と I + Φ_Uᵀ ΔM Φ_U は変更のランクに比例するコストで求まり、
+        モード数の大きさの固有値問題を解くだけで更新できます。
+        結果は保持しているモードの張る空間内での近似であり、システムと `eigensolution` は変更しません。
+        打ち切ったモードの寄与は含まれないため、変更後の低次の固有振動数は真値よりわずかに高くなります。
+
+        Args:
+            dof_indices (int or list): 変更する自由度のインデックス。
+            stiffness_change (float or np.ndarray, optional): 剛性の変化量。スカラー、対角成分の配列、
+                                                              または (r, r) の行列。 Defaults to None.
+            mass_change (float or np.ndarray, optional): 質量の変化量。形式は stiffness_change と同じ。
+                                                         Defaults to None.
+
+        Returns:
+            eigensolution: 更新されたsdynpyの固有値解析結果。
+        """
+        if self.eigensolution is None:
+            raise RuntimeError("再解析を使用するには、先に `run_eigensolution` を実行してください。")
+
+        shapes = self.eigensolution
+        changed_dof = np.atleast_1d(self.system.coordinate[dof_indices])
+        omega_r = 2 * np.pi * np.asarray(shapes.frequency, dtype=float).ravel()
+        changed_shapes = np.asarray(shapes[changed_dof]).reshape(omega_r.size, -1)
+        delta_stiffness = _local_change_matrix(stiffness_change, changed_dof.size)
+        delta_mass = _local_change_matrix(mass_change, changed_dof.size)
+
+        reduced_stiffness = np.diag(omega_r**2) + changed_shapes @ delta_stiffness @ changed_shapes.T
+        reduced_mass = np.eye(omega_r.size) + changed_shapes @ delta_mass @ changed_shapes.T
+        eigenvalues, vectors = scipy.linalg.eigh(reduced_stiffness, reduced_mass)
+        if isinstance(shapes, CompactModeShapes):
+            return shapes.combine(vectors.T, np.sqrt(np.maximum(eigenvalues, 0.0)) / (2 * np.pi))
+        return sdpy.shape_array(shapes.coordinate[0], vectors.T @ shapes.shape_matrix,
+                                np.sqrt(np.maximum(eigenvalues, 0.0)) / (2 * np.pi))
+
+    def reanalyze_frf(self, frf, dof_indices, stiffness_change=None, mass_change=None, displacement_derivative=0):
+        """
+        局所的な剛性・質量の変更に対する既存のFRFをSherman–Morrison–Woodburyの公式で更新します。
+
+        変更後の動剛性 Z + UΔ(ω)Uᵀ (Δ = ΔK - ω²ΔM) に対し
+        H' = H - H_aU Δ (I + H_UU Δ)⁻¹ H_Ub を全周波数一括で計算します。
+        H_ab は既存のFRFをそのまま使い、変更自由度を含む H_aU, H_UU, H_Ub は保持しているモードから求めるため、
+        コストはモデルの大きさではなく変更のランクとモード数に比例します。事前に `run_eigensolution` が必要です。
+        モードから求める項では減衰を比例減衰として評価し、要素ごとの損失係数が設定されている場合はValueErrorとなります。
+        H_aU, H_UU, H_Ub は打ち切ったモードの剰余柔性を含まないため、誤差はモードの打ち切りに支配されます。
+        解析周波数帯の上限の数倍までのモードを保持してください。
+
+        Args:
+            frf: `run_frf_direct` または `run_frf_modal` で計算したsdynpyのFRF。
+            dof_indices (int or list): 変更する自由度のインデックス。
+            stiffness_change (float or np.ndarray, optional): 剛性の変化量。スカラー、対角成分の配列、
+                                                              または (r, r) の行列。 Defaults to None.
+            mass_change (float or np.ndarray, optional): 質量の変化量。形式は stiffness_change と同じ。
+                                                         Defaults to None.
+            displacement_derivative (int, optional): frf の変位の導関数の次数。 Defaults to 0.
+
+        Returns:
+            frf: 更新されたsdynpyのFRF。
+        """
+        if self.eigensolution is None:
+            raise RuntimeError("再解析を使用するには、先に `run_eigensolution` を実行してください。")
+
+        frequencies = np.asarray(frf.abscissa[0, 0], dtype=float)
+        response_dof = frf.response_coordinate[:, 0]
+        load_dof = frf.reference_coordinate[0, :]
+        changed_dof = np.atleast_1d(self.system.coordinate[dof_indices])
+        derivative = (2j * np.pi * frequencies[:, np.newaxis, np.newaxis])**displacement_derivative
+
+        omega = 2 * np.pi * frequencies[:, np.newaxis, np.newaxis]
+        delta = (_local_change_matrix(stiffness_change, changed_dof.size)
+                 - omega**2 * _local_change_matrix(mass_change, changed_dof.size))
+        h_au = self._modal_receptance(frequencies, response_dof, changed_dof)
+        h_uu = self._modal_receptance(frequencies, changed_dof, changed_dof)
+        h_ub = self._modal_receptance(frequencies, changed_dof, load_dof)
+
+        identity = np.eye(changed_dof.size)
+        correction = h_au @ delta @ np.linalg.solve(identity + h_uu @ delta, h_ub)
+        ordinate = np.moveaxis(frf.ordinate, -1, 0) - derivative * correction
+        return self._frf_array(frequencies, ordinate, response_dof, load_dof)
+
+    def run_flow_velocity_sweep(self, flow_velocities, num_modes, method='modal', num_basis_modes=None):
+        """
+        流速を変化させたときの固有振動数を計算します。
+
+        流体を含むすべての要素に同一の流速を与え、ジャイロ項を含む状態空間の固有値問題を解きます。
+        流速に依存しない行列は一度だけ計算し、各流速で再利用します。
+
+        - 'modal': 流速0の非減衰モード（num_basis_modes 個）を一度だけ計算して基底とし、
+          各流速の縮約された状態空間固有値問題を一括で解きます。
+        - 'state_space': 疎行列の状態空間固有値問題をシフト・インバート法で解きます。
+          各流速で必要な分解は剛性行列 K(U) のLU分解のみです。拘束されたシステムが必要です。
+
+        Args:
+            flow_velocities (np.ndarray): 流速 (m/s) の配列。
+            num_modes (int): 計算するモード数。
+            method (str, optional): 'modal' または 'state_space'。 Defaults to 'modal'.
+            num_basis_modes (int, optional): 'modal' で使用する基底モード数。Noneの場合は num_modes の3倍。
+
+        Returns:
+            dict: 'flow_velocity' (流速), 'eigenvalues' ((流速数, num_modes) の複素固有値),
+                  'frequency' ((流速数, num_modes) の固有振動数 Hz) を持つ辞書。
+        """
+        if self.fluid_matrices is None:
+            raise RuntimeError("流速スイープには材料特性 'fluid_density' の指定が必要です。")
+
+        flow_velocities = np.atleast_1d(np.asarray(flow_velocities, dtype=float))
+        transformation = self.system.transformation
+
+        def reduce(matrix):
+            return transformation.T @ (matrix @ transformation)
+
+        mass = self.system.mass
+        # 流速に依存しない剛性（構造＋内圧）
+        stiffness = (self.system.stiffness - reduce(self.fluid_matrices['stiffness'])
+                     + reduce(self.fluid_matrices['pressure']))
+        centrifugal = reduce(self.fluid_matrices['centrifugal_per_velocity_squared'])
+        gyroscopic = reduce(self.fluid_matrices['gyroscopic_per_velocity'])
+
+        if method == 'modal':
+            eigenvalues = self._flow_sweep_modal(flow_velocities, mass, stiffness, centrifugal, gyroscopic,
+                                                 num_modes, num_basis_modes)
+        elif method == 'state_space':
+            eigenvalues = self._flow_sweep_state_space(flow_velocities, mass, stiffness, centrifugal, gyroscopic,
+                                                       num_modes)
+        else:
+            raise ValueError(f"Unknown method: {method}")
+
+        return {
+            'flow_velocity': flow_velocities,
+            'eigenvalues': eigenvalues,
+            'frequency': np.abs(eigenvalues.imag) / (2 * np.pi),
+        }
+
+    def _flow_sweep_modal(self, flow_velocities, mass, stiffness, centrifugal, gyroscopic, num_modes,
+                          num_basis_modes):
+        """流速0の非減衰モードを基底とした縮約モデルで流速スイープを行います。"""
+        ndof = mass.shape[0]
+        if num_basis_modes is None:
+            num_basis_modes = 3 * num_modes
+        num_basis_modes = min(num_basis_modes, ndof)
+        if num_basis_modes < ndof - 1 and ndof > 200:
+            omega_squared, basis = spla.eigsh(sps.csc_matrix(stiffness), k=num_basis_modes,
+                                              M=sps.csc_matrix(mass), sigma=-1.0)
+        else:
+            omega_squared, basis = scipy.linalg.eigh(stiffness, mass, subset_by_index=[0, num_basis_modes - 1])
+        basis /= np.sqrt(np.einsum('ij,ik,kj->j', basis, mass, basis))
+
+        reduced_stiffness = np.diag(omega_squared) + np.multiply.outer(flow_velocities**2,
+                                                                       basis.T @ centrifugal @ basis)
+        reduced_gyroscopic = np.multiply.outer(flow_velocities, basis.T @ gyroscopic @ basis)
+        n = num_basis_modes
+        state = np.zeros((flow_velocities.size, 2 * n, 2 * n))
+        state[:, :n, n:] = np.eye(n)
+        state[:, n:, :n] = -reduced_stiffness
+        state[:, n:, n:] = -reduced_gyroscopic
+        return _select_modes(np.linalg.eigvals(state), num_modes)
+
+    def _flow_sweep_state_space(self, flow_velocities, mass, stiffness, centrifugal, gyroscopic, num_modes):
+        """疎行列の状態空間固有値問題を流速ごとにシフト・インバート法で解きます。"""
+        ndof = mass.shape[0]
+        identity = sps.identity(ndof, format='csc')
+        mass = sps.csc_matrix(mass)
+        stiffness = sps.csc_matrix(stiffness)
+        centrifugal = sps.csc_matrix(centrifugal)
+        gyroscopic = sps.csc_matrix(gyroscopic)
+        state_mass = sps.block_diag((identity, mass), format='csc')
+
+        results = []
+        for velocity in flow_velocities:
+            current_stiffness = (stiffness + velocity**2 * centrifugal).tocsc()
+            current_gyroscopic = velocity * gyroscopic
+            lu = spla.splu(current_stiffness)
+            state = sps.bmat([[None, identity], [-current_stiffness, -current_gyroscopic]], format='csc')
+
+            def solve_state(y, lu=lu, current_gyroscopic=current_gyroscopic):
+                # [[0, I], [-K, -G]] x = y を K のLU分解のみで解く
+                y1, y2 = y[:ndof], y[ndof:]
+                x1 = -lu.solve(np.asarray(y2 + current_gyroscopic @ y1))
+                return np.concatenate((x1, y1))
 
-        return self.eigensolution.compute_frf(frequencies=frequencies,
-                                              references=load_dof,
-                                              responses=response_dof,
-                                              displacement_derivative=displacement_derivative)
\ No newline at end of file
+            inverse = spla.LinearOperator(state.shape, matvec=solve_state, dtype=float)
+            eigenvalues = spla.eigs(state, k=min(2 * num_modes, 2 * ndof - 2), M=state_mass, sigma=0,
+                                    OPinv=inverse, return_eigenvectors=False)
+            results.append(_select_modes(eigenvalues, num_modes))
+        return np.array(results)
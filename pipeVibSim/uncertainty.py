@@ -0,0 +1,267 @@
+import numpy as np
+
+from . import elements
+from .parallel import shared_executor, shared_object
+from .recovery import modal_displacements
+
+# サンプリングできる要素ごとの材料特性
+MATERIAL_PARAMETERS = ('young_modulus', 'thickness')
+
+def _physical_dofs(analysis, dof_indices):
+    """システムの自由度インデックスを物理自由度のインデックス 6 (節点 - 1) + (方向 - 1) に変換します。"""
+    coordinate = np.atleast_1d(analysis.system.coordinate[dof_indices])
+    return 6 * (coordinate.node.astype(int) - 1) + np.abs(coordinate.direction).astype(int) - 1
+
+
+class ReducedBasisModel:
+    """
+    要素ごとのヤング率と肉厚の変化に対する固有値問題を、公称モデルのモード部分空間に縮約したモデル。
+
+    公称モデルの質量正規化モード Φ を基底とし、各要素の剛性成分 (EA, GJ, EI) と
+    質量成分 (ρA, ρJ) ごとに縮約要素行列 Φ_eᵀ k_e Φ_e を前計算します。
+    内部流体がある場合は、内部断面積に比例する流体の剛性 -(ρ_f U² + p) A_i と線密度 ρ_f A_i も
+    成分に加え、肉厚のサンプルに応じて更新します。
+    任意のサンプルの縮約行列はこれらの線形結合
+    K_r = diag(ω²) + Σ_e Σ_c Δp_ec K_ec、M_r = I + Σ_e Σ_c Δq_ec M_ec
+    となるため、全サンプルを1回の行列積と (モード数, モード数) の一括固有値解析で評価できます。
+    ばね、集中質量、流れによるジャイロ行列と拘束条件は公称モデルのまま変化しないものとして扱います。
+
+    Args:
+        analysis (VibrationAnalysis): 公称モデルの解析オブジェクト。
+        maximum_frequency (float, optional): 基底とするモードの最大周波数。Noneの場合は
+                                             `analysis.eigensolution` のモードを使用します。 Defaults to None.
+    """
+
+    def __init__(self, analysis, maximum_frequency=None):
+        if maximum_frequency is not None:
+            shapes = analysis.system.eigensolution(maximum_frequency=maximum_frequency)
+            frequency = np.asarray(shapes.frequency, dtype=float).ravel()
+            basis = np.real(np.asarray(shapes[analysis.system.coordinate])).reshape(frequency.size, -1)
+        else:
+            frequency = np.asarray(analysis.eigensolution.frequency, dtype=float).ravel()
+            basis = np.real(modal_displacements(analysis))
+        self.frequency = frequency
+        self.basis = basis
+
+        props = analysis.pipe.material_properties
+        n_elements = analysis.pipe.node_connectivity.shape[0]
+        self.nominal = {name: elements.element_values(props[name], n_elements) for name in MATERIAL_PARAMETERS}
+        self.poisson_ratio = elements.element_values(props['poisson_ratio'], n_elements)
+        self.density = elements.element_values(props['density'], n_elements)
+        self.outer_diameter = elements.element_values(props['outer_diameter'], n_elements)
+
+        # 各成分の値を1とした全体座標系の要素行列を、要素ごとのモード形状で縮約
+        lengths, rotations = analysis._element_geometry()
+        stiffness, mass = elements.unit_component_matrices(lengths, rotations)
+        self.fluid = None
+        if analysis.fluid_matrices is not None:
+            self.fluid = {key: elements.element_values(props.get(key, 0.0), n_elements, default=0.0)
+                          for key in ('fluid_density', 'flow_velocity', 'internal_pressure')}
+            fluid_stiffness, fluid_mass = elements.unit_fluid_matrices(lengths, rotations)
+            stiffness = np.concatenate((stiffness, fluid_stiffness[:, np.newaxis]), axis=1)
+            mass = np.concatenate((mass, fluid_mass[:, np.newaxis]), axis=1)
+        element_shapes = basis[:, elements.element_dof_indices(analysis.pipe.node_connectivity)]
+
+        def reduce(matrices):
+            # (要素, 成分, 12, 12) -> (要素 × 成分, モード数²)
+            reduced = np.einsum('mei,ecij,nej->ecmn', element_shapes, matrices, element_shapes, optimize=True)
+            return reduced.reshape(-1, frequency.size**2)
+
+        self.stiffness_components = reduce(stiffness)
+        self.mass_components = reduce(mass)
+        self._nominal_stiffness, self._nominal_mass = self.section_components(**self.nominal)
+
+    @property
+    def size(self):
+        """基底のモード数。"""
+        return self.frequency.size
+
+    def section_components(self, young_modulus, thickness):
+        """
+        ヤング率と肉厚から剛性成分 (EA, GJ, EI) と質量成分 (ρA, ρJ) を計算します。
+
+        内部流体がある場合は、剛性成分に流体の剛性の係数、質量成分に流体の線密度が末尾に加わります。
+
+        Args:
+            young_modulus (np.ndarray): (..., n_elements) のヤング率。
+            thickness (np.ndarray): (..., n_elements) の肉厚。
+
+        Returns:
+            tuple: (..., n_elements, 3) の剛性成分と (..., n_elements, 2) の質量成分
+                   （内部流体がある場合はそれぞれ1成分多くなります）。
+        """
+        stiffness, mass = elements.pipe_section_components(young_modulus, self.poisson_ratio, self.density,
+                                                           self.outer_diameter, thickness)
+        if self.fluid is None:
+            return stiffness, mass
+        fluid_stiffness, fluid_mass = elements.fluid_section_components(self.outer_diameter, thickness, **self.fluid)
+        return (np.concatenate((stiffness, fluid_stiffness[..., np.newaxis]), axis=-1),
+                np.concatenate((mass, fluid_mass[..., np.newaxis]), axis=-1))
+
+    def solve(self, young_modulus=None, thickness=None):
+        """
+        サンプルごとの固有振動数と縮約座標のモードを一括で計算します。
+
+        Args:
+            young_modulus (np.ndarray, optional): (n_samples, n_elements) のヤング率。Noneは公称値。
+                                                  Defaults to None.
+            thickness (np.ndarray, optional): (n_samples, n_elements) の肉厚。Noneは公称値。 Defaults to None.
+
+        Returns:
+            tuple: (n_samples, モード数) の固有振動数 (Hz) と、
+                   列が質量正規化された縮約座標のモードである (n_samples, モード数, モード数) の配列。
+        """
+        young_modulus = self.nominal['young_modulus'] if young_modulus is None else young_modulus
+        thickness = self.nominal['thickness'] if thickness is None else thickness
+        young_modulus, thickness = np.broadcast_arrays(np.atleast_2d(young_modulus), np.atleast_2d(thickness))
+        stiffness, mass = self.section_components(young_modulus, thickness)
+        n_samples, m = young_modulus.shape[0], self.size
+
+        omega2 = (2 * np.pi * self.frequency)**2
+        reduced_stiffness = ((stiffness - self._nominal_stiffness).reshape(n_samples, -1)
+                             @ self.stiffness_components).reshape(n_samples, m, m) + np.diag(omega2)
+        reduced_mass = ((mass - self._nominal_mass).reshape(n_samples, -1)
+                        @ self.mass_components).reshape(n_samples, m, m) + np.eye(m)
+
+        # M_r = L Lᵀ として標準固有値問題 L⁻¹ K_r L⁻ᵀ y = λ y に変換
+        inverse_factor = np.linalg.solve(np.linalg.cholesky(reduced_mass), np.eye(m))
+        standard = inverse_factor @ reduced_stiffness @ np.swapaxes(inverse_factor, 1, 2)
+        eigenvalues, vectors = np.linalg.eigh((standard + np.swapaxes(standard, 1, 2)) / 2)
+        frequency = np.sqrt(np.maximum(eigenvalues, 0.0)) / (2 * np.pi)
+        return frequency, np.swapaxes(inverse_factor, 1, 2) @ vectors
+
+    def frf_magnitude(self, frequency, vectors, frequencies, response_dofs, load_dofs, damping_ratio=0.01):
+        """
+        サンプルごとのモードから変位FRFの振幅 (n_samples, 応答数, 荷重数, 周波数点数) を計算します。
+
+        Args:
+            frequency (np.ndarray): `solve` が返す固有振動数。
+            vectors (np.ndarray): `solve` が返す縮約座標のモード。
+            frequencies (np.ndarray): 周波数 (Hz)。
+            response_dofs (np.ndarray): 応答の物理自由度のインデックス。
+            load_dofs (np.ndarray): 荷重の物理自由度のインデックス。
+            damping_ratio (float, optional): モード減衰比。 Defaults to 0.01.
+
+        Returns:
+            np.ndarray: FRFの振幅。
+        """
+        omega_r = 2 * np.pi * frequency
+        omega = 2 * np.pi * np.asarray(frequencies, dtype=float)
+        response_shapes = np.einsum('md,smk->skd', self.basis[:, response_dofs], vectors)
+        load_shapes = np.einsum('md,smk->skd', self.basis[:, load_dofs], vectors)
+        denominator = (omega_r[..., np.newaxis]**2 - omega**2
+                       + 2j * damping_ratio * omega_r[..., np.newaxis] * omega)
+        return np.abs(np.einsum('skr,skl,skf->srlf', response_shapes, load_shapes, 1 / denominator,
+                                optimize=True))
+
+
+def sample_material_arrays(parameters, n_elements, n_samples, method='latin_hypercube', seed=None):
+    """
+    要素ごとの材料特性のサンプルを作成します。
+
+    各要素・各特性を独立な確率変数とし、[0, 1) の一様乱数（ラテン超方格法では
+    各列を n_samples 個の層に1点ずつ割り当てたもの）を分布の逆関数 ppf で変換します。
+
+    Args:
+        parameters (dict): 特性名をキー、scipy.statsの分布（凍結済み）を値とする辞書。
+                           分布のパラメータは要素数の配列でも構いません。
+        n_elements (int): 要素数。
+        n_samples (int): サンプル数。
+        method (str, optional): 'latin_hypercube' または 'monte_carlo'。 Defaults to 'latin_hypercube'.
+        seed (int, optional): 乱数のシード。 Defaults to None.
+
+    Returns:
+        dict: 特性名をキー、(n_samples, n_elements) のサンプルを値とする辞書。
+    """
+    rng = np.random.default_rng(seed)
+    shape = (n_samples, len(parameters) * n_elements)
+    if method == 'latin_hypercube':
+        strata = rng.permuted(np.broadcast_to(np.arange(n_samples)[:, np.newaxis], shape), axis=0)
+        uniform = (strata + rng.random(shape)) / n_samples
+    elif method == 'monte_carlo':
+        uniform = rng.random(shape)
+    else:
+        raise ValueError(f"Unknown sampling method: {method}")
+    uniform = uniform.reshape(n_samples, len(parameters), n_elements)
+    return {name: np.asarray(distribution.ppf(uniform[:, i]), dtype=float)
+            for i, (name, distribution) in enumerate(parameters.items())}
+
+
+def _evaluate_samples(job):
+    samples, num_modes, frf_settings = job
+    model = shared_object()
+    frequency, vectors = model.solve(**samples)
+    magnitude = None
+    if frf_settings is not None:
+        magnitude = model.frf_magnitude(frequency, vectors, **frf_settings)
+    return frequency[:, :num_modes], magnitude
+
+
+def run_monte_carlo(analysis, parameters, n_samples, maximum_frequency, num_modes=None,
+                    method='latin_hypercube', frequencies=None, load_dof_indices=None, response_dof_indices=None,
+                    damping_ratio=0.01, percentiles=(5, 50, 95), chunk_size=1000, max_workers=1, seed=None):
+    """
+    要素ごとのヤング率・肉厚のばらつきに対する固有振動数とFRFの統計量を計算します。
+
+    `ReducedBasisModel` で公称モデルのモード部分空間に縮約し、サンプルを chunk_size ごとに
+    プロセスプールで並列に評価します。縮約モデルは各ワーカーに1度だけ送られます。
+    基底の打ち切りによる誤差を抑えるため、num_modes は基底のモード数より十分小さくしてください。
+
+    Args:
+        analysis (VibrationAnalysis): 公称モデルの解析オブジェクト。
+        parameters (dict): 'young_modulus', 'thickness' をキー、scipy.statsの分布を値とする辞書。
+        n_samples (int): サンプル数。
+        maximum_frequency (float): 基底とするモードの最大周波数。
+        num_modes (int, optional): 統計量を求める低次モードの数。Noneは基底のモード数の半分。 Defaults to None.
+        method (str, optional): 'latin_hypercube' または 'monte_carlo'。 Defaults to 'latin_hypercube'.
+        frequencies (np.ndarray, optional): FRFの周波数 (Hz)。Noneの場合はFRFを計算しません。 Defaults to None.
+        load_dof_indices (list, optional): 荷重自由度のインデックス。 Defaults to None.
+        response_dof_indices (list, optional): 応答自由度のインデックス。 Defaults to None.
+        damping_ratio (float, optional): FRFのモード減衰比。 Defaults to 0.01.
+        percentiles (tuple, optional): 計算するパーセンタイル。 Defaults to (5, 50, 95).
+        chunk_size (int, optional): 1回に評価するサンプル数。 Defaults to 1000.
+        max_workers (int, optional): ワーカープロセス数。1の場合は現在のプロセスで順に評価します。
+                                     Defaults to 1.
+        seed (int, optional): 乱数のシード。 Defaults to None.
+
+    Returns:
+        dict: 'samples' (特性ごとのサンプル), 'frequency' ((n_samples, num_modes) の固有振動数),
+              'frequency_mean', 'frequency_std', 'percentiles',
+              'frequency_percentiles' ((パーセンタイル数, num_modes)) を持つ辞書。
+              frequencies を指定した場合は 'frequencies' と
+              'frf_percentiles' ((パーセンタイル数, 応答数, 荷重数, 周波数点数) のFRF振幅の包絡線) も含みます。
+    """
+    unknown = set(parameters) - set(MATERIAL_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown material parameters: {sorted(unknown)}")
+    model = ReducedBasisModel(analysis, maximum_frequency)
+    num_modes = max(model.size // 2, 1) if num_modes is None else num_modes
+    samples = sample_material_arrays(parameters, analysis.pipe.node_connectivity.shape[0], n_samples,
+                                     method=method, seed=seed)
+
+    frf_settings = None
+    if frequencies is not None:
+        frf_settings = {'frequencies': np.asarray(frequencies, dtype=float),
+                        'response_dofs': _physical_dofs(analysis, response_dof_indices),
+                        'load_dofs': _physical_dofs(analysis, load_dof_indices),
+                        'damping_ratio': damping_ratio}
+    jobs = [({name: values[start:start + chunk_size] for name, values in samples.items()}, num_modes, frf_settings)
+            for start in range(0, n_samples, chunk_size)]
+
+    with shared_executor(model, max_workers) as executor:
+        results = list(map(_evaluate_samples, jobs) if executor is None else executor.map(_evaluate_samples, jobs))
+
+    frequency = np.concatenate([result[0] for result in results])
+    output = {
+        'samples': samples,
+        'frequency': frequency,
+        'frequency_mean': frequency.mean(axis=0),
+        'frequency_std': frequency.std(axis=0),
+        'percentiles': np.asarray(percentiles),
+        'frequency_percentiles': np.percentile(frequency, percentiles, axis=0),
+    }
+    if frf_settings is not None:
+        output['frequencies'] = frf_settings['frequencies']
+        output['frf_percentiles'] = np.percentile(np.concatenate([result[1] for result in results]),
+                                                  percentiles, axis=0)
+    return output
@@ -8,5 +8,6 @@ setup(
         'numpy',
         'sdynpy @ git+https://github.com/TatsuyaKatayama/sdynpy.git@develop',
         'matplotlib',
+        'scipy',
     ],
 )
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from pipeVibSim.pipe import Pipe
+from pipeVibSim.pipe_path import PipePath
+from pipeVibSim.simulation import VibrationAnalysis
+
+
+@pytest.fixture
+def material_props():
+    """公称の材料特性を提供するフィクスチャ"""
+    return {
+        'young_modulus': 2.06e11,
+        'poisson_ratio': 0.3,
+        'density': 7850,
+        'outer_diameter': 0.1143,
+        'thickness': 0.01,
+    }
+
+
+@pytest.fixture
+def straight_path():
+    """長さ2 mの直管の経路を提供するフィクスチャ"""
+    return PipePath(np.array([[0, 0, 0], [2, 0, 0]], dtype=float), radius=0.1, step=0.1)
+
+
+@pytest.fixture
+def l_path():
+    """L字配管の経路を提供するフィクスチャ"""
+    return PipePath(np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0]], dtype=float), radius=0.2, step=0.1)
+
+
+@pytest.fixture
+def make_cantilever():
+    """始点を固定し、指定した節点の並進を拘束した解析オブジェクトを作成する関数を提供するフィクスチャ"""
+    def make(path, material_props, supports=()):
+        analysis = VibrationAnalysis(Pipe(path, material_props))
+        analysis.substructure_by_coordinate([(path.node_positions[0], None)]
+                                            + [(path.node_positions[i], [0, 1, 2]) for i in supports])
+        return analysis
+    return make
+
+
+@pytest.fixture
+def cantilever_analysis(make_cantilever, straight_path, material_props):
+    """長さ2 mの片持ち直管の解析オブジェクトを提供するフィクスチャ"""
+    return make_cantilever(straight_path, material_props)
+
+
+@pytest.fixture
+def cantilever_l_pipe(make_cantilever, l_path, material_props):
+    """片持ちL字配管の解析オブジェクトを提供するフィクスチャ"""
+    return make_cantilever(l_path, material_props)
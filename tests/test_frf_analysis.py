@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from pipeVibSim.frf_analysis import find_peaks, fit_rational_fraction, identify_modes, match_modes
+from pipeVibSim.postprocessing import frf_arrays
+
+
+@pytest.fixture
+def synthetic_frf():
+    """既知のモード特性を持つ3自由度相当の合成FRFを提供するフィクスチャ"""
+    frequencies = np.linspace(1, 200, 4000)
+    omega = 2 * np.pi * frequencies[:, np.newaxis]
+    natural_frequencies = np.array([40.0, 110.0, 170.0])
+    damping = np.array([0.01, 0.02, 0.015])
+    modal_constants = np.array([[300.0, 800.0, 500.0],
+                                [-200.0, 400.0, 900.0]])
+    omega_n = 2 * np.pi * natural_frequencies
+    ordinate = (modal_constants[:, np.newaxis, :]
+                / (omega_n ** 2 - omega ** 2 + 2j * damping * omega_n * omega)).sum(axis=-1)
+    return frequencies, ordinate, natural_frequencies, damping, modal_constants
+
+
+def test_find_peaks_per_curve(synthetic_frf):
+    frequencies, ordinate, natural_frequencies, _, _ = synthetic_frf
+    peaks = find_peaks(np.abs(ordinate))
+    assert peaks.shape == ordinate.shape
+    for row in peaks:
+        np.testing.assert_allclose(frequencies[row], natural_frequencies, rtol=5e-3)
+
+
+def test_identify_modes_half_power(synthetic_frf):
+    frequencies, ordinate, natural_frequencies, damping, modal_constants = synthetic_frf
+    result = identify_modes(frequencies, ordinate)
+
+    assert result['frequency'].size == 6
+    np.testing.assert_array_equal(result['curve'], [0, 0, 0, 1, 1, 1])
+    np.testing.assert_allclose(result['frequency'], np.tile(natural_frequencies, 2), rtol=5e-3)
+    np.testing.assert_allclose(result['damping'], np.tile(damping, 2), rtol=0.05)
+    np.testing.assert_allclose(result['residue'].real, modal_constants.ravel(), rtol=0.1)
+
+
+def test_half_power_points_near_band_edge(synthetic_frf):
+    """半値点が周波数範囲外にあるピークの減衰比はNaNとなり、他のピークは影響を受けないことをテスト"""
+    frequencies, ordinate, natural_frequencies, damping, _ = synthetic_frf
+    mask = frequencies <= 170.5
+    result = identify_modes(frequencies[mask], ordinate[:, mask])
+
+    np.testing.assert_allclose(result['frequency'], np.tile(natural_frequencies, 2), rtol=5e-3)
+    assert np.all(np.isnan(result['damping'][[2, 5]]))
+    np.testing.assert_allclose(result['damping'][[0, 1, 3, 4]], np.tile(damping[:2], 2), rtol=0.05)
+
+
+def test_fit_rational_fraction(synthetic_frf):
+    frequencies, ordinate, natural_frequencies, damping, modal_constants = synthetic_frf
+    result = fit_rational_fraction(frequencies, ordinate, n_modes=3)
+
+    np.testing.assert_allclose(result['frequency'], natural_frequencies, rtol=1e-6)
+    np.testing.assert_allclose(result['damping'], damping, rtol=1e-4)
+    # 留数 R とモード定数 A の関係: A = 2jωd R
+    constants = 2j * result['residues'] * result['poles'].imag
+    np.testing.assert_allclose(constants.real, modal_constants, rtol=1e-4)
+
+
+def test_fit_rational_fraction_frequency_range(synthetic_frf):
+    frequencies, ordinate, natural_frequencies, _, _ = synthetic_frf
+    result = fit_rational_fraction(frequencies, ordinate, n_modes=1, frequency_range=(20, 60))
+    np.testing.assert_allclose(result['frequency'], natural_frequencies[:1], rtol=5e-3)
+
+
+def test_match_modes_with_eigensolution(cantilever_l_pipe):
+    analysis = cantilever_l_pipe
+    shapes = analysis.run_eigensolution(maximum_frequency=300)
+    frf = analysis.run_frf_direct(np.linspace(1, 300, 3000), load_dof_indices=[-6, -5, -4],
+                                  response_dof_indices=[-6, -5, -4])
+
+    frequencies, ordinate = frf_arrays(frf)
+    result = identify_modes(frequencies, ordinate)
+    matched = match_modes(result['frequency'], shapes, tolerance=0.01)
+
+    assert np.all(matched['mode_index'] >= 0)
+    assert np.all(np.abs(matched['relative_error']) < 0.01)
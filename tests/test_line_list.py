@@ -0,0 +1,137 @@
+import json
+
+import numpy as np
+import pytest
+
+import pipeVibSim.line_list as line_list
+from pipeVibSim.line_list import (CORNER_FILLET, CORNER_STRAIGHT, CORNER_U_BEND, classify_corners,
+                                  import_line_lists, read_line_lists, validate_segments)
+from pipeVibSim.pipe_path import PipePath
+
+MATERIAL = {'young_modulus': 2.06e11, 'poisson_ratio': 0.3, 'density': 7850, 'outer_diameter': 0.1143,
+            'thickness': 0.01}
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    """2ライン（うち1つは2セグメント）を含むCSV形式のラインリストを提供するフィクスチャ"""
+    rows = [
+        'line,segment,x,y,z,radius,step,thickness',
+        'L-100,1,0,0,0,,0.1,0.01',
+        'L-100,1,1,0,0,0.2,0.1,0.01',
+        'L-100,1,1,1,0,,0.1,0.01',
+        'L-100,2,1,1,0,,0.05,0.008',
+        'L-100,2,1,1,1,,0.05,0.008',
+        'L-200,1,0,0,0,,0.1,',
+        'L-200,1,2,0,0,,0.1,',
+    ]
+    path = tmp_path / 'lines.csv'
+    path.write_text('\n'.join(rows) + '\n')
+    return str(path)
+
+
+def test_read_csv_and_jsonl(csv_file, tmp_path):
+    """CSVとJSON Linesのラインリストが同じセグメントとして読み込まれることをテスト"""
+    lines = list(read_line_lists(csv_file))
+    assert [line_id for line_id, _ in lines] == ['L-100', 'L-200']
+    segments = lines[0][1]
+    assert len(segments) == 2
+    np.testing.assert_array_equal(segments[0]['radius'], [0.2])
+    assert segments[1]['step'] == 0.05 and segments[1]['material'] == {'thickness': 0.008}
+    assert lines[1][1][0]['material'] == {}
+
+    jsonl = tmp_path / 'lines.jsonl'
+    records = [{'line': line_id, 'segments': [{**s, 'points': s['points'].tolist(), 'radius': s['radius'].tolist()}
+                                              for s in segments]} for line_id, segments in lines]
+    jsonl.write_text('\n'.join(json.dumps(record) for record in records))
+    for (csv_id, csv_segments), (json_id, json_segments) in zip(lines, read_line_lists(str(jsonl))):
+        assert csv_id == json_id
+        for a, b in zip(csv_segments, json_segments):
+            np.testing.assert_array_equal(a['points'], b['points'])
+
+
+def test_classify_corners_matches_pipe_path():
+    """角の分類が `PipePath` の離散化（曲率を持つ要素の有無）と一致することをテスト"""
+    points = np.array([[0, 0, 0], [1, 0, 0], [2, 0, 0], [2, 1, 0], [2, 1, 1]], dtype=float)
+    corners = classify_corners(points, 0.2)
+    np.testing.assert_array_equal(corners['corner_type'], [CORNER_STRAIGHT, CORNER_FILLET, CORNER_FILLET])
+    np.testing.assert_allclose(corners['tangent_length'], [0.0, 0.2, 0.2])
+    path = PipePath(points, radius=0.2, step=0.1)
+    assert np.count_nonzero(path.curvatures) > 0
+
+    u_bend = np.array([[0, 0, 0], [1, 0, 0], [2, 1e-4, 0]], dtype=float)
+    assert classify_corners(u_bend, 0.1)['corner_type'][0] == CORNER_U_BEND
+    np.testing.assert_allclose(PipePath(u_bend, radius=0.1, step=0.05).curvatures.max(), 10.0)
+
+
+@pytest.mark.parametrize('points, radius, message', [
+    ([[0, 0, 0], [1, 0, 0], [1, 0, 0], [1, 1, 0]], [0.1, 0.1], 'zero-length legs'),
+    ([[0, 0, 0], [1, 0, 0], [0.5, 0, 0]], [0.1], '180 degree reversals'),
+    ([[0, 0, 0], [1, 0, 0], [1, 1, 0]], [0.0], 'non-positive bend radius'),
+    ([[0, 0, 0], [1, 0, 0], [1, 0.3, 0], [2, 0.3, 0]], [0.2, 0.2], 'bends overlapping'),
+])
+def test_validation_errors(points, radius, message):
+    """不正な経路が検出され、ラインの識別子とともにエラーになることをテスト"""
+    with pytest.raises(ValueError, match=f"L-1.*{message}"):
+        validate_segments([{'points': points, 'radius': radius, 'step': 0.1}], 'L-1')
+
+
+def test_disconnected_segments():
+    """前のセグメントの終点と始点が一致しない場合にエラーになることをテスト"""
+    segments = [{'points': [[0, 0, 0], [1, 0, 0]], 'radius': [], 'step': 0.1},
+                {'points': [[1, 1, 0], [1, 2, 0]], 'radius': [], 'step': 0.1}]
+    with pytest.raises(ValueError, match="does not match the end"):
+        validate_segments(segments)
+
+
+def test_import_uses_cache(csv_file, tmp_path, monkeypatch):
+    """インポート結果がキャッシュされ、変更の無いファイルは離散化を再計算しないことをテスト"""
+    cache_dir = str(tmp_path / 'cache')
+    pipes = import_line_lists([csv_file], material=MATERIAL, cache_dir=cache_dir, max_workers=1)
+    assert list(pipes) == ['L-100', 'L-200']
+    assert len(pipes['L-100'].pipe_paths) == 2
+    np.testing.assert_allclose(pipes['L-200'].node_positions[-1], [2, 0, 0])
+
+    def fail(*args):
+        raise AssertionError("cached files must not be imported again")
+
+    monkeypatch.setattr(line_list, '_import_file_job', fail)
+    cached = import_line_lists([csv_file], material=MATERIAL, cache_dir=cache_dir)
+    for line_id, pipe in pipes.items():
+        np.testing.assert_array_equal(cached[line_id].node_positions, pipe.node_positions)
+        np.testing.assert_array_equal(cached[line_id].material_properties['thickness'],
+                                      pipe.material_properties['thickness'])
+
+    # 材料特性の既定値が変わるとキャッシュは使われない
+    with pytest.raises(AssertionError, match="must not be imported"):
+        import_line_lists([csv_file], material={**MATERIAL, 'density': 8000}, cache_dir=cache_dir)
+
+
+def test_parallel_import(csv_file, tmp_path):
+    """複数ファイルをプロセスプールで並列にインポートできることをテスト"""
+    second = tmp_path / 'second.csv'
+    second.write_text('line,segment,x,y,z,radius,step\nL-300,1,0,0,0,,0.1\nL-300,1,0,0,1,,0.1\n')
+    pipes = import_line_lists([csv_file, str(second)], material=MATERIAL, max_workers=2)
+    assert list(pipes) == ['L-100', 'L-200', 'L-300']
+
+
+def test_duplicate_line_ids_across_files(csv_file, tmp_path):
+    """同じラインの識別子が複数のファイルにある場合、上書きせずにエラーになることをテスト"""
+    second = tmp_path / 'second.csv'
+    second.write_text('line,segment,x,y,z,radius,step\nL-200,1,0,0,0,,0.1\nL-200,1,0,0,1,,0.1\n')
+    with pytest.raises(ValueError, match="Duplicate line id L-200.*second.csv"):
+        import_line_lists([csv_file, str(second)], material=MATERIAL, max_workers=1)
+
+
+def test_duplicate_line_ids_within_file(csv_file, tmp_path):
+    """1つのファイル内で同じラインの行が連続していない場合、上書きせずにエラーになることをテスト"""
+    with open(csv_file, 'a') as f:
+        f.write('L-100,3,1,1,1,,0.1,0.01\nL-100,3,2,1,1,,0.1,0.01\n')
+    with pytest.raises(ValueError, match="Duplicate line id L-100 in .*lines.csv"):
+        import_line_lists([csv_file], material=MATERIAL, max_workers=1)
+
+    jsonl = tmp_path / 'lines.jsonl'
+    record = {'line': 'L-1', 'segments': [{'points': [[0, 0, 0], [1, 0, 0]], 'radius': 0.2, 'step': 0.1}]}
+    jsonl.write_text(json.dumps(record) + '\n' + json.dumps(record) + '\n')
+    with pytest.raises(ValueError, match="Duplicate line id L-1 in"):
+        list(read_line_lists(str(jsonl)))
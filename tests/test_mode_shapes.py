@@ -0,0 +1,72 @@
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+import pytest
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import pipeVibSim.postprocessing as post
+from pipeVibSim.mode_shapes import CompactModeShapes, compress_mode_shapes
+
+
+@pytest.mark.parametrize('storage', [
+    {'dtype': np.float32},
+    {'dtype': np.float32, 'translations_only': True},
+    {'nodes': [17]},
+])
+def test_compact_shapes_frf_matches_full(cantilever_l_pipe, storage):
+    """省メモリ形式のモード形状でも完全なモード形状と同じFRFが得られることをテスト"""
+    analysis = cantilever_l_pipe
+    frequencies = np.linspace(1, 300, 100)
+    full = analysis.run_eigensolution(maximum_frequency=1000)
+    reference = analysis.run_frf_modal(frequencies, load_dof_indices=[-4], response_dof_indices=[-4, -5, -6])
+
+    compact = analysis.run_eigensolution(maximum_frequency=1000, **storage)
+    frf = analysis.run_frf_modal(frequencies, load_dof_indices=[-4], response_dof_indices=[-4, -5, -6])
+
+    assert isinstance(compact, CompactModeShapes)
+    assert compact.nbytes < full.shape_matrix.nbytes
+    np.testing.assert_allclose(frf.ordinate, reference.ordinate, rtol=1e-5,
+                               atol=1e-6 * np.abs(reference.ordinate).max())
+
+
+def test_compact_shapes_reject_unstored_coordinates(cantilever_l_pipe):
+    """保持していない自由度を要求するとエラーになり、再構築では0になることをテスト"""
+    analysis = cantilever_l_pipe
+    compact = analysis.run_eigensolution(maximum_frequency=1000, translations_only=True)
+    with pytest.raises(ValueError, match="not stored"):
+        compact[analysis.system.coordinate[[-1]]]
+
+    shape_array = compact.to_shape_array()
+    assert shape_array.shape_matrix.shape == (compact.size, analysis.system.coordinate.size)
+    np.testing.assert_array_equal(shape_array[analysis.system.coordinate[[-1, -2, -3]]], 0.0)
+    assert compact.to_shape_array() is shape_array
+
+
+def test_truncated_svd_reconstruction(cantilever_l_pipe):
+    """全ランクの切断SVDではモード形状が再現され、プロットにそのまま使えることをテスト"""
+    full = cantilever_l_pipe.run_eigensolution(maximum_frequency=1000)
+    compact = compress_mode_shapes(full, dtype=np.float64, rank=full.size)
+
+    np.testing.assert_allclose(compact.to_shape_array().shape_matrix, full.shape_matrix,
+                               atol=1e-10 * np.abs(full.shape_matrix).max())
+    fig = Figure()
+    post.plot_pipe_mode_shape(cantilever_l_pipe.pipe, compact, mode_index=1, fig=fig,
+                              ax=fig.add_subplot(111, projection='3d'))
+    assert 'Mode 2' in fig.axes[0].get_title()
+
+
+def test_plot_mode_shape_with_node_subset(cantilever_l_pipe):
+    """一部の節点のみを保持したモード形状でも、保持している節点と要素のみがプロットされることをテスト"""
+    compact = cantilever_l_pipe.run_eigensolution(maximum_frequency=1000, nodes=[10, 11, 12, 17],
+                                                  translations_only=True)
+    fig = Figure()
+    ax = fig.add_subplot(111, projection='3d')
+    post.plot_pipe_mode_shape(cantilever_l_pipe.pipe, compact, mode_index=0, fig=fig, ax=ax)
+    FigureCanvasAgg(fig).draw()
+
+    undeformed, nodes, deformed = ax.collections
+    assert len(undeformed.get_segments()) == cantilever_l_pipe.pipe.node_connectivity.shape[0]
+    assert len(deformed.get_segments()) == 2
+    assert len(nodes.get_offsets()) == 4
@@ -0,0 +1,52 @@
+import numpy as np
+
+from pipeVibSim.optimization import SupportSizingProblem, optimize_supports_and_thickness
+
+
+def test_candidate_evaluation_matches_full_analysis(make_cantilever, straight_path, material_props):
+    """基準モデルの更新による評価が、支持と肉厚を変更して作り直したモデルと一致することをテスト"""
+    analysis = make_cantilever(straight_path, material_props)
+    n_elements = analysis.pipe.node_connectivity.shape[0]
+    groups = (np.arange(n_elements) >= n_elements // 2).astype(int)
+    problem = SupportSizingProblem(analysis, [(0, 60)], straight_path.node_positions[1:], thickness_groups=groups)
+
+    result = problem.evaluate([0.006, 0.012], [12])
+    modified = make_cantilever(straight_path, {**material_props, 'thickness': np.where(groups == 1, 0.012, 0.006)},
+                               supports=[13])
+    reference = np.asarray(modified.run_eigensolution(maximum_frequency=400).frequency).ravel()
+    np.testing.assert_allclose(result['frequency'][:reference.size], reference, rtol=1e-8)
+    assert result['violation'] == 0.0
+
+    unsupported = problem.evaluate([0.01, 0.01], [])
+    assert unsupported['frequency'][0] < 60 and unsupported['violation'] > 0
+    np.testing.assert_allclose(unsupported['mass'], problem.reference_mass)
+    np.testing.assert_allclose(problem.reference_mass, 7850 * analysis.section_properties['area'][0] * 2)
+
+
+def test_candidate_evaluation_updates_fluid_terms(make_cantilever, straight_path, material_props):
+    """内部流体がある場合、肉厚の変更による流体の付加質量と剛性の変化が評価に反映されることをテスト"""
+    fluid_props = {**material_props, 'fluid_density': 1000.0, 'flow_velocity': 5.0, 'internal_pressure': 2e6}
+    analysis = make_cantilever(straight_path, fluid_props)
+    problem = SupportSizingProblem(analysis, [(0, 60)], straight_path.node_positions[1:])
+
+    result = problem.evaluate([0.004], [])
+    modified = make_cantilever(straight_path, {**fluid_props, 'thickness': 0.004})
+    reference = np.asarray(modified.run_eigensolution(maximum_frequency=400).frequency).ravel()
+    np.testing.assert_allclose(result['frequency'], reference[:result['frequency'].size], rtol=1e-8)
+    np.testing.assert_allclose(result['mass'], 7850 * modified.section_properties['area'][0] * 2)
+
+
+def test_optimization_finds_feasible_light_design(make_cantilever, straight_path, material_props):
+    """最適化で禁止帯を避けた軽量な設計が得られ、並列評価でも同じ結果になることをテスト"""
+    analysis = make_cantilever(straight_path, material_props)
+    kwargs = dict(forbidden_bands=[(0, 60)], candidate_coordinates=straight_path.node_positions[1:],
+                  n_supports=1, thickness_bounds=(0.004, 0.012), maxiter=30, popsize=10, seed=0)
+    result = optimize_supports_and_thickness(analysis, **kwargs)
+
+    assert result['feasible']
+    assert result['frequency'][0] > 60
+    assert result['mass'] < 0.5 * 7850 * analysis.section_properties['area'][0] * 2
+    assert result['support_coordinates'].shape == (1, 3)
+
+    parallel = optimize_supports_and_thickness(analysis, max_workers=2, **kwargs)
+    np.testing.assert_allclose(parallel['result'].x, result['result'].x)
@@ -0,0 +1,16 @@
+import pytest
+
+from pipeVibSim.parallel import shared_executor, shared_object
+
+
+def _scaled(value):
+    return shared_object() * value
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_shared_executor(max_workers):
+    """共有オブジェクトが逐次実行とプロセスプールの両方でワーカー関数に渡されることをテスト"""
+    with shared_executor(10, max_workers) as executor:
+        mapper = map if executor is None else executor.map
+        assert list(mapper(_scaled, [1, 2, 3])) == [10, 20, 30]
+    assert shared_object() is None
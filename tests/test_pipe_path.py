@@ -182,4 +182,19 @@ def test_pipe_path_addition_with_variable_radius_and_shared_point():
     # path1の角は1つ、path2の角は2つ
     # 結合点の角の半径はpath1の最後の半径(0.3)が使われる
     expected_radius = np.array([0.3, 0.3, 0.2, 0.2])
-    np.testing.assert_allclose(combined_path.radius, expected_radius)
\ No newline at end of file
+    np.testing.assert_allclose(combined_path.radius, expected_radius)
+
+def test_pipe_path_addition_matches_rediscretization():
+    """結合時に既存の離散化を再利用しても、全体を再離散化した結果と一致することをテスト"""
+    points1 = np.array([[0, 0, 0], [0.5, 0, 0], [0.5, 0.5, 0]], dtype=float)
+    points2 = np.array([[0, 0, 0], [0.5, 0, 0.3], [0.5, 0.4, 0.3], [0.2, 0.4, 0.3]], dtype=float)
+    path1 = PipePath(points1, radius=0.1, step=0.023)
+    path2 = PipePath(points2, radius=0.1, step=0.023)
+
+    combined_path = path1 + path2 + path1
+    rebuilt_path = PipePath(combined_path.points, combined_path.radius, combined_path.step)
+
+    np.testing.assert_allclose(combined_path.node_positions, rebuilt_path.node_positions, atol=1e-9)
+    np.testing.assert_allclose(combined_path.curvatures, rebuilt_path.curvatures)
+    np.testing.assert_array_equal(combined_path.node_connectivity, rebuilt_path.node_connectivity)
+    np.testing.assert_allclose(combined_path.bend_direction, rebuilt_path.bend_direction, atol=1e-9)
@@ -0,0 +1,105 @@
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+import pytest
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+
+import pipeVibSim.postprocessing as post
+from pipeVibSim.pipe import Pipe
+from pipeVibSim.pipe_path import PipePath
+from pipeVibSim.simulation import VibrationAnalysis
+
+
+@pytest.fixture
+def two_segment_pipe(l_path, material_props):
+    pipe = Pipe(l_path, material_props)
+    pipe.add_pipe_segment(PipePath(np.array([[0, 0, 0], [1, 0, 0]], dtype=float), radius=0.2, step=0.1),
+                          material_props)
+    return pipe
+
+
+def test_plot_pipe_geometry_uses_one_collection_per_segment(two_segment_pipe):
+    fig = Figure()
+    ax = fig.add_subplot(111, projection='3d')
+    post.plot_pipe_geometry(two_segment_pipe, fig=fig, ax=ax)
+    FigureCanvasAgg(fig).draw()
+
+    assert len(ax.collections) == 2
+    assert len(ax.lines) == 0
+    n_elements = two_segment_pipe.pipe_paths[0].node_connectivity.shape[0]
+    assert len(ax.collections[0].get_segments()) == n_elements
+
+
+def test_plot_pipe_geometry_decimation(two_segment_pipe):
+    fig = Figure()
+    ax = fig.add_subplot(111, projection='3d')
+    post.plot_pipe_geometry(two_segment_pipe, fig=fig, ax=ax, max_elements=3)
+    FigureCanvasAgg(fig).draw()
+
+    for collection in ax.collections:
+        assert 0 < len(collection.get_segments()) <= 3
+
+
+def test_save_plots_offscreen(tmp_path, two_segment_pipe):
+    analysis = VibrationAnalysis(two_segment_pipe)
+    analysis.substructure_by_coordinate([(two_segment_pipe.node_positions[0], None)])
+    shapes = analysis.run_eigensolution(maximum_frequency=200)
+    frf = analysis.run_frf_direct(np.linspace(1, 100, 50), load_dof_indices=[-4], response_dof_indices=[-4])
+
+    written = post.save_plots(tmp_path, pipe=two_segment_pipe, shapes=shapes, frf=frf,
+                              mode_indices=[0], formats=('png', 'svg'))
+
+    assert len(written) == 6
+    for path in written:
+        assert (tmp_path / path.split('/')[-1]).stat().st_size > 0
+
+
+@pytest.fixture
+def multi_dof_frf(two_segment_pipe):
+    analysis = VibrationAnalysis(two_segment_pipe)
+    analysis.substructure_by_coordinate([(two_segment_pipe.node_positions[0], None)])
+    return analysis.run_frf_direct(np.linspace(1, 200, 100), load_dof_indices=[-4, -5],
+                                   response_dof_indices=slice(6, 60))
+
+
+def test_plot_frf_multi_dof(multi_dof_frf):
+    fig = Figure()
+    axes = fig.subplots(2, 1)
+    post.plot_frf(multi_dof_frf, fig=fig, axes=axes, n_peaks=3)
+
+    frequencies, ordinate = post.frf_arrays(multi_dof_frf)
+    assert ordinate.shape == (108, 100)
+    assert frequencies.shape == (100,)
+    assert len(axes[0].texts) == 3
+
+
+def test_plot_frf_skips_individual_curves_above_limit(multi_dof_frf):
+    fig = Figure()
+    axes = fig.subplots(2, 1)
+    post.plot_frf(multi_dof_frf, fig=fig, axes=axes, max_curves=10)
+
+    assert not any(isinstance(c, LineCollection) for c in axes[0].collections)
+    # 位相は個別の曲線の代わりにパーセンタイル帯と中央値で表示される
+    assert not any(isinstance(c, LineCollection) for c in axes[1].collections)
+    assert len(axes[1].collections) == 1 and len(axes[1].lines) == 1
+
+
+def test_plot_frf_reuses_summary(multi_dof_frf):
+    summary = post.summarize_frf(multi_dof_frf, n_peaks=3)
+    fig = Figure()
+    axes = fig.subplots(2, 1)
+    post.plot_frf(None, fig=fig, axes=axes, n_peaks=3, summary=summary)
+
+    assert summary['magnitude'].shape == (108, 100)
+    assert len(axes[0].texts) == 3
+    np.testing.assert_allclose(summary['envelope'], summary['magnitude'].max(axis=0))
+
+
+def test_find_envelope_peaks():
+    frequencies = np.linspace(0, 10, 101)
+    envelope = np.exp(-(frequencies - 3) ** 2) + 2 * np.exp(-(frequencies - 7) ** 2)
+    peaks = post.find_envelope_peaks(frequencies, envelope, n_peaks=2)
+    np.testing.assert_allclose(frequencies[peaks], [7, 3])
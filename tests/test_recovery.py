@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from pipeVibSim import recovery
+from pipeVibSim.serialization import load_model, save_model
+from pipeVibSim.simulation import VibrationAnalysis
+
+
+def test_static_stresses_match_beam_theory(cantilever_analysis):
+    """先端荷重による根元の曲げ応力、軸応力、ねじり応力が理論値と一致することをテスト"""
+    analysis = cantilever_analysis
+    tip = analysis.pipe.node_positions[[-1]]
+    loads = np.vstack((analysis.point_load(tip, dof_indices=2, values=1000.0),
+                       analysis.point_load(tip, dof_indices=0, values=1000.0),
+                       analysis.point_load(tip, dof_indices=3, values=1000.0)))
+    displacements = analysis.run_static_analysis(loads).reshape(3, -1)
+    stresses = recovery.element_stresses(analysis, displacements, chunk_size=1)
+
+    section = analysis.section_properties
+    radius = section['outer_diameter'] / 2
+    np.testing.assert_allclose(stresses['bending'][0, 0, 0], 1000.0 * 2.0 * radius / section['second_moment'][0],
+                               rtol=1e-8)
+    np.testing.assert_allclose(stresses['axial'][1], 1000.0 / section['area'][0], rtol=1e-8)
+    np.testing.assert_allclose(stresses['torsion'][2], 1000.0 * radius / section['polar_moment'][0], rtol=1e-8)
+    np.testing.assert_allclose(stresses['von_mises'][2], np.sqrt(3) * stresses['torsion'][2], rtol=1e-8)
+
+
+def test_chunked_recovery_for_modes_and_frf(cantilever_analysis):
+    """モードとFRFの要素端力がチャンクサイズによらず一致することをテスト"""
+    analysis = cantilever_analysis
+    analysis.run_eigensolution(maximum_frequency=500)
+    modes = recovery.modal_displacements(analysis)
+    n_elements = analysis.pipe.node_connectivity.shape[0]
+    assert recovery.element_stresses(analysis, modes)['bending'].shape == (modes.shape[0], n_elements, 2)
+
+    frf = analysis.run_frf_direct(np.linspace(1, 100, 30), load_dof_indices=[-4, -5])
+    displacements = recovery.frf_displacements(analysis, frf)
+    assert displacements.shape == (2, 30, 6 * analysis.pipe.node_positions.shape[0])
+    np.testing.assert_allclose(recovery.element_forces(analysis, displacements, chunk_size=7),
+                               recovery.element_forces(analysis, displacements, chunk_size=1000))
+
+    partial = analysis.run_frf_direct(np.linspace(1, 100, 3), load_dof_indices=[-4], response_dof_indices=[-4])
+    with pytest.raises(ValueError, match="all DOFs"):
+        recovery.frf_displacements(analysis, partial)
+
+
+def test_stresses_after_model_round_trip(tmp_path, cantilever_analysis):
+    """要素ごとの材料特性として読み込んだモデルでも応力が元のモデルと一致することをテスト"""
+    save_model(cantilever_analysis.pipe, tmp_path / 'pipe')
+    loaded = VibrationAnalysis(load_model(tmp_path / 'pipe', mmap_mode=None))
+    loaded.substructure_by_coordinate([(loaded.pipe.node_positions[0], None)])
+    assert np.ndim(loaded.section_properties['outer_diameter']) == 1
+
+    stresses = []
+    for analysis in (cantilever_analysis, loaded):
+        tip = analysis.pipe.node_positions[[-1]]
+        loads = np.vstack((analysis.point_load(tip, dof_indices=2, values=1000.0),
+                           analysis.point_load(tip, dof_indices=3, values=1000.0)))
+        stresses.append(recovery.element_stresses(analysis, analysis.run_static_analysis(loads).reshape(2, -1)))
+    for key in stresses[0]:
+        np.testing.assert_allclose(stresses[1][key], stresses[0][key], rtol=1e-10, atol=1e-6)
+def test_complex_moment_amplitude():
+    """複素モーメントの合成振幅が1周期中の最大値となることをテスト"""
+    my = np.array([3.0 + 0j, 1.0])
+    mz = np.array([4.0 + 0j, 1j])
+    np.testing.assert_allclose(recovery._moment_amplitude(my, mz), [5.0, 1.0])
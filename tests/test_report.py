@@ -0,0 +1,42 @@
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+import pytest
+
+from pipeVibSim.report import write_frf_report, write_frf_reports
+
+
+@pytest.fixture
+def frfs(cantilever_l_pipe):
+    analysis = cantilever_l_pipe
+    frequencies = np.linspace(1, 200, 100)
+    return [analysis.run_frf_direct(frequencies, load_dof_indices=[-4], response_dof_indices=[-4]),
+            analysis.run_frf_direct(frequencies, load_dof_indices=[-4], response_dof_indices=slice(6, 30))]
+
+
+def test_write_pdf_report(tmp_path, frfs):
+    path = write_frf_report(str(tmp_path / 'report.pdf'), frfs)
+    with open(path, 'rb') as f:
+        content = f.read()
+    assert content.startswith(b'%PDF')
+    assert b'/Count 2' in content
+
+
+def test_write_html_report(tmp_path, frfs):
+    path = write_frf_report(str(tmp_path / 'report.html'), frfs, titles=['tip', 'all'], n_peaks=2)
+    with open(path, encoding='utf-8') as f:
+        content = f.read()
+    assert content.count('<section>') == 2
+    assert '<h2>tip</h2>' in content
+
+
+def test_write_report_rejects_unknown_format(tmp_path, frfs):
+    with pytest.raises(ValueError, match="Unsupported report format"):
+        write_frf_report(str(tmp_path / 'report.txt'), frfs)
+
+
+def test_write_reports_in_worker_pool(tmp_path, frfs):
+    reports = {str(tmp_path / f'model_{i}.html'): frfs for i in range(3)}
+    written = write_frf_reports(reports, max_workers=2, n_peaks=1)
+    assert sorted(written) == sorted(reports)
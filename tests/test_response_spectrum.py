@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from pipeVibSim import elements
+from pipeVibSim.response_spectrum import (combine_modal_responses, modal_correlation, participation_factors,
+                                          run_response_spectrum)
+
+
+def test_effective_mass_sums_to_total_mass(cantilever_l_pipe):
+    """全モードの有効質量の和が方向ごとの全質量と一致することをテスト"""
+    cantilever_l_pipe.run_eigensolution(maximum_frequency=1e7)
+    result = participation_factors(cantilever_l_pipe)
+    np.testing.assert_allclose(result['effective_mass'].sum(axis=0), result['total_mass'], rtol=1e-8)
+
+
+def test_single_mode_response(cantilever_l_pipe):
+    """1モードのみの場合、応答がスペクトル変位とモード形状の積になることをテスト"""
+    analysis = cantilever_l_pipe
+    analysis.run_eigensolution(maximum_frequency=35)
+    result = run_response_spectrum(analysis, {2: ([0.0, 100.0], [5.0, 5.0])}, method='srss')
+
+    omega = 2 * np.pi * result['frequency'][0]
+    shape = np.asarray(analysis.eigensolution[analysis.system.coordinate]).ravel()
+    modal_displacement = result['participation_factor'][0, 2] * 5.0 / omega**2 * shape
+    np.testing.assert_allclose(result['displacement'].ravel(), np.abs(modal_displacement), atol=1e-15)
+    forces = elements.element_end_forces(analysis.element_force_matrices(), modal_displacement,
+                                         analysis.pipe.node_connectivity)
+    np.testing.assert_allclose(result['element_forces'], np.abs(forces), atol=1e-9)
+
+
+def test_modal_combination_methods():
+    """CQC・10%法の係数行列とモード組み合わせの性質をテスト"""
+    frequencies = np.array([10.0, 10.5, 30.0])
+    cqc = modal_correlation(frequencies, damping_ratios=0.05, method='cqc')
+    np.testing.assert_allclose(np.diag(cqc), 1.0)
+    np.testing.assert_allclose(cqc, cqc.T)
+    assert cqc[0, 1] > 0.5 and cqc[0, 2] < 0.05
+
+    ten_percent = modal_correlation(frequencies, method='ten_percent')
+    np.testing.assert_array_equal(ten_percent, [[1, 1, 0], [1, 1, 0], [0, 0, 1]])
+
+    responses = np.array([[3.0], [-4.0], [12.0]])
+    np.testing.assert_allclose(combine_modal_responses(responses, np.eye(3)), [13.0])
+    np.testing.assert_allclose(combine_modal_responses(responses, ten_percent, absolute=True),
+                               [np.sqrt(9 + 16 + 144 + 2 * 12)])
+    with pytest.raises(ValueError, match="Unknown modal combination method"):
+        modal_correlation(frequencies, method='abs')
@@ -0,0 +1,63 @@
+import json
+
+import numpy as np
+import pytest
+
+from pipeVibSim.materials import get_material_properties
+from pipeVibSim.pipe import Pipe
+from pipeVibSim.pipe_path import PipePath
+from pipeVibSim.serialization import load_model, save_model
+
+
+@pytest.fixture
+def sample_pipe():
+    path1 = PipePath(np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0]], dtype=float) * 0.1, radius=0.03, step=0.01)
+    path2 = PipePath(np.array([[0, 0, 0], [0, 0, 1]], dtype=float) * 0.1, radius=0.03, step=0.01)
+    n1 = path1.node_connectivity.shape[0]
+    n2 = path2.node_connectivity.shape[0]
+    pipe = Pipe(path1, get_material_properties(E=200e9, rho=7850, nu=0.3, D_out=0.02, D_in=0.015, n_elements=n1))
+    pipe.add_pipe_segment(path2, get_material_properties(E=110e9, rho=8960, nu=0.34, D_out=0.02,
+                                                         D_in=0.015, n_elements=n2,
+                                                         thickness=np.full(n2, 0.002)))
+    return pipe
+
+
+def test_pipe_path_round_trip(tmp_path):
+    path = PipePath(np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [2, 1, 1]], dtype=float), radius=0.2, step=0.05)
+    save_model(path, tmp_path / 'path')
+    loaded = load_model(tmp_path / 'path')
+
+    assert isinstance(loaded, PipePath)
+    assert loaded.step == path.step
+    assert isinstance(loaded.node_positions, np.memmap)
+    for name in ('points', 'radius', 'node_positions', 'node_connectivity', 'bend_direction', 'curvatures'):
+        np.testing.assert_array_equal(getattr(loaded, name), getattr(path, name))
+
+
+def test_pipe_round_trip(tmp_path, sample_pipe):
+    save_model(sample_pipe, tmp_path / 'pipe')
+    loaded = load_model(tmp_path / 'pipe', mmap_mode=None)
+
+    assert isinstance(loaded, Pipe)
+    assert len(loaded.pipe_paths) == 2
+    np.testing.assert_array_equal(loaded.node_positions, sample_pipe.node_positions)
+    np.testing.assert_array_equal(loaded.node_connectivity, sample_pipe.node_connectivity)
+    np.testing.assert_array_equal(loaded.bend_direction, sample_pipe.bend_direction)
+    for key, value in sample_pipe.material_properties.items():
+        np.testing.assert_allclose(loaded.material_properties[key], value)
+
+    # 読み込んだセグメントを追加しても再結合できること
+    loaded.add_pipe_segment(loaded.pipe_paths[0], loaded.material_properties_list[0])
+    assert loaded.node_connectivity.shape[0] == (sample_pipe.node_connectivity.shape[0]
+                                                 + sample_pipe.pipe_paths[0].node_connectivity.shape[0])
+
+
+def test_load_rejects_newer_version(tmp_path, sample_pipe):
+    save_model(sample_pipe, tmp_path / 'pipe')
+    manifest_path = tmp_path / 'pipe' / 'manifest.json'
+    manifest = json.loads(manifest_path.read_text())
+    manifest['version'] += 1
+    manifest_path.write_text(json.dumps(manifest))
+
+    with pytest.raises(ValueError, match="Unsupported model format version"):
+        load_model(tmp_path / 'pipe')
@@ -0,0 +1,173 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from pipeVibSim.service import AnalysisService, build_analysis, model_hash, request_analysis, start_server
+
+
+@pytest.fixture
+def definition():
+    """片持ちL字配管のモデル定義を提供するフィクスチャ"""
+    return {
+        'segments': [{
+            'points': [[0, 0, 0], [1, 0, 0], [1, 1, 0]],
+            'radius': 0.2,
+            'step': 0.1,
+            'material': {'young_modulus': 2.06e11, 'poisson_ratio': 0.3, 'density': 7850,
+                         'outer_diameter': 0.1143, 'thickness': 0.01},
+        }],
+        'constraints': [{'coordinates': [0, 0, 0], 'dofs': None}],
+        'eigen': {'maximum_frequency': 300},
+        'frf': {'frequencies': np.linspace(1, 300, 120).tolist(), 'load_dof_indices': [-4],
+                'response_dof_indices': [-4, -5, -6]},
+    }
+
+
+def _assemble_frf(events, n_frequencies):
+    """FRFイベントを周波数順に並べた (応答, 荷重, 周波数) の配列にまとめます。"""
+    ordinate = None
+    for event in events:
+        if event['event'] != 'frf':
+            continue
+        block = np.asarray(event['real']) + 1j * np.asarray(event['imag'])
+        if ordinate is None:
+            ordinate = np.zeros(block.shape[:2] + (n_frequencies,), dtype=complex)
+        ordinate[..., event['start']:event['start'] + block.shape[-1]] = block
+    return ordinate
+
+
+def test_model_hash_ignores_key_order(definition):
+    """キーの順序が異なる同じモデル定義が同じハッシュ値になることをテスト"""
+    reordered = dict(reversed(list(definition.items())))
+    assert model_hash(reordered) == model_hash(definition)
+    assert model_hash({**definition, 'eigen': {'maximum_frequency': 100}}) != model_hash(definition)
+
+
+def test_streamed_frf_matches_direct_solution(definition):
+    """プロセスプールで分割計算したFRFが直接法の結果と一致することをテスト"""
+    async def collect():
+        async with AnalysisService(max_workers=2, frf_chunk_size=50) as service:
+            return [event async for event in service.run(definition)]
+
+    events = asyncio.run(collect())
+    kinds = [event['event'] for event in events]
+    assert kinds[0] == 'accepted' and kinds[-1] == 'done'
+    assert kinds.count('frf') == 3
+    assert [event['completed'] for event in events if event['event'] == 'frf'] == [1, 2, 3]
+
+    analysis = build_analysis(definition)
+    shapes = analysis.run_eigensolution(maximum_frequency=300)
+    eigen = next(event for event in events if event['event'] == 'eigen')
+    np.testing.assert_allclose(eigen['frequency'], shapes.frequency)
+
+    frequencies = np.asarray(definition['frf']['frequencies'])
+    reference = analysis.run_frf_direct(frequencies, load_dof_indices=[-4], response_dof_indices=[-4, -5, -6])
+    np.testing.assert_allclose(_assemble_frf(events, frequencies.size), reference.ordinate, rtol=1e-10)
+
+
+def test_identical_requests_share_one_job(definition, monkeypatch):
+    """実行中の同じモデルの要求が1つのジョブを共有し、完了後は結果がキャッシュされることをテスト"""
+    import pipeVibSim.service as service_module
+    calls = []
+    original = service_module._setup_stage
+    monkeypatch.setattr(service_module, '_setup_stage', lambda *args: calls.append(args) or original(*args))
+    del definition['eigen']
+
+    async def collect():
+        async with AnalysisService(frf_chunk_size=40, executor=ThreadPoolExecutor(2)) as service:
+            first, second = await asyncio.gather(*[_drain(service.run(definition)) for _ in range(2)])
+            third = await _drain(service.run(definition))
+        return first, second, third
+
+    first, second, third = asyncio.run(collect())
+    assert len(calls) == 1
+    assert first == second == third
+
+
+async def _drain(events):
+    return [event async for event in events]
+
+
+def test_http_round_trip(definition, tmp_path):
+    """ローカルのクライアントでUnixソケット経由とTCP経由の要求が同じイベントを受け取ることをテスト"""
+    del definition['eigen']
+    unix_path = str(tmp_path / 'service.sock')
+
+    async def round_trip():
+        async with AnalysisService(frf_chunk_size=60, executor=ThreadPoolExecutor(2)) as service:
+            unix_server = await start_server(service, unix_path=unix_path)
+            tcp_server = await start_server(service)
+            port = tcp_server.sockets[0].getsockname()[1]
+            async with unix_server, tcp_server:
+                over_unix = await _drain(request_analysis(definition, unix_path=unix_path))
+                over_tcp = await _drain(request_analysis(definition, port=port))
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                writer.write(b'POST /analyses HTTP/1.1\r\nContent-Length: 1\r\n\r\n{')
+                status = await reader.readline()
+                writer.close()
+        return over_unix, over_tcp, status
+
+    over_unix, over_tcp, status = asyncio.run(round_trip())
+    assert status.startswith(b'HTTP/1.1 400')
+    assert over_unix == over_tcp
+    assert [event['event'] for event in over_unix].count('frf') == 2
+    assert over_unix[-1]['event'] == 'done'
+
+
+
+def test_malformed_http_requests():
+    """不正なContent-Length、途中で切れた本文、上限を超える本文に対してエラー応答を返すことをテスト"""
+    requests = [
+        b'POST /analyses HTTP/1.1\r\nContent-Length: abc\r\n\r\n',
+        b'POST /analyses HTTP/1.1\r\nContent-Length: 10\r\n\r\n{}',
+        b'POST /analyses HTTP/1.1\r\nContent-Length: 2048\r\n\r\n',
+    ]
+
+    async def send_all():
+        async with AnalysisService(executor=ThreadPoolExecutor(1)) as service:
+            server = await start_server(service, max_content_length=1024)
+            port = server.sockets[0].getsockname()[1]
+            statuses = []
+            async with server:
+                for request in requests:
+                    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                    writer.write(request)
+                    writer.write_eof()
+                    statuses.append(await reader.readline())
+                    writer.close()
+        return statuses
+
+    statuses = asyncio.run(send_all())
+    assert [status.split()[1] for status in statuses] == [b'400', b'400', b'413']
+
+
+def test_aclose_cancels_running_jobs(definition, monkeypatch):
+    """終了時に実行中のジョブが取り消され、待機中の要求に 'error' イベントが返されることをテスト"""
+    import threading
+    import pipeVibSim.service as service_module
+    release = threading.Event()
+    monkeypatch.setattr(service_module, '_setup_stage', lambda *args: release.wait(10))
+
+    async def cancel_running():
+        executor = ThreadPoolExecutor(1)
+        service = AnalysisService(executor=executor)
+        events = []
+
+        async def consume():
+            async for event in service.run(definition):
+                events.append(event)
+
+        consumer = asyncio.create_task(consume())
+        while not any(event['event'] == 'stage' for event in events):
+            await asyncio.sleep(0.01)
+        await service.aclose()
+        await asyncio.wait_for(consumer, timeout=5)
+        release.set()
+        executor.shutdown()
+        return events, service._tasks
+
+    events, tasks = asyncio.run(cancel_running())
+    assert events[-1] == {'event': 'error', 'message': 'Cancelled'}
+    assert not tasks
@@ -12,31 +12,22 @@ from pipeVibSim.pipe_path import PipePath
 from pipeVibSim.pipe import Pipe
 from pipeVibSim.simulation import VibrationAnalysis
 
-@pytest.fixture
-def material_props_base():
-    return {
-        'young_modulus': 2.06e11,
-        'poisson_ratio': 0.3,
-        'density': 7850,
-        'outer_diameter': 0.1143
-    }
-
 @pytest.fixture
 def straight_pipe_path():
     points = np.array([[0, 0, 0], [1, 0, 0]], dtype=float)
     # step=0.5 -> 2 elements
     return PipePath(points, radius=0.1, step=0.5)
 
-def test_uniform_vs_variable_thickness(straight_pipe_path, material_props_base):
+def test_uniform_vs_variable_thickness(straight_pipe_path, material_props):
     """均一な肉厚と可変な肉厚で、生成されるシステムが異なることを確認するテスト。"""
     # Case 1: 均一な肉厚
-    material_uniform = material_props_base.copy()
+    material_uniform = material_props.copy()
     material_uniform['thickness'] = 0.01
     pipe_uniform = Pipe(straight_pipe_path, material_uniform)
     analysis_uniform = VibrationAnalysis(pipe_uniform)
 
     # Case 2: 可変な肉厚
-    material_variable = material_props_base.copy()
+    material_variable = material_props.copy()
     n_elements = straight_pipe_path.node_connectivity.shape[0]
     thickness_list = np.linspace(0.01, 0.005, n_elements).tolist()
     material_variable['thickness'] = thickness_list
@@ -57,9 +48,8 @@ def test_uniform_vs_variable_thickness(straight_pipe_path, material_props_base):
     stiffness_matrix_variable = analysis_variable.system.stiffness
     assert not np.allclose(stiffness_matrix_uniform, stiffness_matrix_variable)
 
-def test_thickness_list_length_mismatch(straight_pipe_path, material_props_base):
+def test_thickness_list_length_mismatch(straight_pipe_path, material_props):
     """肉厚リストの長さが要素数と一致しない場合にエラーを送出するかテスト。"""
-    material_props = material_props_base.copy()
     # 要素数(2)と異なる長さのリスト
     thickness_list = [0.01, 0.008, 0.006]
     material_props['thickness'] = thickness_list
@@ -70,9 +60,8 @@ def test_thickness_list_length_mismatch(straight_pipe_path, material_props_base)
         VibrationAnalysis(pipe)
 
 @pytest.fixture
-def analysis_setup(straight_pipe_path, material_props_base):
+def analysis_setup(straight_pipe_path, material_props):
     """解析オブジェクトと基本的なセットアップを提供するフィクスチャ"""
-    material_props = material_props_base.copy()
     material_props['thickness'] = 0.01
     pipe = Pipe(straight_pipe_path, material_props)
     analysis = VibrationAnalysis(pipe)
@@ -119,4 +108,387 @@ def test_frf_methods(analysis_setup):
     # ピーク周波数付近では差が大きくなる可能性があるため、平均的な差で比較
     avg_diff = np.mean(np.abs(frf_modal.ordinate - frf_direct.ordinate))
     avg_mag = np.mean(np.abs(frf_direct.ordinate))
-    assert avg_diff / avg_mag < 0.1 # 平均して10%以下の差異であること
\ No newline at end of file
+    assert avg_diff / avg_mag < 0.1 # 平均して10%以下の差異であること
+
+@pytest.fixture
+def fluid_filled_pipe_analysis(material_props):
+    """単純支持された流体輸送直管の解析オブジェクトを提供するフィクスチャ"""
+    fluid_props = {**material_props, 'thickness': 0.006, 'fluid_density': 1000.0,
+                   'flow_velocity': 0.0, 'internal_pressure': 0.0}
+    path = PipePath(np.array([[0, 0, 0], [2, 0, 0]], dtype=float), radius=0.1, step=0.05)
+    analysis = VibrationAnalysis(Pipe(path, fluid_props))
+    analysis.substructure_by_coordinate([(path.node_positions[0], [0, 1, 2, 3]),
+                                         (path.node_positions[-1], [1, 2])])
+    return analysis
+
+def test_fluid_added_mass_lowers_frequency(fluid_filled_pipe_analysis, material_props):
+    """内部流体の付加質量により固有振動数が低下することをテスト"""
+    material_props = {**material_props, 'thickness': 0.006}
+    path = fluid_filled_pipe_analysis.pipe.pipe_paths[0]
+    empty = VibrationAnalysis(Pipe(path, material_props))
+    empty.substructure_by_coordinate([(path.node_positions[0], [0, 1, 2, 3]),
+                                      (path.node_positions[-1], [1, 2])])
+
+    f_empty = empty.run_eigensolution(maximum_frequency=100).frequency[0]
+    f_filled = fluid_filled_pipe_analysis.run_eigensolution(maximum_frequency=100).frequency[0]
+
+    D_o = material_props['outer_diameter']
+    D_i = D_o - 2 * material_props['thickness']
+    m_pipe = material_props['density'] * np.pi / 4 * (D_o**2 - D_i**2)
+    m_fluid = 1000.0 * np.pi / 4 * D_i**2
+    assert np.isclose(f_filled / f_empty, np.sqrt(m_pipe / (m_pipe + m_fluid)), rtol=1e-3)
+
+def test_fluid_mass_in_all_translations(fluid_filled_pipe_analysis):
+    """流体の付加質量が軸方向を含む全並進方向に掛かり、ねじりには掛からないことをテスト"""
+    analysis = fluid_filled_pipe_analysis
+    D_i = analysis.section_properties['inner_diameter'][0]
+    m_fluid = 1000.0 * np.pi / 4 * D_i**2
+    n_nodes = analysis.pipe.node_positions.shape[0]
+    mass = analysis.fluid_matrices['mass']
+    for dof, expected in [(0, m_fluid * 2.0), (1, m_fluid * 2.0), (2, m_fluid * 2.0), (3, 0.0)]:
+        rigid = np.zeros(6 * n_nodes)
+        rigid[dof::6] = 1.0
+        np.testing.assert_allclose(rigid @ mass @ rigid, expected, atol=1e-9)
+
+def test_frf_modal_with_fluid(fluid_filled_pipe_analysis):
+    """静止した流体ではモード法が直接法と一致し、流れがある場合はモード法がエラーとなることをテスト"""
+    analysis = fluid_filled_pipe_analysis
+    analysis.run_eigensolution(maximum_frequency=1e7)
+    analysis.set_rayleigh_damping(alpha=2.0, beta=1e-5)
+    frequencies = np.linspace(1, 300, 100)
+    frf_direct = analysis.run_frf_direct(frequencies, load_dof_indices=[10], response_dof_indices=[10, 20])
+    frf_modal = analysis.run_frf_modal(frequencies, load_dof_indices=[10], response_dof_indices=[10, 20])
+    np.testing.assert_allclose(frf_modal.ordinate, frf_direct.ordinate,
+                               atol=1e-6 * np.abs(frf_direct.ordinate).max())
+
+    path = analysis.pipe.pipe_paths[0]
+    flowing = VibrationAnalysis(Pipe(path, {**analysis.pipe.material_properties, 'flow_velocity': 10.0}))
+    flowing.substructure_by_coordinate([(path.node_positions[0], [0, 1, 2, 3]),
+                                        (path.node_positions[-1], [1, 2])])
+    flowing.run_eigensolution(maximum_frequency=1000)
+    assert flowing.has_flow_coupling and not analysis.has_flow_coupling
+    with pytest.raises(RuntimeError, match="run_frf_direct"):
+        flowing.run_frf_modal(frequencies, load_dof_indices=[10], response_dof_indices=[10])
+
+def test_flow_velocity_sweep_divergence(fluid_filled_pipe_analysis, material_props):
+    """単純支持管の1次振動数が流速とともに理論式 f(U) = f0 √(1 - (U/Uc)²) に近い形で低下することをテスト"""
+    analysis = fluid_filled_pipe_analysis
+    D_o = material_props['outer_diameter']
+    D_i = D_o - 2 * 0.006
+    EI = material_props['young_modulus'] * np.pi / 64 * (D_o**4 - D_i**4)
+    m_fluid = 1000.0 * np.pi / 4 * D_i**2
+    critical_velocity = np.pi / 2.0 * np.sqrt(EI / m_fluid)
+
+    ratios = np.array([0.0, 0.5, 0.9])
+    result = analysis.run_flow_velocity_sweep(ratios * critical_velocity, num_modes=2)
+    first = result['frequency'][:, 0]
+    np.testing.assert_allclose(first / first[0], np.sqrt(1 - ratios**2), rtol=0.05)
+
+def test_flow_velocity_sweep_methods_agree(fluid_filled_pipe_analysis):
+    """縮約モデルと疎行列状態空間の流速スイープ結果が一致することをテスト"""
+    velocities = np.array([0.0, 100.0, 300.0])
+    modal = fluid_filled_pipe_analysis.run_flow_velocity_sweep(velocities, num_modes=4, num_basis_modes=20)
+    state_space = fluid_filled_pipe_analysis.run_flow_velocity_sweep(velocities, num_modes=4,
+                                                                     method='state_space')
+    np.testing.assert_allclose(modal['frequency'], state_space['frequency'], rtol=1e-3)
+
+def test_flow_velocity_sweep_without_fluid(analysis_setup):
+    """流体特性なしで流速スイープを呼ぶとエラーになることをテスト"""
+    with pytest.raises(RuntimeError, match="fluid_density"):
+        analysis_setup.run_flow_velocity_sweep([0.0, 1.0], num_modes=2)
+
+@pytest.fixture
+def fully_resolved_analysis(analysis_setup):
+    """全モードを含む固有値解析済みの解析オブジェクトを提供するフィクスチャ"""
+    analysis_setup.run_eigensolution(maximum_frequency=1e7)
+    return analysis_setup
+
+@pytest.mark.parametrize('set_damping', [
+    lambda a: a.set_rayleigh_damping(alpha=2.0, beta=1e-5),
+    lambda a: a.set_modal_damping(0.03),
+    lambda a: a.set_structural_damping(0.02),
+])
+def test_proportional_damping_modal_matches_direct(fully_resolved_analysis, set_damping):
+    """比例減衰ではモード重ね合わせ法と疎行列直接法の結果が一致することをテスト"""
+    analysis = fully_resolved_analysis
+    system = analysis.system
+    set_damping(analysis)
+    frequencies = np.linspace(1, 500, 200)
+    frf_direct = analysis.run_frf_direct(frequencies, load_dof_indices=[-4, -3], response_dof_indices=[-4, -5])
+    frf_modal = analysis.run_frf_modal(frequencies, load_dof_indices=[-4, -3], response_dof_indices=[-4, -5])
+
+    assert frf_direct.ordinate.shape == (2, 2, 200)
+    np.testing.assert_allclose(frf_modal.ordinate, frf_direct.ordinate,
+                               atol=1e-6 * np.abs(frf_direct.ordinate).max())
+    # 減衰の設定でシステム行列は再構築されない
+    assert analysis.system is system
+
+def test_modal_damping_kept_low_rank(analysis_setup):
+    """モード減衰が密な減衰行列にならず低ランク項として直接法に加えられることをテスト"""
+    analysis = analysis_setup
+    shapes = analysis.run_eigensolution(maximum_frequency=2000)
+    analysis.set_modal_damping(0.02)
+    analysis.add_dashpots(analysis.pipe.node_positions[[-1]], dof_indices=[2], coefficients=50.0)
+    viscous, _, (weighted, coefficients) = analysis._damping_matrices()
+    n_modes = np.asarray(shapes.frequency).size
+    assert viscous.nnz == 1
+    assert weighted.shape == (analysis.system.mass.shape[0], n_modes) and coefficients.shape == (n_modes,)
+
+    # 密な減衰行列で解いた結果と一致
+    dense = viscous.toarray() + (weighted * coefficients) @ weighted.T
+    frequencies = np.array([50.0, 300.0])
+    frf = analysis.run_frf_direct(frequencies, load_dof_indices=[-4], response_dof_indices=[-4, -5])
+    load = analysis.system.transformation_matrix_at_coordinates(analysis.system.coordinate[[-4]])
+    response = analysis.system.transformation_matrix_at_coordinates(analysis.system.coordinate[[-4, -5]])
+    for i, omega in enumerate(2 * np.pi * frequencies):
+        dynamic = analysis.system.stiffness - omega**2 * analysis.system.mass + 1j * omega * dense
+        expected = response @ np.linalg.solve(dynamic, load.T)
+        np.testing.assert_allclose(frf.ordinate[:, :, i], expected, atol=1e-8 * np.abs(expected).max())
+
+def test_short_modal_damping_array_rejected(analysis_setup):
+    """モード数より少ないモード減衰比の配列は直接法・モード重ね合わせ法のどちらでも同じエラーになることをテスト"""
+    analysis = analysis_setup
+    analysis.run_eigensolution(maximum_frequency=2000)
+    analysis.set_modal_damping([0.02])
+    for solve in (analysis.run_frf_direct, analysis.run_frf_modal):
+        with pytest.raises(ValueError, match="number of modal damping ratios"):
+            solve(np.array([50.0]), load_dof_indices=[-4], response_dof_indices=[-4])
+
+def test_non_proportional_damping_requires_direct(fully_resolved_analysis):
+    """ダッシュポットや要素ごとの損失係数ではモード法がエラーとなり、直接法で応答が低下することをテスト"""
+    analysis = fully_resolved_analysis
+    frequencies = np.linspace(1, 500, 200)
+    undamped = analysis.run_frf_direct(frequencies, load_dof_indices=[-4], response_dof_indices=[-4])
+
+    analysis.add_dashpots(analysis.pipe.node_positions[[-1]], dof_indices=[1], coefficients=500.0)
+    with pytest.raises(RuntimeError, match="run_frf_direct"):
+        analysis.run_frf_modal(frequencies, load_dof_indices=[-4], response_dof_indices=[-4])
+    damped = analysis.run_frf_direct(frequencies, load_dof_indices=[-4], response_dof_indices=[-4])
+    assert np.abs(damped.ordinate).max() < np.abs(undamped.ordinate).max()
+
+    analysis.clear_damping()
+    analysis.set_structural_damping([0.0, 0.05])
+    assert not analysis.has_proportional_damping
+    with pytest.raises(ValueError, match="loss_factor"):
+        analysis.set_structural_damping([0.01, 0.02, 0.03])
+
+def test_springs_and_lumped_masses(analysis_setup, straight_pipe_path, material_props):
+    """点ばね・集中質量の一括追加と、ばね剛性の低ランク更新が再構築した結果と一致することをテスト"""
+    analysis = analysis_setup
+    tip = straight_pipe_path.node_positions[-1]
+    initial_stiffness = analysis.init_system.stiffness.copy()
+    f_free = analysis.run_eigensolution(maximum_frequency=5000).frequency
+
+    spring_indices = analysis.add_springs(np.array([tip, tip]), dof_indices=[1, 2], stiffness=1e5)
+    analysis.add_lumped_masses(tip[np.newaxis], mass=5.0, inertia=[[0.1, 0.2, 0.2]])
+    analysis.set_spring_stiffness(spring_indices, [2e6, 3e6])
+    f_updated = analysis.run_eigensolution(maximum_frequency=5000).frequency
+
+    reference = VibrationAnalysis(Pipe(straight_pipe_path, material_props))
+    reference.substructure_by_coordinate([(straight_pipe_path.node_positions[0], None)])
+    reference.add_springs(np.array([tip, tip]), dof_indices=[1, 2], stiffness=[2e6, 3e6])
+    reference.add_lumped_masses(tip[np.newaxis], mass=5.0, inertia=[[0.1, 0.2, 0.2]])
+
+    np.testing.assert_allclose(analysis.system.stiffness, reference.system.stiffness)
+    np.testing.assert_allclose(analysis.system.mass, reference.system.mass)
+    assert not np.allclose(f_updated[:2], f_free[:2])
+    # 初期システムは変更されない
+    np.testing.assert_array_equal(analysis.init_system.stiffness, initial_stiffness)
+
+    analysis.reset_system()
+    assert analysis.springs['dofs'].size == 0
+
+def test_reset_system_removes_spring_dashpots(cantilever_analysis):
+    """ばねと並列のダッシュポットはリセットで削除され、`add_dashpots` のダッシュポットは残ることをテスト"""
+    analysis = cantilever_analysis
+    tip = analysis.pipe.node_positions[-1]
+    analysis.add_dashpots(tip[np.newaxis], dof_indices=[1], coefficients=50.0)
+    analysis.add_springs(tip[np.newaxis], dof_indices=[2], stiffness=1e6, damping=200.0)
+    viscous, _, _ = analysis._damping_matrices()
+    assert viscous.nnz == 2
+
+    analysis.reset_system()
+    viscous, _, _ = analysis._damping_matrices()
+    np.testing.assert_allclose(viscous.data, [50.0])
+    assert not analysis.has_proportional_damping
+    analysis.clear_damping()
+    assert analysis.has_proportional_damping
+
+def test_low_rank_reanalysis_matches_full_solution(fully_resolved_analysis, straight_pipe_path, material_props):
+    """Woodbury公式による再解析が、変更を加えて解き直した結果と一致することをテスト"""
+    analysis = fully_resolved_analysis
+    frequencies = np.linspace(1, 100, 50)
+    baseline = analysis.run_frf_direct(frequencies, load_dof_indices=[-4], response_dof_indices=[-4, -5, 7])
+    stiffness_change = [2e6, 3e6]
+
+    updated_frf = analysis.reanalyze_frf(baseline, [-5, -4], stiffness_change=stiffness_change)
+    updated_shapes = analysis.reanalyze_eigensolution([-5, -4], stiffness_change=stiffness_change)
+
+    reference = VibrationAnalysis(Pipe(straight_pipe_path, material_props))
+    reference.substructure_by_coordinate([(straight_pipe_path.node_positions[0], None)])
+    tip = straight_pipe_path.node_positions[-1]
+    reference.add_springs(np.array([tip, tip]), dof_indices=[1, 2], stiffness=stiffness_change)
+    reference_frf = reference.run_frf_direct(frequencies, load_dof_indices=[-4], response_dof_indices=[-4, -5, 7])
+    reference_shapes = reference.run_eigensolution(maximum_frequency=1e7)
+
+    np.testing.assert_allclose(updated_frf.ordinate, reference_frf.ordinate,
+                               atol=1e-6 * np.abs(reference_frf.ordinate).max())
+    np.testing.assert_allclose(updated_shapes.frequency[:4], reference_shapes.frequency[:4], rtol=1e-6)
+
+def test_low_rank_reanalysis_with_truncated_modes(cantilever_analysis):
+    """打ち切ったモードでの再解析の誤差が許容範囲内にあり、保持するモードを増やすと減少することをテスト"""
+    path = cantilever_analysis.pipe.pipe_paths[0]
+    tip = path.node_positions[-1]
+    stiffness_change = [1e6, 1e6]
+    frequencies = np.linspace(1, 300, 100)
+
+    reference = VibrationAnalysis(Pipe(path, cantilever_analysis.pipe.material_properties))
+    reference.substructure_by_coordinate([(path.node_positions[0], None)])
+    reference.add_springs(np.array([tip, tip]), dof_indices=[1, 2], stiffness=stiffness_change)
+    reference_frf = reference.run_frf_direct(frequencies, load_dof_indices=[-4], response_dof_indices=[-4, -5])
+    reference_frequency = np.asarray(reference.run_eigensolution(maximum_frequency=1000).frequency).ravel()[:2]
+
+    errors = []
+    for maximum_frequency in (1000, 1e4):
+        analysis = cantilever_analysis
+        analysis.run_eigensolution(maximum_frequency=maximum_frequency)
+        baseline = analysis.run_frf_direct(frequencies, load_dof_indices=[-4], response_dof_indices=[-4, -5])
+        updated_frf = analysis.reanalyze_frf(baseline, [-5, -4], stiffness_change=stiffness_change)
+        updated = analysis.reanalyze_eigensolution([-5, -4], stiffness_change=stiffness_change)
+        updated_frequency = np.asarray(updated.frequency).ravel()[:2]
+
+        # 打ち切りにより剛性が過大評価され、固有振動数は高めになる
+        assert np.all(updated_frequency >= reference_frequency)
+        np.testing.assert_allclose(updated_frequency, reference_frequency, rtol=1e-3)
+        errors.append(np.abs(updated_frf.ordinate - reference_frf.ordinate).max()
+                      / np.abs(reference_frf.ordinate).max())
+
+    assert errors[0] < 0.05
+    assert errors[1] < 0.1 * errors[0]
+
+def test_reanalysis_rejects_per_element_loss_factor(cantilever_analysis):
+    """要素ごとの損失係数はモードから評価できないため、再解析が明確なエラーとなることをテスト"""
+    analysis = cantilever_analysis
+    analysis.run_eigensolution(maximum_frequency=1000)
+    analysis.set_structural_damping(np.full(analysis.pipe.node_connectivity.shape[0], 0.02))
+    baseline = analysis.run_frf_direct(np.linspace(1, 300, 10), load_dof_indices=[-4], response_dof_indices=[-4])
+    with pytest.raises(ValueError, match="Per-element loss factors"):
+        analysis.reanalyze_frf(baseline, [-4], stiffness_change=1e6)
+
+    analysis.set_structural_damping(0.02)
+    analysis.reanalyze_frf(baseline, [-4], stiffness_change=1e6)
+
+def test_static_load_cases_match_beam_theory(cantilever_analysis):
+    """自重・熱膨張・集中荷重の静解析結果が片持ち梁の理論解と一致することをテスト"""
+    analysis = cantilever_analysis
+    length = 2.0
+    EI = analysis.beam_properties['ei1'][0]
+    weight = analysis.beam_properties['mass_per_length'][0] * 9.81
+
+    loads = np.vstack((analysis.gravity_load([[0, 0, -9.81], [0, -9.81, 0]]),
+                       analysis.thermal_load(100.0, expansion_coefficient=1.2e-5),
+                       analysis.point_load(analysis.pipe.node_positions[[-1]], dof_indices=2, values=1000.0)))
+    displacement = analysis.run_static_analysis(loads)
+
+    assert displacement.shape == (4, analysis.pipe.node_positions.shape[0], 6)
+    np.testing.assert_allclose(displacement[0, -1, 2], -weight * length**4 / (8 * EI), rtol=1e-8)
+    np.testing.assert_allclose(displacement[1, -1, 1], -weight * length**4 / (8 * EI), rtol=1e-8)
+    np.testing.assert_allclose(displacement[2, -1, 0], 1.2e-5 * 100.0 * length, rtol=1e-8)
+    np.testing.assert_allclose(displacement[3, -1, 2], 1000.0 * length**3 / (3 * EI), rtol=1e-8)
+    np.testing.assert_allclose(displacement[:, 0], 0.0, atol=1e-15)
+
+def test_static_factorization_reused_and_invalidated(cantilever_analysis):
+    """剛性行列の分解が再利用され、ばねの追加で更新されることをテスト"""
+    analysis = cantilever_analysis
+    load = analysis.point_load(analysis.pipe.node_positions[[-1]], dof_indices=1, values=1000.0)
+    free = analysis.run_static_analysis(load)
+    factorization = analysis._static_factorization[1]
+    analysis.run_static_analysis(load)
+    assert analysis._static_factorization[1] is factorization
+
+    analysis.add_springs(analysis.pipe.node_positions[[-1]], dof_indices=1, stiffness=1e6)
+    supported = analysis.run_static_analysis(load)
+    assert abs(supported[0, -1, 1]) < abs(free[0, -1, 1])
+
+def test_adaptive_frf_resolves_peaks(cantilever_analysis):
+    """適応的な周波数格子で、細かい一様格子より少ない点数で共振ピークが解像されることをテスト"""
+    analysis = cantilever_analysis
+    analysis.run_eigensolution(maximum_frequency=2000)
+    analysis.set_modal_damping(0.002)
+    frequencies = np.linspace(1, 1000, 20000)
+    reference = analysis.run_frf_modal(frequencies, load_dof_indices=[-4], response_dof_indices=[-4, -5])
+
+    adaptive = analysis.run_frf_adaptive(frequencies, load_dof_indices=[-4], response_dof_indices=[-4, -5],
+                                         method='modal')
+    abscissa = adaptive.abscissa[0, 0]
+    assert abscissa.size < frequencies.size / 10
+    assert np.all(np.diff(abscissa) > 0)
+    # 固有振動数上に点を置くため、ピークは一様格子以上に高く解像される
+    assert np.abs(adaptive.ordinate).max() >= np.abs(reference.ordinate).max()
+
+    interpolated = analysis.run_frf_adaptive(frequencies, load_dof_indices=[-4], response_dof_indices=[-4, -5],
+                                             method='modal', interpolate=True)
+    np.testing.assert_array_equal(interpolated.abscissa[0, 0], frequencies)
+    np.testing.assert_allclose(interpolated.ordinate, reference.ordinate,
+                               atol=1e-3 * np.abs(reference.ordinate).max())
+
+def test_adaptive_frf_without_eigensolution(cantilever_analysis):
+    """固有値解析結果が無くても応答の曲率から格子が細分化され、直接法と一致することをテスト"""
+    analysis = cantilever_analysis
+    analysis.set_rayleigh_damping(alpha=1.0, beta=1e-5)
+    frequencies = np.linspace(1, 500, 5000)
+    reference = analysis.run_frf_direct(frequencies, load_dof_indices=[-4], response_dof_indices=[-4])
+
+    adaptive = analysis.run_frf_adaptive(frequencies, load_dof_indices=[-4], response_dof_indices=[-4],
+                                         initial_points=16, interpolate=True)
+    np.testing.assert_allclose(adaptive.ordinate, reference.ordinate, atol=1e-3 * np.abs(reference.ordinate).max())
+
+    coarse = analysis.run_frf_adaptive(frequencies, load_dof_indices=[-4], response_dof_indices=[-4],
+                                       initial_points=16, max_points=40)
+    assert coarse.abscissa.shape[-1] == 40
+    with pytest.raises(ValueError, match="Unknown FRF method"):
+        analysis.run_frf_adaptive(frequencies, load_dof_indices=[-4], method='spectral')
+
+
+def test_adaptive_frf_budget_includes_resonance_points(cantilever_analysis):
+    """多数のモードの近傍点を含めても解く点数が max_points を超えず、各ピークの近傍が残ることをテスト"""
+    analysis = cantilever_analysis
+    natural = np.asarray(analysis.run_eigensolution(maximum_frequency=5000).frequency).ravel()
+    analysis.set_modal_damping(0.002)
+    frequencies = np.linspace(1, 5000, 1000)
+    assert natural[natural < 5000].size * 11 > 60
+
+    solved = []
+    run_frf_modal = analysis.run_frf_modal
+    def counting_solve(points, *args):
+        solved.append(np.size(points))
+        return run_frf_modal(points, *args)
+    analysis.run_frf_modal = counting_solve
+
+    adaptive = analysis.run_frf_adaptive(frequencies, load_dof_indices=[-4], response_dof_indices=[-4],
+                                         method='modal', initial_points=20, max_points=60)
+    abscissa = adaptive.abscissa[0, 0]
+    assert solved[0] <= 60 and sum(solved) == abscissa.size <= 60
+    # 固有振動数上の点が優先して残る
+    np.testing.assert_allclose(np.min(np.abs(abscissa - natural[:, np.newaxis]), axis=1), 0.0, atol=1e-9)
+
+
+def test_adaptive_frf_with_per_element_loss_factor(cantilever_analysis):
+    """要素ごとの損失係数でも平均値による半値幅で固有振動数近傍に初期点が置かれ、直接法と一致することをテスト"""
+    analysis = cantilever_analysis
+    n_elements = analysis.pipe.node_connectivity.shape[0]
+    natural = np.asarray(analysis.run_eigensolution(maximum_frequency=500).frequency).ravel()
+    analysis.set_structural_damping(np.linspace(0.01, 0.03, n_elements))
+    frequencies = np.linspace(1, 500, 2000)
+    reference = analysis.run_frf_direct(frequencies, load_dof_indices=[-4], response_dof_indices=[-4])
+
+    adaptive = analysis.run_frf_adaptive(frequencies, load_dof_indices=[-4], response_dof_indices=[-4],
+                                         initial_points=16)
+    abscissa = adaptive.abscissa[0, 0]
+    for offset in (0.0, -0.01, 0.01):
+        np.testing.assert_allclose(np.min(np.abs(abscissa - natural[:, np.newaxis] * (1 + offset)), axis=1), 0.0,
+                                   atol=1e-9)
+    interpolated = analysis.run_frf_adaptive(frequencies, load_dof_indices=[-4], response_dof_indices=[-4],
+                                             initial_points=16, interpolate=True)
+    np.testing.assert_allclose(interpolated.ordinate, reference.ordinate,
+                               atol=1e-3 * np.abs(reference.ordinate).max())
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from pipeVibSim import elements
+from pipeVibSim.pipe import Pipe
+from pipeVibSim.simulation import VibrationAnalysis
+from pipeVibSim.uncertainty import ReducedBasisModel, run_monte_carlo, sample_material_arrays
+
+
+def test_beam_mass_matches_system_mass(l_path, material_props):
+    """一括計算した要素質量行列の重ね合わせがsdynpyの質量行列と一致することをテスト"""
+    analysis = VibrationAnalysis(Pipe(l_path, material_props))
+    lengths, rotations = analysis._element_geometry()
+    props = analysis.beam_properties
+    local = elements.beam_mass(lengths, np.broadcast_to(props['mass_per_length'], lengths.shape),
+                               np.broadcast_to(props['tmmi_per_length'], lengths.shape))
+    mass = elements.assemble(elements.to_global(local, elements.element_transformations(rotations)),
+                             analysis.pipe.node_connectivity, analysis.pipe.node_positions.shape[0])
+    np.testing.assert_allclose(mass.toarray(), analysis.init_system.mass, atol=1e-12)
+
+
+def test_reduced_basis_matches_full_analysis(make_cantilever, l_path, material_props):
+    """縮約モデルの固有振動数が、材料特性を変更したモデルの固有値解析結果と一致することをテスト"""
+    analysis = make_cantilever(l_path, material_props)
+    model = ReducedBasisModel(analysis, maximum_frequency=1e5)
+    frequency, vectors = model.solve()
+    np.testing.assert_allclose(frequency[0], model.frequency, rtol=1e-12)
+    np.testing.assert_allclose(vectors[0], np.eye(model.size), atol=1e-10)
+
+    rng = np.random.default_rng(0)
+    n_elements = analysis.pipe.node_connectivity.shape[0]
+    thickness = 0.01 * (1 - 0.3 * rng.random(n_elements))
+    young_modulus = 2.06e11 * (1 - 0.1 * rng.random(n_elements))
+    modified = make_cantilever(l_path, {**material_props, 'thickness': thickness, 'young_modulus': young_modulus})
+    reference = np.asarray(modified.run_eigensolution(maximum_frequency=200).frequency).ravel()
+
+    frequency, _ = model.solve(young_modulus[np.newaxis], thickness[np.newaxis])
+    np.testing.assert_allclose(frequency[0, :reference.size], reference, rtol=1e-4)
+
+
+def test_reduced_basis_updates_fluid_terms(make_cantilever, l_path, material_props):
+    """内部流体がある場合、肉厚のサンプルに応じて流体の付加質量と剛性が更新されることをテスト"""
+    fluid_props = {**material_props, 'fluid_density': 1000.0, 'flow_velocity': 5.0, 'internal_pressure': 2e6}
+    model = ReducedBasisModel(make_cantilever(l_path, fluid_props), maximum_frequency=1e5)
+    n_elements = l_path.node_connectivity.shape[0]
+    thickness = np.linspace(0.004, 0.012, n_elements)
+    modified = make_cantilever(l_path, {**fluid_props, 'thickness': thickness})
+    reference = np.asarray(modified.run_eigensolution(maximum_frequency=200).frequency).ravel()
+
+    frequency, _ = model.solve(thickness=thickness[np.newaxis])
+    np.testing.assert_allclose(frequency[0, :reference.size], reference, rtol=1e-4)
+
+
+def test_latin_hypercube_stratification():
+    """ラテン超方格法で各要素・各特性の層に1点ずつサンプルが入ることをテスト"""
+    samples = sample_material_arrays({'thickness': stats.uniform(loc=0.0, scale=1.0)}, n_elements=7,
+                                     n_samples=20, seed=1)
+    strata = np.sort(np.floor(samples['thickness'] * 20), axis=0)
+    np.testing.assert_array_equal(strata, np.broadcast_to(np.arange(20)[:, np.newaxis], (20, 7)))
+    with pytest.raises(ValueError, match="Unknown sampling method"):
+        sample_material_arrays({'thickness': stats.uniform()}, 1, 1, method='sobol')
+
+
+def test_monte_carlo_statistics(make_cantilever, l_path, material_props):
+    """モンテカルロ解析の統計量の形状と、並列評価と逐次評価の結果の一致をテスト"""
+    analysis = make_cantilever(l_path, material_props)
+    parameters = {'thickness': stats.uniform(loc=0.008, scale=0.002),
+                  'young_modulus': stats.norm(loc=2.06e11, scale=5e9)}
+    kwargs = dict(maximum_frequency=3000, num_modes=4, frequencies=np.linspace(10, 150, 50),
+                  load_dof_indices=[-4], response_dof_indices=[-4, -5], chunk_size=64, seed=3)
+
+    result = run_monte_carlo(analysis, parameters, 200, **kwargs)
+    assert result['frequency'].shape == (200, 4)
+    assert result['frf_percentiles'].shape == (3, 2, 1, 50)
+    assert np.all(np.diff(result['frequency_percentiles'], axis=0) >= 0)
+    assert np.all(np.diff(result['frf_percentiles'], axis=0) >= 0)
+    # 肉厚の減少で剛性・質量とも減るが、公称値付近の分布になる
+    nominal = np.asarray(analysis.run_eigensolution(maximum_frequency=200).frequency).ravel()[:4]
+    np.testing.assert_allclose(result['frequency_mean'], nominal, rtol=0.05)
+
+    parallel = run_monte_carlo(analysis, parameters, 200, max_workers=2, **kwargs)
+    np.testing.assert_allclose(parallel['frequency'], result['frequency'])
+    np.testing.assert_allclose(parallel['frf_percentiles'], result['frf_percentiles'])
+    with pytest.raises(ValueError, match="Unknown material parameters"):
+        run_monte_carlo(analysis, {'density': stats.uniform()}, 10, maximum_frequency=1000)